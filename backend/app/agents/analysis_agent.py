@@ -1,13 +1,94 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
 import re
+import threading
+
+from app.nlp.tfidf import get_ranker
+
+
+# Trend flags in report order: (flag, trigger words, trend description)
+TREND_SIGNALS = [
+    ("growth", ("growing", "growth"), "Positive growth trajectory observed"),
+    ("upward", ("increasing", "rise"), "Upward trend in key indicators"),
+    ("decline", ("declining", "decrease"), "Declining pattern identified"),
+    ("stable", ("stable", "consistent"), "Stable performance maintained"),
+]
+
+INSIGHT_KEYWORDS = ["market", "growth", "trend", "analysis", "data", "research", "insight"]
+
+MAX_PERCENTAGES = 3
+MAX_INSIGHTS = 5
+
+# Small bonus for domain keywords so they win ties when the query gives no signal
+KEYWORD_PRIOR = 0.01
+
+# Sentences end at a terminator followed by whitespace (keeps decimals intact) or a line break
+_SENTENCE_SPLIT = re.compile(r'[.!?]+(?=\s|$)|\n')
+
+# Shard boundaries are placed after a sentence terminator and its whitespace so
+# that sentence splitting and substring checks see the same text in every shard.
+_SHARD_BOUNDARY = re.compile(r'[.!?]+\s')
+
+
+def _scan_shard(data: str) -> Dict[str, Any]:
+    """
+    Run the extraction pass over one piece of data and return partial results.
+    Module-level so it can be shipped to worker processes.
+    """
+    data_lower = data.lower()
+    sentences = (s.strip().lstrip("-•* ").strip() for s in _SENTENCE_SPLIT.split(data))
+    candidates = [s for s in sentences if len(s) > 20]
+    
+    return {
+        "percentages": re.findall(r'\d+\.?\d*\s*%', data)[:MAX_PERCENTAGES],
+        "number_count": len(re.findall(r'\d+[,\d]*', data)),
+        "trend_flags": {
+            flag: any(word in data_lower for word in words)
+            for flag, words, _ in TREND_SIGNALS
+        },
+        "insights": candidates
+    }
+
+
+def _merge_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-shard partial results in shard order.
+    Counts are summed, trend flags are OR-ed, percentages keep the first
+    entries and insight candidates are concatenated in document order, so the
+    result matches a single pass.
+    """
+    merged = {
+        "percentages": [],
+        "number_count": 0,
+        "trend_flags": {flag: False for flag, _, _ in TREND_SIGNALS},
+        "insights": []
+    }
+    
+    for partial in partials:
+        merged["percentages"].extend(partial["percentages"])
+        merged["number_count"] += partial["number_count"]
+        for flag, value in partial["trend_flags"].items():
+            merged["trend_flags"][flag] = merged["trend_flags"][flag] or value
+        merged["insights"].extend(partial["insights"])
+    
+    merged["percentages"] = merged["percentages"][:MAX_PERCENTAGES]
+    return merged
 
 
 class AnalysisAgent:
     """
     Analysis agent responsible for analyzing collected data and extracting insights.
+    
+    Documents larger than ``shard_threshold`` characters are split into shards
+    that are scanned in a process pool and merged; smaller documents are
+    analyzed in-process to avoid IPC overhead.
     """
     
-    def __init__(self):
+    def __init__(self, shard_threshold: int = 200_000, shard_size: int = 100_000,
+                 max_workers: Optional[int] = None):
         self.analysis_categories = [
             "trends",
             "metrics",
@@ -15,35 +96,103 @@ class AnalysisAgent:
             "patterns",
             "implications"
         ]
+        self.shard_threshold = shard_threshold
+        self.shard_size = shard_size
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
     
-    def _extract_key_metrics(self, data: str) -> List[str]:
+    def _split_shards(self, data: str) -> List[str]:
+        """Split data into roughly ``shard_size`` pieces on sentence boundaries."""
+        shards = []
+        start = 0
+        
+        while len(data) - start > self.shard_size:
+            boundary = _SHARD_BOUNDARY.search(data, start + self.shard_size)
+            if not boundary:
+                break
+            shards.append(data[start:boundary.end()])
+            start = boundary.end()
+        
+        shards.append(data[start:])
+        return shards
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use and reuse it across requests."""
+        pool = self._pool
+        if pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                pool = self._pool
+        return pool
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool (unless already replaced) and stop its remaining workers."""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def warmup(self):
+        """
+        Prime the scanning patterns and ranking tables with a small sample.
+        The process pool is left to start lazily, after any worker fork.
+        """
+        sample = "Market growth reached 12% last year. Demand is increasing steadily.\n"
+        self._extract_insights(sample, {"query": "market growth"}, _scan_shard(sample))
+    
+    def shutdown(self):
+        """Shut down the worker pool, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
+    def _scan(self, data: str) -> Dict[str, Any]:
+        """
+        Scan data for metrics, trend flags and insight candidates.
+        Large documents are sharded across the process pool.
+        """
+        if len(data) <= self.shard_threshold:
+            return {**_scan_shard(data), "shards": 1}
+        
+        shards = self._split_shards(data)
+        pool = self._get_pool()
+        try:
+            partials = list(pool.map(_scan_shard, shards))
+        except (BrokenProcessPool, OSError):
+            # Fall back to scanning in-process if the pool is unavailable
+            self._discard_pool(pool)
+            partials = [_scan_shard(shard) for shard in shards]
+        
+        return {**_merge_partials(partials), "shards": len(shards)}
+    
+    def _extract_key_metrics(self, data: str, scan: Optional[Dict[str, Any]] = None) -> List[str]:
         """Extract key metrics and numbers from the data."""
+        scan = scan or _scan_shard(data)
         metrics = []
         
         # Look for percentage patterns
-        percentages = re.findall(r'\d+\.?\d*\s*%', data)
-        metrics.extend([f"Growth rate: {p}" for p in percentages[:3]])
+        metrics.extend([f"Growth rate: {p}" for p in scan["percentages"]])
         
         # Look for numerical patterns
-        numbers = re.findall(r'\d+[,\d]*', data)
-        if numbers:
-            metrics.append(f"Key numbers identified: {len(numbers)} data points")
+        if scan["number_count"]:
+            metrics.append(f"Key numbers identified: {scan['number_count']} data points")
         
         return metrics if metrics else ["Quantitative data points identified"]
     
-    def _identify_trends(self, data: str, task_plan: Dict[str, Any]) -> List[str]:
+    def _identify_trends(self, data: str, task_plan: Dict[str, Any],
+                         scan: Optional[Dict[str, Any]] = None) -> List[str]:
         """Identify trends in the data."""
-        trends = []
-        data_lower = data.lower()
-        
-        if "growing" in data_lower or "growth" in data_lower:
-            trends.append("Positive growth trajectory observed")
-        if "increasing" in data_lower or "rise" in data_lower:
-            trends.append("Upward trend in key indicators")
-        if "declining" in data_lower or "decrease" in data_lower:
-            trends.append("Declining pattern identified")
-        if "stable" in data_lower or "consistent" in data_lower:
-            trends.append("Stable performance maintained")
+        scan = scan or _scan_shard(data)
+        trends = [
+            description for flag, _, description in TREND_SIGNALS
+            if scan["trend_flags"][flag]
+        ]
         
         # Task-specific trend identification
         focus = task_plan.get("focus", "general_research")
@@ -54,19 +203,24 @@ class AnalysisAgent:
         
         return trends if trends else ["Trend patterns analyzed"]
     
-    def _extract_insights(self, data: str, task_plan: Dict[str, Any]) -> List[str]:
-        """Extract key insights from the data."""
+    def _extract_insights(self, data: str, task_plan: Dict[str, Any],
+                          scan: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Extract the insights most relevant to the query from the data."""
+        scan = scan or _scan_shard(data)
+        query = task_plan.get("query", "")
+        
+        # Headers such as "Research Data for: <query>" merely echo the question
+        echo = query.strip().rstrip("?.!").lower()
+        candidates = [c for c in scan["insights"] if not echo or not c.lower().endswith(echo)]
         insights = []
         
-        # Extract sentences that might contain insights
-        sentences = re.split(r'[.!?]+', data)
-        key_sentences = [
-            s.strip() for s in sentences 
-            if len(s.strip()) > 20 and any(keyword in s.lower() for keyword in 
-                ["market", "growth", "trend", "analysis", "data", "research", "insight"])
+        # Score sentences against the query with TF-IDF and keep the top 5
+        priors = [
+            KEYWORD_PRIOR if any(keyword in c.lower() for keyword in INSIGHT_KEYWORDS) else 0.0
+            for c in candidates
         ]
-        
-        insights.extend(key_sentences[:5])  # Top 5 insights
+        ranked = get_ranker().rank(query, candidates, MAX_INSIGHTS, priors)
+        insights.extend(candidates[i] for i, _ in ranked)
         
         if not insights:
             insights.append("Data analysis reveals multiple relevant factors")
@@ -107,10 +261,13 @@ class AnalysisAgent:
                     "analysis": None
                 }
             
+            # Single scanning pass (sharded for large documents)
+            scan = self._scan(data)
+            
             # Perform various analysis operations
-            key_metrics = self._extract_key_metrics(data)
-            trends = self._identify_trends(data, task_plan)
-            insights = self._extract_insights(data, task_plan)
+            key_metrics = self._extract_key_metrics(data, scan)
+            trends = self._identify_trends(data, task_plan, scan)
+            insights = self._extract_insights(data, task_plan, scan)
             categorized = self._categorize_findings(data)
             
             # Structure the analysis output
@@ -125,7 +282,8 @@ class AnalysisAgent:
                     "metrics_count": len(key_metrics),
                     "trends_count": len(trends),
                     "insights_count": len(insights),
-                    "categories": list(categorized.keys())
+                    "categories": list(categorized.keys()),
+                    "shards": scan["shards"]
                 }
             }
             
@@ -1,30 +1,126 @@
-from typing import Dict, List, Any, Optional
-from app.agents.data_agent import DataAgent
-from app.agents.analysis_agent import AnalysisAgent
-from app.agents.synthesis_agent import SynthesisAgent
-from app.agents.validator_agent import ValidatorAgent
+from typing import Callable, Dict, List, Any, Optional, Tuple
+import threading
+import time
+from app.agents.registry import AgentRegistry, registry as default_registry, warmup_agent
+from app.cache.response_cache import get_response_cache
+from app.cache.semantic_cache import get_semantic_cache
+from app.cache.shared_cache import get_shared_cache
+from app.cache.stage_cache import StageCache
+from app.nlp.intent import get_intent_classifier
+
+
+# Workflow stages: (stage, agent, task plan flag, upstream stages)
+STAGES: List[Tuple[str, str, str, List[str]]] = [
+    ("data", "DataAgent", "requires_data", []),
+    ("analysis", "AnalysisAgent", "requires_analysis", ["data"]),
+    ("synthesis", "SynthesisAgent", "requires_synthesis", ["analysis"]),
+    ("validation", "ValidatorAgent", "requires_validation", ["synthesis"]),
+]
+
+# Task plan fields each cacheable stage depends on besides its input text.
+# Data is always fetched fresh; the validator memoizes its own results.
+STAGE_CACHE_FIELDS = {
+    "analysis": ("focus", "query"),
+    "synthesis": ("focus", "query"),
+}
+
+DEFAULT_STAGE_TIMEOUTS = {
+    "data": 45.0,
+    "analysis": 30.0,
+    "synthesis": 30.0,
+    "validation": 10.0,
+}
+
+
+class StageError(Exception):
+    """Raised when a workflow stage fails; carries the responsible agent."""
+    
+    def __init__(self, agent_name: str, message: str):
+        super().__init__(message)
+        self.agent_name = agent_name
+
+
+class WorkflowCancelled(Exception):
+    """Raised between stages when the caller has cancelled the workflow."""
+
+
+# Called with (stage, status report) as each stage starts and finishes
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
 
 
 class CoordinatorAgent:
     """
     Coordinator agent that decomposes tasks and orchestrates specialized agents.
+    
+    The task plan is turned into a stage dependency graph: stages the plan
+    does not require are skipped (their dependents consume the nearest
+    upstream output). Stages run in dependency order on the calling thread,
+    each against its own time budget: a stage that overruns it still hands
+    on its result, reported with ``"slow": true``, since the cost is
+    already paid by the time it returns.
+    
+    Outputs of cacheable stages are memoized under a hash of their input
+    text and relevant plan fields, so unchanged fetched data short-circuits
+    the downstream agents.
+    
+    Agents are resolved by name from the agent registry and only imported
+    and constructed the first time a stage needs them.
     """
     
-    def __init__(self):
-        self.data_agent = DataAgent()
-        self.analysis_agent = AnalysisAgent()
-        self.synthesis_agent = SynthesisAgent()
-        self.validator_agent = ValidatorAgent()
+    def __init__(self, stage_timeouts: Optional[Dict[str, float]] = None,
+                 agent_registry: Optional[AgentRegistry] = None,
+                 stage_cache: Optional[StageCache] = None):
+        self.registry = agent_registry or default_registry
+        self.stage_cache = stage_cache or StageCache()
+        self._agents: Dict[str, Any] = {}
+        self._agents_lock = threading.Lock()
         self.agents_used = []
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {})}
+    
+    def get_agent(self, name: str) -> Any:
+        """Return this coordinator's instance of an agent, creating it on first use."""
+        agent = self._agents.get(name)
+        if agent is None:
+            with self._agents_lock:
+                if name not in self._agents:
+                    self._agents[name] = self.registry.create(name)
+                agent = self._agents[name]
+        return agent
+    
+    @property
+    def data_agent(self):
+        return self.get_agent("DataAgent")
+    
+    @property
+    def analysis_agent(self):
+        return self.get_agent("AnalysisAgent")
+    
+    @property
+    def synthesis_agent(self):
+        return self.get_agent("SynthesisAgent")
+    
+    @property
+    def validator_agent(self):
+        return self.get_agent("ValidatorAgent")
+    
+    def warmup(self):
+        """Load the focus classifier, construct every registered agent and run its warmup hook."""
+        get_intent_classifier()
+        for name in self.registry.names():
+            warmup_agent(self.get_agent(name))
+    
+    def shutdown(self):
+        """Release any worker pools held by agents."""
+        for agent in list(self._agents.values()):
+            close = getattr(agent, "shutdown", None)
+            if callable(close):
+                close()
     
     def decompose_task(self, user_query: str) -> Dict[str, Any]:
         """
         Decompose the user query into subtasks for specialized agents.
         Returns a task plan with required steps.
         """
-        # Identify query type and required agents
-        query_lower = user_query.lower()
-        
         task_plan = {
             "query": user_query,
             "requires_data": True,
@@ -35,72 +131,166 @@ class CoordinatorAgent:
             "focus": "general_research"
         }
         
-        # Adjust plan based on query characteristics
-        # Check for specific keywords with priority order
-        # "explain" and "describe" take priority if they appear early in the query
-        if query_lower.startswith(("explain", "describe")) or \
-           (any(keyword in query_lower[:20] for keyword in ["explain", "describe"]) and 
-            not any(keyword in query_lower for keyword in ["trend", "trends"])):
-            task_plan["focus"] = "explanation"
-        elif any(keyword in query_lower for keyword in ["compare", "versus", "vs", "difference", "vs."]):
-            task_plan["focus"] = "comparison"
-        elif any(keyword in query_lower for keyword in ["trend", "trends", "growth", "forecast"]):
-            task_plan["focus"] = "trend_analysis"
-        elif query_lower.startswith("what ") and "trend" not in query_lower and "compare" not in query_lower:
-            task_plan["focus"] = "explanation"
-        else:
-            task_plan["focus"] = "general_research"
+        # Classify the query focus (memoized for repeated queries)
+        task_plan["focus"] = get_intent_classifier().predict(user_query)
+        
+        # Explanations read the collected data directly: no metrics/trend pass
+        if task_plan["focus"] == "explanation":
+            task_plan["requires_analysis"] = False
         
         return task_plan
     
-    def run_workflow(self, user_query: str) -> Dict[str, Any]:
+    def build_stage_graph(self, task_plan: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        Build the dependency graph of the stages required by the task plan.
+        Dependencies on skipped stages are rewired to their nearest required ancestors.
+        """
+        upstream = {stage: deps for stage, _, _, deps in STAGES}
+        required = {stage for stage, _, flag, _ in STAGES if task_plan.get(flag, True)}
+        
+        def resolve(deps: List[str]) -> List[str]:
+            resolved = []
+            for dep in deps:
+                for stage in ([dep] if dep in required else resolve(upstream[dep])):
+                    if stage not in resolved:
+                        resolved.append(stage)
+            return resolved
+        
+        return {
+            stage: resolve(deps)
+            for stage, _, _, deps in STAGES if stage in required
+        }
+    
+    def _run_stage(self, stage: str, text: str, user_query: str,
+                   task_plan: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Run one stage on its upstream text and return (result, output text)."""
+        if stage == "data":
+            result = self.data_agent.fetch_data(user_query, task_plan)
+            if not result or not result.get("success"):
+                raise StageError("DataAgent", (result or {}).get("error", "Failed to fetch data"))
+            return result, result.get("data", "")
+        
+        if stage == "analysis":
+            result = self.analysis_agent.analyze_data(text, task_plan)
+            if not result or not result.get("success"):
+                raise StageError("AnalysisAgent", (result or {}).get("error", "Failed to analyze data"))
+            return result, result.get("analysis", "")
+        
+        if stage == "synthesis":
+            result = self.synthesis_agent.synthesize(text, task_plan)
+            if not result or not result.get("success"):
+                raise StageError("SynthesisAgent", (result or {}).get("error", "Failed to synthesize"))
+            return result, result.get("synthesis", "")
+        
+        if stage == "validation":
+            # A failed validation keeps the upstream content rather than aborting
+            result = self.validator_agent.validate(text, user_query, task_plan)
+            return result, result.get("validated_content") or text
+        
+        raise ValueError(f"Unknown stage: {stage}")
+    
+    def _stage_version(self, stage: str) -> Any:
+        """Model version a stage's output depends on, so learned updates invalidate its cache."""
+        if stage == "synthesis":
+            return self.synthesis_agent.ranking_version
+        return None
+    
+    def _run_cached_stage(self, stage: str, text: str, user_query: str,
+                          task_plan: Dict[str, Any]) -> Tuple[Dict[str, Any], str, bool]:
+        """Serve a stage from the stage cache when possible; returns (result, text, cached)."""
+        fields = STAGE_CACHE_FIELDS.get(stage)
+        if fields is None:
+            result, output = self._run_stage(stage, text, user_query, task_plan)
+            if stage == "validation":
+                self.stage_cache.record(stage, bool(result.get("cached")))
+            return result, output, bool(result.get("cached"))
+        
+        key = self.stage_cache.key(stage, text, task_plan, fields, self._stage_version(stage))
+        cached = self.stage_cache.get(stage, key)
+        if cached is not None:
+            return (*cached, True)
+        
+        result, output = self._run_stage(stage, text, user_query, task_plan)
+        self.stage_cache.put(stage, key, (result, output))
+        return result, output, False
+    
+    def _execute_stages(self, graph: Dict[str, List[str]], user_query: str,
+                        task_plan: Dict[str, Any], agents_used: List[str],
+                        progress: Optional[ProgressCallback] = None,
+                        cancel_event: Optional[threading.Event] = None) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, Any]]:
+        """
+        Execute the stage graph in dependency order.
+        Returns per-stage results, output texts and timing/status reports.
+        ``progress`` is notified as stages start and finish; once
+        ``cancel_event`` is set no further stage is started.
+        """
+        notify = progress or (lambda stage, status: None)
+        agent_names = {stage: agent for stage, agent, _, _ in STAGES}
+        results: Dict[str, Any] = {}
+        texts: Dict[str, str] = {}
+        report: Dict[str, Any] = {}
+        
+        # The graph lists stages in STAGES order, so dependencies always come first
+        for stage, deps in graph.items():
+            if cancel_event is not None and cancel_event.is_set():
+                raise WorkflowCancelled()
+            if not all(d in texts for d in deps):
+                raise ValueError("Stage graph has unsatisfiable dependencies")
+            
+            upstream_text = "\n".join(texts[d] for d in deps) or user_query
+            agents_used.append(agent_names[stage])
+            notify(stage, {"status": "running"})
+            started = time.perf_counter()
+            try:
+                results[stage], texts[stage], cached = self._run_cached_stage(
+                    stage, upstream_text, user_query, task_plan
+                )
+            except StageError:
+                report[stage] = {"status": "failed"}
+                notify(stage, report[stage])
+                raise
+            
+            elapsed = time.perf_counter() - started
+            report[stage] = {
+                "status": "completed",
+                "cached": cached,
+                "duration_ms": round(elapsed * 1000, 2)
+            }
+            if elapsed > self.stage_timeouts.get(stage, 30.0):
+                report[stage]["slow"] = True
+            notify(stage, report[stage])
+        
+        report = {stage: report.get(stage, {"status": "skipped"}) for stage, _, _, _ in STAGES}
+        return results, texts, report
+    
+    def run_workflow(self, user_query: str, progress: Optional[ProgressCallback] = None,
+                     cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
         """
         Orchestrate the multi-agent workflow with error handling.
+        ``progress`` receives per-stage status updates and setting
+        ``cancel_event`` stops the workflow at the next stage boundary.
         """
-        self.agents_used = []
+        agents_used: List[str] = []
+        self.agents_used = agents_used
         
         try:
-            # Step 1: Decompose task
+            # Step 1: Decompose task and plan the stages it needs
             task_plan = self.decompose_task(user_query)
+            graph = self.build_stage_graph(task_plan)
             
-            # Step 2: Data Agent - Fetch relevant data
-            self.agents_used.append("DataAgent")
-            data_result = self.data_agent.fetch_data(user_query, task_plan)
-            if not data_result or not data_result.get("success"):
-                return self._handle_error("DataAgent", data_result.get("error", "Failed to fetch data"))
-            
-            # Step 3: Analysis Agent - Analyze the data
-            self.agents_used.append("AnalysisAgent")
-            analysis_result = self.analysis_agent.analyze_data(
-                data_result.get("data", ""),
-                task_plan
-            )
-            if not analysis_result or not analysis_result.get("success"):
-                return self._handle_error("AnalysisAgent", analysis_result.get("error", "Failed to analyze data"))
+            # Step 2: Run Data -> Analysis -> Synthesis -> Validation as planned
+            results, texts, stage_report = self._execute_stages(graph, user_query, task_plan, agents_used,
+                                                                progress, cancel_event)
             
-            # Step 4: Synthesis Agent - Synthesize insights
-            self.agents_used.append("SynthesisAgent")
-            synthesis_result = self.synthesis_agent.synthesize(
-                analysis_result.get("analysis", ""),
-                task_plan
-            )
-            if not synthesis_result or not synthesis_result.get("success"):
-                return self._handle_error("SynthesisAgent", synthesis_result.get("error", "Failed to synthesize"))
-            
-            # Step 5: Validator Agent - Validate output quality
-            self.agents_used.append("ValidatorAgent")
-            validation_result = self.validator_agent.validate(
-                synthesis_result.get("synthesis", ""),
-                user_query,
-                task_plan
-            )
-            
-            # Prepare final response
-            final_response = validation_result.get("validated_content", synthesis_result.get("synthesis", ""))
+            # Prepare final response from the last stage that ran
+            final_stage = [stage for stage, _, _, _ in STAGES if stage in texts][-1]
+            final_response = texts[final_stage]
+            data_result = results.get("data", {})
+            validation_result = results.get("validation", {"notes": ["Validation skipped by task plan"]})
             
             return {
                 "response": final_response,
-                "agents_used": self.agents_used,
+                "agents_used": agents_used,
                 "task_plan": {
                     "focus": task_plan.get("focus", "general_research"),
                     "priority": task_plan.get("priority", "normal")
@@ -108,27 +298,107 @@ class CoordinatorAgent:
                 "metadata": {
                     "data_sources": data_result.get("sources", []),
                     "validation_passed": validation_result.get("passed", False),
-                    "validation_notes": validation_result.get("notes", [])
+                    "validation_notes": validation_result.get("notes", []),
+                    "stages": stage_report
                 }
             }
             
+        except WorkflowCancelled:
+            return {
+                "response": "Query cancelled.",
+                "agents_used": agents_used,
+                "error": True,
+                "cancelled": True
+            }
+        except StageError as e:
+            return self._handle_error(e.agent_name, str(e), agents_used)
         except Exception as e:
-            return self._handle_error("Coordinator", str(e))
+            return self._handle_error("Coordinator", str(e), agents_used)
     
-    def _handle_error(self, agent_name: str, error_message: str) -> Dict[str, Any]:
+    def _handle_error(self, agent_name: str, error_message: str,
+                      agents_used: Optional[List[str]] = None) -> Dict[str, Any]:
         """Handle errors gracefully and return error response."""
         return {
             "response": f"Error in {agent_name}: {error_message}. Please try rephrasing your query.",
-            "agents_used": self.agents_used,
+            "agents_used": agents_used if agents_used is not None else self.agents_used,
             "error": True,
             "error_agent": agent_name
         }
 
 
-# Global coordinator instance
-_coordinator = CoordinatorAgent()
+# Global coordinator instance, created on first use
+_coordinator: Optional[CoordinatorAgent] = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator() -> CoordinatorAgent:
+    """Return the global coordinator, creating it on first use."""
+    global _coordinator
+    if _coordinator is None:
+        with _coordinator_lock:
+            if _coordinator is None:
+                _coordinator = CoordinatorAgent()
+    return _coordinator
+
+
+def warmup():
+    """
+    Load all agents and prime their patterns and caches.
+    Called from the application lifespan; safe to call from a pre-fork server
+    hook so workers inherit the loaded modules.
+    """
+    get_coordinator().warmup()
+
+
+def shutdown():
+    """Release resources held by the global coordinator, if it was created."""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is not None:
+            _coordinator.shutdown()
+            _coordinator = None
 
 
-def run_workflow(user_query: str) -> Dict[str, Any]:
-    """Entry point for the workflow."""
-    return _coordinator.run_workflow(user_query)
\ No newline at end of file
+def refresh_workflow(user_query: str, progress: Optional[ProgressCallback] = None,
+                     cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """Run the workflow and cache a successful response, ignoring any cached one."""
+    result = get_coordinator().run_workflow(user_query, progress, cancel_event)
+    if not result.get("error"):
+        get_response_cache().put(user_query, result)
+        get_semantic_cache().put(user_query, result["task_plan"]["focus"], result)
+        shared = get_shared_cache()
+        if shared is not None:
+            shared.put(user_query, result)
+    return result
+
+
+def run_workflow(user_query: str, progress: Optional[ProgressCallback] = None,
+                 cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Entry point for the workflow. Recent responses are served from this
+    worker's response cache, the cross-worker shared cache when configured,
+    or the most similar cached query with the same focus before running the
+    agents; with a shared cache, only one worker at a time runs a query.
+    ``progress`` and ``cancel_event`` apply when the agents run, and
+    ``cancel_event`` also ends a wait on another worker's fill.
+    """
+    cached = get_response_cache().get(user_query)
+    if cached is not None:
+        return cached
+    shared = get_shared_cache()
+    if shared is not None:
+        cached = shared.get(user_query)
+        if cached is not None:
+            get_response_cache().put(user_query, cached)
+            return cached
+    if user_query.strip():
+        focus = get_coordinator().decompose_task(user_query)["focus"]
+        similar = get_semantic_cache().lookup(user_query, focus)
+        if similar is not None:
+            response, match = similar
+            response.setdefault("metadata", {})["semantic_match"] = match
+            return response
+    if shared is not None:
+        return shared.single_flight(user_query, lambda: refresh_workflow(user_query, progress, cancel_event),
+                                    cancel_event)
+    return refresh_workflow(user_query, progress, cancel_event)
@@ -2,6 +2,8 @@ import requests
 from typing import Dict, Any, List
 import time
 
+from app.nlp.minhash import get_deduplicator
+
 
 class DataAgent:
     """
@@ -128,15 +130,25 @@ Research Data for: {query}
     def _aggregate_data(self, search_results: List[Dict[str, str]], query: str, task_plan: Dict[str, Any]) -> str:
         """
         Aggregate data from multiple sources into a structured format.
+        Near-duplicate snippets (e.g. syndicated copies) are collapsed first.
         """
+        unique = get_deduplicator().unique_indices(
+            [r.get("snippet") or "" for r in search_results]
+        )
+        unique_results = [search_results[i] for i in unique]
+        
         aggregated = f"Data Collection Summary for: {query}\n\n"
         aggregated += f"Task Focus: {task_plan.get('focus', 'general_research')}\n\n"
         aggregated += "Collected Information:\n"
         
-        for i, result in enumerate(search_results, 1):
+        for i, result in enumerate(unique_results, 1):
             aggregated += f"\n[{i}] Source: {result.get('source', 'unknown')}\n"
             aggregated += f"    {result.get('snippet', 'No data available')}\n"
         
+        duplicates = len(search_results) - len(unique_results)
+        if duplicates:
+            aggregated += f"\n[{duplicates} near-duplicate passage(s) collapsed]\n"
+        
         aggregated += "\n---\n"
         aggregated += "Data ready for analysis phase."
         
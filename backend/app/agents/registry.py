@@ -0,0 +1,64 @@
+from typing import Any, Dict, List
+import importlib
+import threading
+
+
+class AgentRegistry:
+    """
+    Registry of agents by name.
+    Agents are registered as "module:Class" paths and only imported the first
+    time they are requested, so unused agents (and their dependencies) cost
+    nothing at startup.
+    """
+    
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._classes: Dict[str, type] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name: str, target: str):
+        """Register an agent class under a name, e.g. "app.agents.data_agent:DataAgent"."""
+        if ":" not in target:
+            raise ValueError(f"Agent target must look like 'module:Class', got {target!r}")
+        with self._lock:
+            self._targets[name] = target
+            self._classes.pop(name, None)
+    
+    def names(self) -> List[str]:
+        return list(self._targets)
+    
+    def is_loaded(self, name: str) -> bool:
+        return name in self._classes
+    
+    def load(self, name: str) -> type:
+        """Import and return the agent class registered under ``name``."""
+        agent_class = self._classes.get(name)
+        if agent_class is not None:
+            return agent_class
+        
+        with self._lock:
+            if name not in self._targets:
+                raise KeyError(f"No agent registered as {name!r}")
+            if name not in self._classes:
+                module_name, class_name = self._targets[name].split(":", 1)
+                module = importlib.import_module(module_name)
+                self._classes[name] = getattr(module, class_name)
+            return self._classes[name]
+    
+    def create(self, name: str, **kwargs: Any) -> Any:
+        """Instantiate the agent registered under ``name``."""
+        return self.load(name)(**kwargs)
+
+
+def warmup_agent(agent: Any):
+    """Run an agent's optional warmup hook (precompiling patterns, priming caches)."""
+    hook = getattr(agent, "warmup", None)
+    if callable(hook):
+        hook()
+
+
+registry = AgentRegistry()
+registry.register("DataAgent", "app.agents.data_agent:DataAgent")
+registry.register("AnalysisAgent", "app.agents.analysis_agent:AnalysisAgent")
+registry.register("SynthesisAgent", "app.agents.synthesis_agent:SynthesisAgent")
+registry.register("ValidatorAgent", "app.agents.validator_agent:ValidatorAgent")
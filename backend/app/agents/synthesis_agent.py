@@ -1,43 +1,85 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import re
 
+from app.learning.adaptive_ranker import AdaptiveRanker, get_adaptive_ranker
+from app.nlp.minhash import get_deduplicator
+from app.nlp.tfidf import get_ranker
+from app.nlp.textrank import textrank
+
+# Sentences end at a terminator followed by whitespace (keeps decimals intact) or a line break
+_SENTENCE_SPLIT = re.compile(r'[.!?]+(?=\s|$)|\n')
+
 
 class SynthesisAgent:
     """
     Synthesis agent responsible for synthesizing analyzed data into coherent insights.
+    
+    Findings, implications and recommendations are ordered per focus by the
+    adaptive ranker, which learns online from interaction events.
     """
     
-    def __init__(self):
+    def __init__(self, summary_sentences: int = 2, max_summary_candidates: int = 40,
+                 ranker: Optional[AdaptiveRanker] = None):
         self.synthesis_structure = [
             "executive_summary",
             "key_findings",
             "implications",
             "recommendations"
         ]
+        self.summary_sentences = summary_sentences
+        self.max_summary_candidates = max_summary_candidates
+        self.ranker = ranker or get_adaptive_ranker()
+    
+    @property
+    def ranking_version(self) -> int:
+        """Version of the learned ordering; changes whenever the ranker is updated."""
+        return self.ranker.version
+    
+    def warmup(self):
+        """Prime the summary, ranking and deduplication paths with a small sample."""
+        sample = (
+            "- Market growth is accelerating across enterprise segments\n"
+            "- Enterprise demand keeps the cloud market growing steadily\n"
+        )
+        self._extract_executive_summary(sample, {"query": "market growth"})
+        self._extract_key_findings(sample)
     
     def _extract_executive_summary(self, analysis: str, task_plan: Dict[str, Any]) -> str:
-        """Create an executive summary from the analysis."""
-        focus = task_plan.get("focus", "general_research")
+        """
+        Create an executive summary from the analysis.
+        Candidate sentences are pre-filtered by relevance to the query, then
+        the most central ones under TextRank are kept in document order.
+        """
+        sentences = (s.strip().lstrip("-•* ").strip() for s in _SENTENCE_SPLIT.split(analysis))
         
-        # Extract key sentences for summary
-        sentences = re.split(r'[.!?]+', analysis)
+        # Skip headers such as "Research Data for: <query>" that only echo the question
+        echo = task_plan.get("query", "").strip().rstrip("?.!").lower()
         key_sentences = [
-            s.strip() for s in sentences 
-            if len(s.strip()) > 30 and len(s.strip()) < 200
+            s for s in sentences
+            if len(s) > 30 and len(s) < 200 and re.search(r'[a-z]', s)
+            and not (echo and s.lower().endswith(echo))
         ]
         
         if key_sentences:
-            summary = key_sentences[0]
-            if len(key_sentences) > 1:
-                summary += ". " + key_sentences[1]
+            # Cap the graph size using the query-relevance ranking signal
+            ranker = get_ranker()
+            if len(key_sentences) > self.max_summary_candidates:
+                ranked = ranker.rank(task_plan.get("query", ""), key_sentences,
+                                     self.max_summary_candidates)
+                key_sentences = [key_sentences[i] for i in sorted(i for i, _ in ranked)]
+            
+            vectors, _ = ranker.vectorize(key_sentences)
+            scores = textrank(vectors)
+            top = sorted(range(len(key_sentences)), key=lambda i: (-scores[i], i))
+            summary = ". ".join(key_sentences[i] for i in sorted(top[:self.summary_sentences]))
         else:
             summary = f"Comprehensive analysis completed for {task_plan.get('query', 'the query')}. "
             summary += "Multiple data points and insights have been identified and evaluated."
         
         return summary
     
-    def _extract_key_findings(self, analysis: str) -> List[str]:
-        """Extract key findings from the analysis."""
+    def _extract_key_findings(self, analysis: str, focus: Optional[str] = None) -> List[str]:
+        """Extract key findings from the analysis, most engaging first."""
         findings = []
         
         # Look for bullet points and numbered items
@@ -47,8 +89,12 @@ class SynthesisAgent:
         bullets = re.findall(bullet_pattern, analysis)
         numbered = re.findall(numbered_pattern, analysis)
         
-        findings.extend([b.strip() for b in bullets[:5]])
-        findings.extend([n.strip() for n in numbered[:5]])
+        findings.extend([b.strip() for b in bullets])
+        findings.extend([n.strip() for n in numbered])
+        
+        # Collapse near-duplicate findings so copies don't fill the top 5
+        findings = get_deduplicator().deduplicate(findings)
+        findings = self.ranker.rerank(focus, "key_findings", findings)[:5]
         
         # If no structured findings, extract key sentences
         if not findings:
@@ -58,7 +104,8 @@ class SynthesisAgent:
                 if len(s.strip()) > 40 and any(keyword in s.lower() for keyword in 
                     ["trend", "growth", "market", "analysis", "data", "insight", "finding"])
             ]
-            findings = key_sentences[:5]
+            findings = get_deduplicator().deduplicate(key_sentences)
+            findings = self.ranker.rerank(focus, "key_findings", findings)[:5]
         
         return findings[:5] if findings else ["Key findings extracted from comprehensive analysis"]
     
@@ -84,6 +131,7 @@ class SynthesisAgent:
         if "risk" in analysis.lower() or "challenge" in analysis.lower():
             implications.append("Identified challenges require careful consideration")
         
+        implications = self.ranker.rerank(focus, "implications", implications)
         return implications if implications else ["Analysis provides actionable insights"]
     
     def _generate_recommendations(self, analysis: str, task_plan: Dict[str, Any]) -> List[str]:
@@ -100,7 +148,7 @@ class SynthesisAgent:
         elif focus == "comparison":
             recommendations.append("Use comparative insights to inform competitive strategy")
         
-        return recommendations
+        return self.ranker.rerank(focus, "recommendations", recommendations)
     
     def synthesize(self, analysis: str, task_plan: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -116,7 +164,7 @@ class SynthesisAgent:
             
             # Extract different components
             executive_summary = self._extract_executive_summary(analysis, task_plan)
-            key_findings = self._extract_key_findings(analysis)
+            key_findings = self._extract_key_findings(analysis, task_plan.get("focus"))
             implications = self._derive_implications(analysis, task_plan)
             recommendations = self._generate_recommendations(analysis, task_plan)
             
@@ -1,38 +1,68 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from collections import OrderedDict
+import copy
+import hashlib
 import re
+import threading
+
+
+STRUCTURE_PATTERN = re.compile(r'[=|\-]{3,}')
+CLEAR_STRUCTURE_PATTERN = re.compile(r'(SUMMARY|FINDINGS|INSIGHTS|RECOMMENDATIONS)', re.IGNORECASE)
+ACTIONABLE_PATTERN = re.compile(r'(recommend|suggest|consider|should|may)', re.IGNORECASE)
+DATA_REFERENCE_PATTERN = re.compile(r'(data|analysis|research|study|finding)', re.IGNORECASE)
+QUERY_TERM_PATTERN = re.compile(r'\b\w{4,}\b')
+
+# (name, check)
+Check = Tuple[str, Callable[[str, Dict[str, Any]], bool]]
 
 
 class ValidatorAgent:
     """
     Validator agent responsible for validating output quality and completeness.
+    
+    Each set of checks is scored by the fraction that pass.
+    Results are memoized by a hash of the content and query.
     """
     
-    def __init__(self):
+    def __init__(self, memo_size: int = 256):
         self.min_length = 100
         self.required_sections = [
             "summary", "findings", "insights", "recommendations"
         ]
         self.quality_threshold = 0.6
-    
-    def _check_completeness(self, content: str, task_plan: Dict[str, Any]) -> Dict[str, Any]:
-        """Check if the content is complete and addresses the query."""
-        checks = {
-            "has_sufficient_length": len(content) >= self.min_length,
-            "has_structure": bool(re.search(r'[=|\-]{3,}', content)),  # Has section dividers
-            "has_key_sections": self._check_sections(content),
-            "addresses_query": self._check_query_relevance(content, task_plan)
-        }
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+        
+        self.completeness_checks: List[Check] = [
+            ("has_sufficient_length", lambda c, plan: len(c) >= self.min_length),
+            ("has_structure", lambda c, plan: bool(STRUCTURE_PATTERN.search(c))),  # Has section dividers
+            ("has_key_sections", lambda c, plan: self._check_sections(c)),
+            ("addresses_query", lambda c, plan: self._check_query_relevance(c, plan)),
+        ]
         
-        passed = sum(checks.values())
-        total = len(checks)
-        score = passed / total if total > 0 else 0
+        self.quality_checks: List[Check] = [
+            ("proper_formatting", lambda c, plan: c.count('\n') >= 5),  # Has reasonable line breaks
+            ("has_clear_structure", lambda c, plan: bool(CLEAR_STRUCTURE_PATTERN.search(c))),
+            ("has_actionable_content", lambda c, plan: bool(ACTIONABLE_PATTERN.search(c))),
+            ("has_data_references", lambda c, plan: bool(DATA_REFERENCE_PATTERN.search(c))),
+        ]
+    
+    def _run_checks(self, checks: List[Check], content: str, task_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate every check; the score is the fraction that pass."""
+        results = {name: check(content, task_plan) for name, check in checks}
+        score = sum(results.values()) / len(results) if results else 0.0
         
         return {
-            "checks": checks,
+            "checks": results,
             "score": score,
             "passed": score >= self.quality_threshold
         }
     
+    def _check_completeness(self, content: str, task_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Check if the content is complete and addresses the query."""
+        return self._run_checks(self.completeness_checks, content, task_plan)
+    
     def _check_sections(self, content: str) -> bool:
         """Check if content has required sections."""
         content_lower = content.lower()
@@ -51,7 +81,7 @@ class ValidatorAgent:
             return True  # Can't validate without query
         
         # Extract key terms from query
-        query_terms = set(re.findall(r'\b\w{4,}\b', query))  # Words with 4+ chars
+        query_terms = set(QUERY_TERM_PATTERN.findall(query))  # Words with 4+ chars
         content_lower = content.lower()
         
         # Check if key terms appear in content
@@ -62,22 +92,7 @@ class ValidatorAgent:
     
     def _check_quality(self, content: str) -> Dict[str, Any]:
         """Check overall quality of the content."""
-        quality_checks = {
-            "has_clear_structure": bool(re.search(r'(SUMMARY|FINDINGS|INSIGHTS|RECOMMENDATIONS)', content, re.IGNORECASE)),
-            "has_actionable_content": bool(re.search(r'(recommend|suggest|consider|should|may)', content, re.IGNORECASE)),
-            "has_data_references": bool(re.search(r'(data|analysis|research|study|finding)', content, re.IGNORECASE)),
-            "proper_formatting": content.count('\n') >= 5  # Has reasonable line breaks
-        }
-        
-        passed = sum(quality_checks.values())
-        total = len(quality_checks)
-        score = passed / total if total > 0 else 0
-        
-        return {
-            "checks": quality_checks,
-            "score": score,
-            "passed": score >= self.quality_threshold
-        }
+        return self._run_checks(self.quality_checks, content, {})
     
     def _generate_validation_notes(self, completeness: Dict[str, Any], 
                                    quality: Dict[str, Any]) -> List[str]:
@@ -117,6 +132,12 @@ class ValidatorAgent:
                     "notes": ["Validation failed: Empty content"]
                 }
             
+            # Identical content for the same query validates identically
+            memo_key = self._memo_key(content, task_plan)
+            cached = self._memo_get(memo_key)
+            if cached is not None:
+                return cached
+            
             # Perform validation checks
             completeness = self._check_completeness(content, task_plan)
             quality = self._check_quality(content)
@@ -134,7 +155,7 @@ class ValidatorAgent:
                 validated_content = self._enhance_content(content, completeness, quality, task_plan)
                 notes.append("Content enhanced based on validation feedback")
             
-            return {
+            result = {
                 "success": True,
                 "passed": overall_passed,
                 "validated_content": validated_content,
@@ -145,6 +166,8 @@ class ValidatorAgent:
                     "overall": (completeness["score"] + quality["score"]) / 2
                 }
             }
+            self._memo_put(memo_key, result)
+            return result
             
         except Exception as e:
             return {
@@ -155,6 +178,26 @@ class ValidatorAgent:
                 "notes": [f"Validation error: {str(e)}"]
             }
     
+    def _memo_key(self, content: str, task_plan: Dict[str, Any]) -> str:
+        """Hash of everything the checks depend on: the content and the query."""
+        digest = hashlib.sha256(content.encode())
+        digest.update(b"\x00" + task_plan.get("query", "").encode())
+        return digest.hexdigest()
+    
+    def _memo_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._memo_lock:
+            result = self._memo.get(key)
+            if result is None:
+                return None
+            self._memo.move_to_end(key)
+        return {**copy.deepcopy(result), "cached": True}
+    
+    def _memo_put(self, key: str, result: Dict[str, Any]):
+        with self._memo_lock:
+            self._memo[key] = copy.deepcopy(result)
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+    
     def _enhance_content(self, content: str, completeness: Dict[str, Any],
                          quality: Dict[str, Any], task_plan: Dict[str, Any]) -> str:
         """Enhance content based on validation feedback."""
@@ -0,0 +1,371 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import glob
+import hashlib
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ANALYTICS_DIR = os.path.join("data", "analytics")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so trivial variants count together."""
+    return " ".join(_PUNCTUATION.sub(" ", query.lower()).split())
+
+
+def _hidden_key(key: str) -> str:
+    """Stand-in for a heavy-hitter key in snapshots (normalized keys never contain "#")."""
+    return "#" + hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def _hash_pair(key: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes of a key."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class CountMinSketch:
+    """Approximate frequency counts in ``depth x width`` counters (never underestimates)."""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, hashes: Tuple[int, int]) -> List[int]:
+        h1, h2 = hashes
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, hashes: Tuple[int, int], count: int = 1):
+        for row, column in enumerate(self._columns(hashes)):
+            self.table[row, column] += count
+
+    def estimate(self, hashes: Tuple[int, int]) -> int:
+        return int(min(self.table[row, column] for row, column in enumerate(self._columns(hashes))))
+
+    def merge(self, other: "CountMinSketch"):
+        self.table += other.table
+
+
+class HyperLogLog:
+    """Distinct-count estimate from ``2 ** precision`` one-byte registers."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: Tuple[int, int]):
+        h = hashes[0]
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return float(estimate)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class SpaceSaving:
+    """
+    Heavy hitters: tracks at most ``capacity`` keys. A new key evicts the
+    smallest counter and inherits its count as overestimation error, so any
+    key more frequent than total/capacity is guaranteed to be present.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []  # lazy min-heap of (count, key)
+
+    def add(self, key: str, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor, evicted = self._pop_min()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:  # skip stale entries
+                return count, key
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """(key, count, error) of the ``n`` largest counters."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+        return [(key, count, self.errors[key]) for key, count in ranked]
+
+    def merge(self, other: "SpaceSaving"):
+        """Combine summaries (mergeable summaries, Agarwal et al.), keeping the top ``capacity``."""
+        counts = dict(self.counts)
+        errors = dict(self.errors)
+        for key, count in other.counts.items():
+            counts[key] = counts.get(key, 0) + count
+            errors[key] = errors.get(key, 0) + other.errors[key]
+        kept = sorted(counts, key=lambda key: (-counts[key], key))[:self.capacity]
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self._rebuild_heap()
+
+
+class QueryAnalytics:
+    """
+    Fixed-memory analytics of normalized queries: Count-Min for frequencies,
+    Space-Saving for the hot set and HyperLogLog for distinct queries.
+
+    Recording a query costs one hash plus constant work, independent of
+    traffic. Only the heavy-hitter summary keeps query text, bounded to
+    ``capacity`` entries, along with (in memory only) the latest raw form
+    of each tracked query for prewarming; reports omit queries seen fewer than ``min_count``
+    times and, with ``epsilon`` set, add Laplace noise to reported counts.
+    Each worker snapshots its sketches to a shared directory and reports
+    merge all snapshots.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, precision: int = 12, capacity: int = 64,
+                 min_count: int = 3, epsilon: Optional[float] = None, seed: Optional[int] = None):
+        self.cms = CountMinSketch(width, depth)
+        self.hll = HyperLogLog(precision)
+        self.heavy = SpaceSaving(capacity)
+        self.total = 0
+        self.min_count = min_count
+        self.epsilon = epsilon
+        self._rng = np.random.default_rng(seed)
+        self._examples: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, query: str):
+        key = normalize_query(query)
+        if not key:
+            return
+        hashes = _hash_pair(key)
+        with self._lock:
+            self.cms.add(hashes)
+            self.hll.add(hashes)
+            self.heavy.add(key)
+            self.total += 1
+            self._examples[key] = query
+            if len(self._examples) > 2 * self.heavy.capacity:
+                self._examples = {k: v for k, v in self._examples.items() if k in self.heavy.counts}
+
+    def estimate(self, query: str) -> int:
+        with self._lock:
+            return self.cms.estimate(_hash_pair(normalize_query(query)))
+
+    def merge(self, other: "QueryAnalytics"):
+        with self._lock:
+            self.cms.merge(other.cms)
+            self.hll.merge(other.hll)
+            self.heavy.merge(other.heavy)
+            self.total += other.total
+
+    def _noised(self, value: float) -> float:
+        if not self.epsilon:
+            return value
+        return max(0.0, value + self._rng.laplace(0.0, 1.0 / self.epsilon))
+
+    def _scored(self) -> List[Tuple[str, int]]:
+        """Tracked heavy-hitter keys with their Count-Min frequency, excluding hidden keys."""
+        with self._lock:
+            candidates = self.heavy.top(self.heavy.capacity)
+            return [(key, self.cms.estimate(_hash_pair(key))) for key, _, _ in candidates
+                    if not key.startswith("#")]
+
+    def hot_queries(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Top ``n`` queries with their Count-Min frequency, above the reporting threshold."""
+        scored = [(key, count) for key, count in self._scored() if count >= self.min_count]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:n]
+
+    def hot_examples(self, n: int = 10) -> List[str]:
+        """
+        Raw text of the top ``n`` hot queries as last sent, so callers re-run
+        what users asked rather than the lossy normalized key.
+        """
+        hot = self.hot_queries(n)
+        with self._lock:
+            return [self._examples[key] for key, _ in hot if key in self._examples]
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Totals and hot queries. With ``epsilon``, counts are noised before the
+        threshold and the top-k selection, so noise also covers which queries
+        are reported.
+        """
+        total = int(round(self._noised(self.total)))
+        distinct = int(round(self._noised(self.hll.count())))
+        scored = [(key, self._noised(count)) for key, count in self._scored()]
+        scored = [(key, count) for key, count in scored if count >= self.min_count]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return {
+            "total": total,
+            "distinct": distinct,
+            "top": [{"query": key, "count": int(round(count))} for key, count in scored[:top]],
+            "noised": bool(self.epsilon),
+        }
+
+    def save(self, path: str):
+        """
+        Atomically write a snapshot of the sketches. Heavy-hitter keys seen
+        fewer than ``min_count`` times are written as hashes, so rare query
+        text never reaches disk.
+        """
+        with self._lock:
+            keys = list(self.heavy.counts)
+            stored = [key if self.cms.estimate(_hash_pair(key)) >= self.min_count else _hidden_key(key)
+                      for key in keys]
+            arrays = {
+                "cms": self.cms.table.copy(),
+                "hll": self.hll.registers.copy(),
+                "heavy_keys": np.array(stored, dtype=str),
+                "heavy_counts": np.array([self.heavy.counts[k] for k in keys], dtype=np.int64),
+                "heavy_errors": np.array([self.heavy.errors[k] for k in keys], dtype=np.int64),
+                "total": np.int64(self.total),
+            }
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: str) -> "QueryAnalytics":
+        """Sketches with this configuration holding a snapshot written by ``save``."""
+        other = QueryAnalytics(self.cms.width, self.cms.depth, self.hll.precision, self.heavy.capacity)
+        with np.load(path) as snapshot:
+            if snapshot["cms"].shape != self.cms.table.shape or snapshot["hll"].shape != self.hll.registers.shape:
+                raise ValueError(f"Snapshot {path} has a different sketch configuration")
+            other.cms.table = snapshot["cms"].astype(np.int64)
+            other.hll.registers = snapshot["hll"].astype(np.uint8)
+            keys = snapshot["heavy_keys"].tolist()
+            other.heavy.counts = dict(zip(keys, snapshot["heavy_counts"].tolist()))
+            other.heavy.errors = dict(zip(keys, snapshot["heavy_errors"].tolist()))
+            other.heavy._rebuild_heap()
+            other.total = int(snapshot["total"])
+        return other
+
+
+class AnalyticsStore:
+    """
+    Per-worker snapshots of query analytics in a shared directory. Snapshots
+    not refreshed for ``stale_after`` seconds (workers that exited) are
+    deleted rather than merged, so counts do not pile up across restarts.
+    """
+
+    def __init__(self, analytics: QueryAnalytics, directory: str = DEFAULT_ANALYTICS_DIR,
+                 stale_after: float = 120.0):
+        self.analytics = analytics
+        self.directory = directory
+        self.stale_after = stale_after
+        self.path = os.path.join(directory, f"worker-{os.getpid()}.npz")
+
+    def snapshot(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.analytics.save(self.path)
+
+    def _live_snapshots(self) -> List[str]:
+        """Other workers' snapshot paths, removing stale ones."""
+        cutoff = time.time() - self.stale_after
+        paths = []
+        for path in glob.glob(os.path.join(self.directory, "worker-*.npz")):
+            if os.path.abspath(path) == os.path.abspath(self.path):
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            paths.append(path)
+        return paths
+
+    def merged(self) -> Tuple[QueryAnalytics, int]:
+        """This worker's live sketches merged with every other live worker's snapshot."""
+        live = self.analytics
+        merged = QueryAnalytics(live.cms.width, live.cms.depth, live.hll.precision, live.heavy.capacity,
+                                min_count=live.min_count, epsilon=live.epsilon)
+        merged.merge(live)
+        snapshots = []
+        for path in self._live_snapshots():
+            try:
+                snapshots.append(live.load_snapshot(path))
+            except (OSError, ValueError, KeyError):
+                logger.warning("Skipping unreadable analytics snapshot %s", path)
+
+        # A key hidden in one snapshot merges with its plain text from any other worker
+        known = {_hidden_key(key): key for key in live.heavy.counts}
+        for snapshot in snapshots:
+            known.update((_hidden_key(key), key) for key in snapshot.heavy.counts if not key.startswith("#"))
+        for snapshot in snapshots:
+            heavy = snapshot.heavy
+            heavy.counts = {known.get(key, key): count for key, count in heavy.counts.items()}
+            heavy.errors = {known.get(key, key): error for key, error in heavy.errors.items()}
+            heavy._rebuild_heap()
+            merged.merge(snapshot)
+        return merged, 1 + len(snapshots)
+
+
+_store: Optional[AnalyticsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_analytics_store() -> AnalyticsStore:
+    """
+    Shared store in PRIVYPULSE_ANALYTICS_DIR (default data/analytics);
+    PRIVYPULSE_ANALYTICS_EPSILON enables noised reports.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                epsilon = os.environ.get("PRIVYPULSE_ANALYTICS_EPSILON")
+                analytics = QueryAnalytics(epsilon=float(epsilon) if epsilon else None)
+                directory = os.environ.get("PRIVYPULSE_ANALYTICS_DIR", DEFAULT_ANALYTICS_DIR)
+                _store = AnalyticsStore(analytics, directory)
+    return _store
+
+
+def record_query(query: str):
+    """Request-path hook: fold a query into this worker's sketches."""
+    get_analytics_store().analytics.record(query)
+
+
+async def run_snapshots(store: AnalyticsStore, interval: float = 30.0):
+    """Periodically publish this worker's sketches for other workers to merge."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(store.snapshot)
+        except Exception:
+            logger.exception("Query analytics snapshot failed")
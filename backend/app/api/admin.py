@@ -0,0 +1,42 @@
+import hmac
+import math
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from app.analytics.sketches import get_analytics_store
+from app.interactions.rollups import FOCUSES, read_rollups
+
+router = APIRouter(prefix = "/admin", tags = ["Admin"])
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Admin endpoints require an X-Admin-Token header matching
+    PRIVYPULSE_ADMIN_TOKEN, and are disabled while it is unset.
+    """
+    expected = os.environ.get("PRIVYPULSE_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code = 403, detail = "Admin endpoints are disabled; set PRIVYPULSE_ADMIN_TOKEN")
+    if not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code = 401, detail = "Invalid admin token")
+
+
+@router.get("/query-analytics", dependencies = [Depends(require_admin)])
+def query_analytics(top: int = Query(10, ge = 1, le = 100)):
+    """Hot and distinct query estimates merged across workers."""
+    merged, workers = get_analytics_store().merged()
+    return {**merged.report(top), "workers": workers}
+
+
+@router.get("/interaction-stats", dependencies = [Depends(require_admin)])
+def interaction_stats(focus: Optional[str] = Query(None), hours: Optional[int] = Query(None, ge = 1)):
+    """Per-section impressions, clicks, CTR and mean dwell from the compacted interaction rollups."""
+    if focus is not None and focus not in FOCUSES:
+        raise HTTPException(status_code = 400, detail = f"Unknown focus '{focus}'; expected one of {', '.join(FOCUSES)}")
+    rollups = read_rollups()
+    last_buckets = math.ceil(hours * 3600 / rollups.bucket_seconds) if hours else None
+    return {
+        "sections": rollups.section_stats(focus, last_buckets),
+        "buckets": len(rollups.counts),
+        "generation": rollups.generation,
+    }
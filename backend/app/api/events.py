@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from app.schemas.events import EventBatch, EventBatchResponse
+from app.interactions.ingest import get_ingestor
+
+router = APIRouter(prefix = "/events", tags = ["Events"])
+
+@router.post("", response_model = EventBatchResponse, status_code = 202)
+async def ingest_events(batch: EventBatch):
+    # Only buffers in memory; the background flusher writes to disk
+    dropped = get_ingestor().ingest([event.model_dump(exclude_none = True) for event in batch.events])
+    return {"accepted": len(batch.events), "dropped": dropped}
@@ -0,0 +1,204 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # optional: br is only offered when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only offered when installed
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+# Browser origins allowed by CORS and for WebSocket sessions
+ALLOWED_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
+
+
+def _encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Available encoders in server preference order (best ratio for text first)."""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=5)
+    if zstandard is not None:
+        encoders["zstd"] = zstandard.ZstdCompressor(level=6).compress
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+    return encoders
+
+
+ENCODERS = _encoders()
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map of content codings to q-values from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: str, available: Optional[List[str]] = None) -> Optional[str]:
+    """Best available coding the client accepts, or None for identity."""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available if available is not None else ENCODERS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _without(headers: List[Tuple[bytes, bytes]], *names: bytes) -> List[Tuple[bytes, bytes]]:
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+
+async def _buffered_response(app, scope, receive) -> Tuple[dict, bytes]:
+    """Run the app and collect its response start message and full body."""
+    start: dict = {}
+    chunks: List[bytes] = []
+
+    async def collect(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, collect)
+    return start, b"".join(chunks)
+
+
+async def _send_response(send, start: dict, headers: List[Tuple[bytes, bytes]], body: bytes):
+    await send({**start, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class CompressionMiddleware:
+    """
+    Compresses HTTP responses with the best coding the client accepts:
+    br or zstd when their libraries are installed, otherwise gzip. Small
+    bodies, non-text types and already-encoded responses pass through.
+    A strong ETag gets a per-coding suffix, since each encoding is a
+    different representation.
+    """
+
+    def __init__(self, app, minimum_size: int = 500):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = dict(scope["headers"])
+        coding = negotiate_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start, body = await _buffered_response(self.app, scope, receive)
+        headers = list(start.get("headers", []))
+        if start.get("status") == 304:
+            # Revalidation of the representation this client was sent compressed
+            await _send_response(send, start, self._encoded_headers(headers, coding), body)
+            return
+        content_type = _header(headers, b"content-type") or ""
+        if (len(body) < self.minimum_size or _header(headers, b"content-encoding")
+                or not content_type.startswith(COMPRESSIBLE_TYPES)):
+            await _send_response(send, start, headers, body)
+            return
+
+        body = ENCODERS[coding](body)
+        headers = self._encoded_headers(_without(headers, b"content-length"), coding)
+        headers += [
+            (b"content-encoding", coding.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        await _send_response(send, start, headers, body)
+
+    @staticmethod
+    def _encoded_headers(headers: List[Tuple[bytes, bytes]], coding: str) -> List[Tuple[bytes, bytes]]:
+        """Headers with Vary: Accept-Encoding and a strong ETag suffixed with the coding."""
+        etag = _header(headers, b"etag")
+        vary = _header(headers, b"vary")
+        headers = _without(headers, b"etag", b"vary")
+        headers.append((b"vary", (f"{vary}, Accept-Encoding" if vary else "Accept-Encoding").encode()))
+        if etag:
+            headers.append((b"etag", (f'{etag[:-1]}-{coding}"' if not etag.startswith("W/") else etag).encode()))
+        return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of If-None-Match against an ETag, ignoring coding suffixes."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/").strip('"')
+    for candidate in if_none_match.split(","):
+        tag = candidate.strip().removeprefix("W/").strip('"')
+        for coding in ("gzip", "br", "zstd"):
+            tag = tag.removesuffix(f"-{coding}")
+        if tag == opaque:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """
+    Adds a strong ETag (hash of the body) to successful responses and, for
+    GET and HEAD, answers 304 Not Modified when the request's If-None-Match
+    matches it. POST responses are tagged too but always sent in full:
+    RFC 9110 allows 304 only for GET and HEAD, so clients revalidate a
+    repeated query through ``GET /query/?query=...``.
+    """
+
+    METHODS = ("GET", "HEAD", "POST")
+    REVALIDATE_METHODS = ("GET", "HEAD")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        start, body = await _buffered_response(self.app, scope, receive)
+        headers = list(start.get("headers", []))
+        if start.get("status") != 200:
+            await _send_response(send, start, headers, body)
+            return
+
+        etag = _header(headers, b"etag")
+        if etag is None:
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            headers.append((b"etag", etag.encode()))
+
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        if scope["method"] not in self.REVALIDATE_METHODS:
+            if_none_match = None
+        if if_none_match is not None and _etag_matches(if_none_match.decode("latin-1"), etag):
+            headers = _without(headers, b"content-length", b"content-type")
+            await _send_response(send, {**start, "status": 304}, headers, b"")
+            return
+        await _send_response(send, start, headers, body)
@@ -0,0 +1,10 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.learning.privacy import get_accountant
+
+router = APIRouter(prefix = "/privacy", tags = ["Privacy"])
+
+@router.get("/budget")
+def privacy_budget(delta: Optional[float] = Query(None, gt = 0, lt = 1)):
+    """Cumulative differential privacy budget spent by federated training rounds."""
+    return get_accountant().budget(delta)
@@ -1,10 +1,82 @@
-from fastapi import APIRouter
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.schemas.query import QueryRequest, QueryResponse
-from app.agents.coordinator import run_workflow
+from app.agents.coordinator import run_workflow, get_coordinator
+from app.analytics.sketches import record_query
+from app.cache.prewarm import get_live_traffic
+from app.cache.response_cache import get_response_cache
+from app.cache.semantic_cache import get_semantic_cache
+from app.cache.shared_cache import get_shared_cache
+
+try:
+    import orjson
+except ImportError:  # optional: the fast path falls back to compact stdlib json
+    orjson = None
 
 router = APIRouter(prefix = "/query", tags = ["Query"])
 
+RESPONSE_FIELDS = tuple(QueryResponse.model_fields)
+
+
+def compact_json(payload: Any) -> bytes:
+    """Serialize with orjson when installed, else compact stdlib json."""
+    if orjson is not None:
+        return orjson.dumps(payload, option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators = (",", ":"), ensure_ascii = False).encode()
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Response field names from a comma-separated ``fields`` parameter (all when empty)."""
+    if not fields:
+        return RESPONSE_FIELDS
+    names = tuple(name.strip() for name in fields.split(",") if name.strip())
+    unknown = [name for name in names if name not in RESPONSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code = 400, detail = f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def select_fields(output: Dict[str, Any], names: Sequence[str]) -> Dict[str, Any]:
+    """The QueryResponse shape of workflow output, defaults filled in without validation."""
+    defaults = QueryResponse.model_fields
+    return {name: output.get(name, defaults[name].default) for name in names}
+
+
+def _answer(query: str, fast: bool, fields: Optional[str]):
+    names = parse_fields(fields)
+    record_query(query)
+    # Counted as live traffic so background prewarming backs off while we serve it
+    with get_live_traffic().track():
+        output = run_workflow(query)
+    if fast or fields:
+        # Workflow output is built internally, so re-validating it against the model is redundant
+        return Response(content = compact_json(select_fields(output, names)), media_type = "application/json")
+    return output
+
+
 @router.post("/", response_model = QueryResponse)
-def query_system(request: QueryRequest):
-    output = run_workflow(request.query)
-    return output
\ No newline at end of file
+def query_system(request: QueryRequest,
+                 fast: bool = Query(False, description = "Skip response validation and encode compactly"),
+                 fields: Optional[str] = Query(None, description = "Comma-separated response fields to return (implies fast)")):
+    return _answer(request.query, fast, fields)
+
+
+@router.get("/", response_model = QueryResponse)
+def query_system_get(query: str = Query(..., description = "The research question"),
+                     fast: bool = Query(False, description = "Skip response validation and encode compactly"),
+                     fields: Optional[str] = Query(None, description = "Comma-separated response fields to return (implies fast)")):
+    """Same as POST, for clients that revalidate repeated queries with If-None-Match (304)."""
+    return _answer(query, fast, fields)
+
+
+@router.get("/stats")
+def query_stats():
+    """Per-stage and whole-response cache hit ratios of the workflow."""
+    shared = get_shared_cache()
+    return {
+        "stage_cache": get_coordinator().stage_cache.stats(),
+        "response_cache": get_response_cache().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "shared_cache": shared.stats() if shared is not None else None,
+    }
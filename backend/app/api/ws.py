@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from app.agents.coordinator import run_workflow
+from app.analytics.sketches import record_query
+from app.api.middleware import ALLOWED_ORIGINS
+from app.api.query import compact_json, parse_fields, select_fields
+from app.cache.prewarm import get_live_traffic
+
+router = APIRouter(tags = ["Query"])
+
+DEFAULT_MAX_CONCURRENT = 2
+
+
+class QuerySession:
+    """
+    One client's WebSocket session: runs its queries concurrently up to
+    ``max_concurrent`` and streams stage progress and results.
+
+    Client messages:
+      {"type": "query", "id": "q1", "query": "...", "supersede": true, "fields": "response"}
+      {"type": "cancel", "id": "q1"}
+    Server messages (each tagged with the query ``id``): ``accepted``,
+    ``progress`` (stage and status), ``result``, ``cancelled`` and ``error``.
+
+    A query supersedes (cancels) the session's in-flight queries unless it
+    sets ``"supersede": false``. Cancelled workflows stop at their next
+    stage boundary and their output is discarded; they stop counting
+    against ``max_concurrent`` as soon as they are cancelled, so a
+    follow-up query is never turned away by the one it replaced.
+    """
+
+    def __init__(self, websocket: WebSocket, max_concurrent: int = DEFAULT_MAX_CONCURRENT):
+        self.websocket = websocket
+        self.max_concurrent = max_concurrent
+        self.active: Dict[str, Tuple[asyncio.Task, threading.Event]] = {}
+        # Strong references until done, including cancelled queries still finishing a stage
+        self._tasks: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def send(self, message: Dict[str, Any]):
+        async with self._send_lock:
+            await self.websocket.send_text(compact_json(message).decode())
+
+    def _progress(self, query_id: str, cancel_event: threading.Event):
+        """Stage callback run on the workflow thread, forwarded to the event loop."""
+        def notify(stage: str, status: Dict[str, Any]):
+            if not cancel_event.is_set():
+                asyncio.run_coroutine_threadsafe(
+                    self.send({"type": "progress", "id": query_id, "stage": stage, **status}), self._loop
+                )
+        return notify
+
+    async def _run(self, query_id: str, query: str, names: Sequence[str], cancel_event: threading.Event):
+        try:
+            record_query(query)
+            with get_live_traffic().track():
+                output = await asyncio.to_thread(
+                    run_workflow, query, self._progress(query_id, cancel_event), cancel_event
+                )
+            if not cancel_event.is_set():
+                await self.send({"type": "result", "id": query_id, "result": select_fields(output, names)})
+        except Exception as e:
+            if not cancel_event.is_set():
+                await self.send({"type": "error", "id": query_id, "detail": str(e)})
+        finally:
+            entry = self.active.get(query_id)
+            if entry is not None and entry[1] is cancel_event:
+                del self.active[query_id]
+
+    async def cancel(self, query_id: str, notify: bool = True) -> bool:
+        entry = self.active.pop(query_id, None)
+        if entry is None:
+            return False
+        entry[1].set()
+        if notify:
+            await self.send({"type": "cancelled", "id": query_id})
+        return True
+
+    async def submit(self, message: Dict[str, Any]):
+        query_id = str(message.get("id") or "")
+        query = message.get("query")
+        if not query_id or not isinstance(query, str) or not query.strip():
+            await self.send({"type": "error", "id": query_id or None, "detail": "A query needs an id and query text"})
+            return
+        if query_id in self.active:
+            await self.send({"type": "error", "id": query_id, "detail": "Query id already in use"})
+            return
+        fields = message.get("fields")
+        if fields is not None and not isinstance(fields, str):
+            await self.send({"type": "error", "id": query_id, "detail": "fields must be a comma-separated string"})
+            return
+        try:
+            names = parse_fields(fields)
+        except HTTPException as e:
+            await self.send({"type": "error", "id": query_id, "detail": e.detail})
+            return
+
+        if message.get("supersede", True):
+            for previous in list(self.active):
+                await self.cancel(previous)
+        if len(self.active) >= self.max_concurrent:
+            await self.send({"type": "error", "id": query_id,
+                             "detail": f"At most {self.max_concurrent} concurrent queries per session"})
+            return
+
+        cancel_event = threading.Event()
+        await self.send({"type": "accepted", "id": query_id})
+        task = asyncio.create_task(self._run(query_id, query, names, cancel_event))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.active[query_id] = (task, cancel_event)
+
+    async def _receive(self) -> Optional[str]:
+        """Next text frame, or None for a binary one; raises WebSocketDisconnect on close."""
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+        return message.get("text")
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        try:
+            while True:
+                text = await self._receive()
+                if text is None:
+                    await self.send({"type": "error", "id": None, "detail": "Messages must be JSON text frames"})
+                    continue
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    await self.send({"type": "error", "id": None, "detail": "Messages must be JSON"})
+                    continue
+                kind = message.get("type") if isinstance(message, dict) else None
+                if kind == "query":
+                    await self.submit(message)
+                elif kind == "cancel":
+                    if not await self.cancel(str(message.get("id"))):
+                        await self.send({"type": "error", "id": message.get("id"), "detail": "No such active query"})
+                else:
+                    await self.send({"type": "error", "id": None, "detail": "Unknown message type"})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for query_id in list(self.active):
+                await self.cancel(query_id, notify = False)
+
+
+@router.websocket("/ws/query")
+async def query_session(websocket: WebSocket):
+    """
+    Multi-query session over one connection; see QuerySession for the
+    protocol. Browsers may only connect from the CORS allowlist.
+    """
+    origin = websocket.headers.get("origin")
+    if origin is not None and origin not in ALLOWED_ORIGINS:
+        await websocket.close(code = status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    max_concurrent = int(os.environ.get("PRIVYPULSE_WS_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT))
+    await QuerySession(websocket, max_concurrent).serve()
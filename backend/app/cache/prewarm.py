@@ -0,0 +1,147 @@
+from typing import Any, Callable, Dict, List, Optional
+from contextlib import contextmanager
+import logging
+import os
+import threading
+import time
+
+from app.cache.response_cache import ResponseCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class LiveTraffic:
+    """Count of live requests currently being served by this worker."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self):
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TokenBucket:
+    """Allows ``rate`` operations per second on average with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+class Prewarmer:
+    """
+    Keeps responses to hot queries cached.
+
+    Every ``interval`` seconds a background thread asks ``hot_queries`` for
+    the current top ``top_n`` queries (as users typed them) and re-runs
+    those whose cached response is missing or expires within
+    ``refresh_window`` seconds; ``run`` stores its own result, as
+    ``refresh_workflow`` does. Work
+    is strictly best-effort: each run needs a token from a rate limiter, the
+    cycle stops as soon as more than ``max_live`` live requests are in
+    flight, and the thread runs at the lowest CPU priority where supported.
+    """
+
+    def __init__(self, cache: ResponseCache, hot_queries: Callable[[int], List[str]],
+                 run: Callable[[str], Dict[str, Any]], traffic: Optional[LiveTraffic] = None,
+                 top_n: int = 10, interval: float = 60.0, refresh_window: float = 120.0,
+                 rate: float = 0.1, burst: float = 2.0, max_live: int = 0):
+        self.cache = cache
+        self.hot_queries = hot_queries
+        self.run = run
+        self.traffic = traffic or LiveTraffic()
+        self.top_n = top_n
+        self.interval = interval
+        self.refresh_window = refresh_window
+        self.max_live = max_live
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = {"cycles": 0, "warmed": 0, "failed": 0, "deferred_busy": 0, "deferred_rate": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self) -> List[str]:
+        """Hot queries whose cached response is missing or about to expire."""
+        due = []
+        for query in self.hot_queries(self.top_n):
+            remaining = self.cache.expires_in(query)
+            if remaining is None or remaining < self.refresh_window:
+                due.append(query)
+        return due
+
+    def run_once(self) -> int:
+        """Refresh due queries within the budget; returns how many were warmed."""
+        self.stats["cycles"] += 1
+        warmed = 0
+        for query in self.due():
+            if self._stop.is_set():
+                break
+            if self.traffic.in_flight > self.max_live:
+                self.stats["deferred_busy"] += 1
+                break
+            if not self.bucket.try_acquire():
+                self.stats["deferred_rate"] += 1
+                break
+            try:
+                result = self.run(query)
+            except Exception:
+                logger.exception("Prewarming %r failed", query)
+                result = None
+            if result and not result.get("error"):
+                warmed += 1
+            else:
+                self.stats["failed"] += 1
+        self.stats["warmed"] += warmed
+        return warmed
+
+    def _loop(self):
+        try:
+            # Lowest scheduling priority for this thread only (Linux applies nice per thread)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Prewarm cycle failed")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="prewarmer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_traffic = LiveTraffic()
+
+
+def get_live_traffic() -> LiveTraffic:
+    return _traffic
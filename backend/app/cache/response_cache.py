@@ -0,0 +1,86 @@
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import copy
+import os
+import threading
+import time
+
+from app.analytics.sketches import normalize_query
+
+
+class ResponseCache:
+    """
+    Bounded LRU of complete workflow responses with a time-to-live.
+    Entries are keyed by the normalized query so trivial variants share a
+    response; expired entries are treated as misses.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, response)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str) -> str:
+        return normalize_query(query)
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        key = self.key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry[1]
+        return copy.deepcopy(response)
+
+    def put(self, query: str, response: Dict[str, Any]):
+        key = self.key(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def expires_in(self, query: str) -> Optional[float]:
+        """Seconds until the cached response for ``query`` expires, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(self.key(query))
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Shared response cache; PRIVYPULSE_RESPONSE_TTL sets the TTL in seconds (default 600)."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(ttl=float(os.environ.get("PRIVYPULSE_RESPONSE_TTL", 600)))
+    return _response_cache
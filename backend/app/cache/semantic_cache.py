@@ -0,0 +1,305 @@
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from itertools import combinations
+import copy
+import os
+import re
+import threading
+import time
+import numpy as np
+
+from app.nlp.hashing import hash_features, ngram_features
+from app.nlp.tfidf import tokenize
+
+
+FINGERPRINT_BITS = 64
+_FEATURE_SPACE = 1 << 20
+
+# Bit weights for packing fingerprints, most significant bit first
+_BIT_WEIGHTS = np.uint64(1) << np.arange(FINGERPRINT_BITS - 1, -1, -1, dtype=np.uint64)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# Query filler that does not change what is asked; left out of fingerprints
+GENERIC_TERMS = frozenset(tokenize(
+    "latest recent new today now update updates overview summary brief briefly report reports "
+    "analysis insight insights info information detail details key main top overall some "
+    "give show please can could would you i my we our do does"
+))
+
+# Region names recognized as entities even when a query is written in lower case
+REGION_TERMS = frozenset(tokenize(
+    "africa america americas apac asia australia brazil canada china emea europe european france "
+    "germany india indonesia japan korea latam mexico russia uk usa"
+))
+
+_RAW_WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT_TABLE[values.view(np.uint8)].reshape(len(values), 8).sum(axis=1)
+
+
+def _mix64(indices: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: a pseudo-random 64-bit hyperplane pattern per feature bucket."""
+    z = indices.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def simhash(query: str) -> int:
+    """
+    64-bit SimHash of a query's hashed n-gram vector (stop words and
+    generic filler removed, word unigrams plus character trigrams). Each
+    bit is the sign of the vector's projection on a pseudo-random
+    hyperplane, so the fraction of differing bits estimates the angle
+    between two queries.
+    """
+    terms = [t for t in tokenize(query) if t not in GENERIC_TERMS]
+    features = ngram_features(" ".join(terms), word_ngrams=(1,))[1:]
+    if not features:
+        return 0
+    # Words count twice so a swapped word outweighs the character trigrams it shares
+    features += [f for f in features if f.startswith("w:")]
+    indices, values = hash_features(features, _FEATURE_SPACE)
+    signs = (_mix64(indices)[:, None] & _BIT_WEIGHTS) != 0
+    projection = values @ np.where(signs, 1.0, -1.0)
+    return int(_BIT_WEIGHTS[projection > 0].sum(dtype=np.uint64))
+
+
+def query_terms(query: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Content terms of a query and its key terms: numbers and likely named
+    entities (acronyms, capitalized words after the first, region names).
+    """
+    keys = set()
+    for position, word in enumerate(_RAW_WORD_PATTERN.findall(query)):
+        terms = tokenize(word)
+        if not terms or terms[0] in GENERIC_TERMS:
+            continue
+        if (any(c.isdigit() for c in word) or (len(word) > 1 and word.isupper())
+                or (position and word[0].isupper()) or terms[0] in REGION_TERMS):
+            keys.add(terms[0])
+    return frozenset(tokenize(query)), frozenset(keys)
+
+
+def conflicting(a: Tuple[FrozenSet[str], FrozenSet[str]], b: Tuple[FrozenSet[str], FrozenSet[str]]) -> bool:
+    """
+    True when each query names a number or entity the other does not
+    mention, such as "Asia" vs "Europe" or "2020" vs "2026". Such swaps
+    fingerprint close together; a key term present on one side only is
+    left to the similarity score.
+    """
+    (terms_a, keys_a), (terms_b, keys_b) = a, b
+    return bool(keys_a - terms_b) and bool(keys_b - terms_a)
+
+
+def similarity_from_distance(distance) -> float:
+    """Cosine similarity implied by a Hamming distance between fingerprints."""
+    return np.cos(np.pi * np.asarray(distance) / FINGERPRINT_BITS)
+
+
+def _probe_masks(bits: int, radius: int) -> np.ndarray:
+    """Every ``bits``-bit XOR mask with at most ``radius`` bits set."""
+    masks = [0]
+    for r in range(1, radius + 1):
+        masks.extend(sum(1 << b for b in combo) for combo in combinations(range(bits), r))
+    return np.array(masks, dtype=np.int64)
+
+
+class SemanticCache:
+    """
+    Near-duplicate response cache over SimHash fingerprints.
+
+    Fingerprints are split into ``bands`` bands (multi-index hashing). For
+    every band the indexed slots are kept sorted by band value with an
+    offsets table, so a lookup probes all band values within
+    ``probe_radius`` bits of the query's with a handful of array operations
+    and scores only those candidates with one XOR/popcount instead of
+    scanning the cache. Any entry within ``bands * (probe_radius + 1) - 1``
+    bits is always found; more distant ones when some band happens to be
+    close enough. New entries are scanned directly until ``rebuild_every``
+    of them (or 1/64 of the cache, whichever is larger, so rebuilds stay
+    amortized) have accumulated and the band index is rebuilt.
+
+    A candidate is reused when its estimated cosine similarity reaches
+    ``threshold``, it was cached for the same task focus and the two
+    queries do not swap a number or named entity (``conflicting``), which
+    the fingerprint alone cannot tell apart. The cache holds
+    at most ``max_entries`` responses, replacing the oldest first, and
+    entries expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, threshold: float = 0.8, ttl: float = 600.0, max_entries: int = 100_000,
+                 bands: int = 4, probe_radius: int = 2, rebuild_every: int = 1024):
+        if FINGERPRINT_BITS % bands != 0 or FINGERPRINT_BITS // bands > 16:
+            raise ValueError("bands must split the fingerprint into equal bands of at most 16 bits")
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bands = bands
+        self.band_bits = FINGERPRINT_BITS // bands
+        self.rebuild_every = rebuild_every
+        # Largest Hamming distance whose implied similarity still reaches the threshold
+        self.max_distance = int(np.floor(np.arccos(np.clip(threshold, -1.0, 1.0)) * FINGERPRINT_BITS / np.pi))
+        self._probes = _probe_masks(self.band_bits, probe_radius)
+        self._shifts = np.arange(bands, dtype=np.uint64) * np.uint64(self.band_bits)
+        self._band_mask = np.uint64((1 << self.band_bits) - 1)
+
+        self._fingerprints = np.zeros(max_entries, dtype=np.uint64)
+        self._focus = np.full(max_entries, -1, dtype=np.int16)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._queries: List[Optional[str]] = [None] * max_entries
+        self._terms: List[Optional[Tuple[FrozenSet[str], FrozenSet[str]]]] = [None] * max_entries
+        self._responses: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._focus_codes: Dict[str, int] = {}
+        self._next_slot = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._reset_index()
+
+    def _reset_index(self):
+        offsets = np.zeros((1 << self.band_bits) + 1, dtype=np.int64)
+        self._order = [np.empty(0, dtype=np.int64)] * self.bands
+        self._offsets = [offsets] * self.bands
+        self._pending_start = self._next_slot
+        self._pending = 0
+
+    def _band_values(self, fingerprints: np.ndarray) -> np.ndarray:
+        """Band values of fingerprints as a (bands, n) int array."""
+        return ((fingerprints[None, :] >> self._shifts[:, None]) & self._band_mask).astype(np.int64)
+
+    def _rebuild_index(self):
+        """Sort every occupied slot by each band's value (one CSR layout per band)."""
+        values = self._band_values(self._fingerprints[:self.size])
+        for band in range(self.bands):
+            self._order[band] = np.argsort(values[band], kind="stable")
+            counts = np.bincount(values[band], minlength=1 << self.band_bits)
+            self._offsets[band] = np.concatenate(([0], np.cumsum(counts)))
+        self._pending_start = self._next_slot
+        self._pending = 0
+
+    def put(self, query: str, focus: str, response: Dict[str, Any], fingerprint: Optional[int] = None):
+        fingerprint = simhash(query) if fingerprint is None else fingerprint
+        terms = query_terms(query)
+        stored = copy.deepcopy(response)
+        with self._lock:
+            code = self._focus_codes.setdefault(focus, len(self._focus_codes))
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.max_entries
+            self.size = max(self.size, slot + 1)
+            # A replaced slot may still be indexed under its old fingerprint; candidates
+            # are always scored against the current one, so that only costs a comparison
+            self._fingerprints[slot] = fingerprint
+            self._focus[slot] = code
+            self._expires[slot] = time.monotonic() + self.ttl
+            self._queries[slot] = query
+            self._terms[slot] = terms
+            self._responses[slot] = stored
+            # Slots are filled round-robin, so unindexed entries are the ones since the last rebuild
+            self._pending += 1
+            if self._pending >= max(self.rebuild_every, self.size // 64):
+                self._rebuild_index()
+
+    def _candidates(self, fingerprint: int) -> np.ndarray:
+        query_bands = self._band_values(np.array([fingerprint], dtype=np.uint64))[:, 0]
+        pending = min(self._pending, self.max_entries)
+        found = [(self._pending_start + np.arange(pending)) % self.max_entries]
+        for band in range(self.bands):
+            probes = query_bands[band] ^ self._probes
+            starts = self._offsets[band][probes]
+            lengths = self._offsets[band][probes + 1] - starts
+            total = int(lengths.sum())
+            if total:
+                # Concatenate the probed runs of the sorted slots without a Python loop
+                run_starts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+                found.append(self._order[band][run_starts + np.arange(total)])
+        return np.concatenate(found)
+
+    def _nearest(self, fingerprint: int, focus: str,
+                 terms: Tuple[FrozenSet[str], FrozenSet[str]]) -> Optional[Tuple[int, int]]:
+        """(slot, distance) of the closest live same-focus, non-conflicting entry within the threshold."""
+        code = self._focus_codes.get(focus)
+        if code is None or not self.size:
+            return None
+        candidates = self._candidates(fingerprint)
+        if not len(candidates):
+            return None
+        distances = _popcount(self._fingerprints[candidates] ^ np.uint64(fingerprint))
+        close = distances <= self.max_distance
+        candidates, distances = candidates[close], distances[close]
+        eligible = (self._focus[candidates] == code) & (self._expires[candidates] > time.monotonic())
+        if not eligible.any():
+            return None
+        candidates, distances = candidates[eligible], distances[eligible]
+        # Few candidates survive the filters, so the term check runs in Python, nearest first
+        for i in np.argsort(distances, kind="stable"):
+            slot = int(candidates[i])
+            if not conflicting(terms, self._terms[slot]):
+                return slot, int(distances[i])
+            self.rejected += 1
+        return None
+
+    def lookup(self, query: str, focus: str,
+               fingerprint: Optional[int] = None) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Cached response of the most similar same-focus query, with match
+        details (matched query and estimated similarity), or None.
+        """
+        fingerprint = simhash(query) if fingerprint is None else fingerprint
+        terms = query_terms(query)
+        with self._lock:
+            nearest = self._nearest(fingerprint, focus, terms)
+            if nearest is None:
+                self.misses += 1
+                return None
+            slot, distance = nearest
+            self.hits += 1
+            matched, response = self._queries[slot], self._responses[slot]
+        match = {"query": matched, "similarity": round(float(similarity_from_distance(distance)), 4)}
+        return copy.deepcopy(response), match
+
+    def clear(self):
+        with self._lock:
+            self._queries = [None] * self.max_entries
+            self._terms = [None] * self.max_entries
+            self._responses = [None] * self.max_entries
+            self._focus[:] = -1
+            self._next_slot = 0
+            self.size = 0
+            self._reset_index()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "rejected_conflicts": self.rejected,
+                "entries": self.size,
+                "threshold": self.threshold,
+            }
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """
+    Shared semantic cache; PRIVYPULSE_SEMANTIC_THRESHOLD sets the minimum
+    similarity (default 0.8) and PRIVYPULSE_RESPONSE_TTL the TTL.
+    """
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    threshold=float(os.environ.get("PRIVYPULSE_SEMANTIC_THRESHOLD", 0.8)),
+                    ttl=float(os.environ.get("PRIVYPULSE_RESPONSE_TTL", 600)),
+                )
+    return _semantic_cache
@@ -0,0 +1,215 @@
+from typing import Any, Callable, Dict, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.analytics.sketches import normalize_query
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """
+    Response cache shared by every worker process on a host, stored in a
+    SQLite database in WAL mode (concurrent readers, one writer, no server).
+
+    Entries expire after ``ttl`` seconds and the table is bounded to
+    ``max_entries`` rows, evicting the least recently used. ``single_flight``
+    gives one worker at a time a lease to fill a missing key while the
+    others wait for its result, so a burst of identical queries across
+    workers runs the workflow once. Leases expire after ``lease_timeout``
+    seconds in case their holder dies.
+    """
+
+    def __init__(self, path: str, ttl: float = 600.0, max_entries: int = 10_000,
+                 lease_timeout: float = 60.0, poll_interval: float = 0.05):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections must not be shared across threads)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def key(query: str) -> str:
+        return normalize_query(query)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Live value for a key, without touching the hit/miss counters."""
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        # Refresh recency at most once a second per key to keep reads mostly read-only
+        connection.execute(
+            "UPDATE entries SET accessed = ? WHERE key = ? AND accessed < ?", (now, key, now - 1.0)
+        )
+        return json.loads(row[0])
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        value = self._read(self.key(query))
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, query: str, value: Dict[str, Any]):
+        """Store a value and evict expired and least recently used entries beyond the bound."""
+        now = time.time()
+        payload = json.dumps(value)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (self.key(query), payload, now + self.ttl, now)
+            )
+            connection.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            connection.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _acquire(self, key: str) -> Optional[str]:
+        """Take the fill lease for a key; returns the owner token, or None if held elsewhere."""
+        owner = uuid.uuid4().hex
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires) VALUES (?, ?, ?)",
+                (key, owner, now + self.lease_timeout)
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return owner if cursor.rowcount == 1 else None
+
+    def _release(self, key: str, owner: str):
+        self._connection().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def _fill(self, key: str, owner: str, fill: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            # Another worker may have stored the value and released the lease just before we took it
+            value = self._read(key)
+            return value if value is not None else fill()
+        finally:
+            self._release(key, owner)
+
+    def single_flight(self, query: str, fill: Callable[[], Dict[str, Any]],
+                      cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Run ``fill`` (which is expected to ``put`` its result) unless another
+        worker is already filling the same key, in which case wait for that
+        result. The entry is re-read once the lease is held, so a value
+        stored just before is returned instead of filled again. Falls back to filling locally if the other worker gives up
+        without storing a value or the lease times out. Setting
+        ``cancel_event`` ends the wait at once and hands over to ``fill``,
+        which is expected to honour the same event. Polling does not count
+        towards the hit/miss stats.
+        """
+        key = self.key(query)
+        owner = self._acquire(key)
+        if owner is not None:
+            return self._fill(key, owner, fill)
+
+        wait = cancel_event.wait if cancel_event is not None else time.sleep
+        deadline = time.monotonic() + self.lease_timeout
+        while time.monotonic() < deadline:
+            if wait(self.poll_interval):
+                break
+            value = self._read(key)
+            if value is not None:
+                return value
+            owner = self._acquire(key)
+            if owner is not None:
+                return self._fill(key, owner, fill)
+        return fill()
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute("DELETE FROM entries")
+        connection.execute("DELETE FROM leases")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio of this worker's lookups and the shared entry count."""
+        lookups = self.hits + self.misses
+        (entries,) = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "path": self.path,
+        }
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """
+    Cross-worker cache at PRIVYPULSE_SHARED_CACHE_PATH, or None when unset
+    (single-process deployments rely on the in-process caches).
+    """
+    global _shared_cache
+    path = os.environ.get("PRIVYPULSE_SHARED_CACHE_PATH")
+    if not path:
+        return None
+    if _shared_cache is None or _shared_cache.path != path:
+        with _shared_cache_lock:
+            if _shared_cache is None or _shared_cache.path != path:
+                _shared_cache = SharedCache(
+                    path,
+                    ttl=float(os.environ.get("PRIVYPULSE_RESPONSE_TTL", 600)),
+                    max_entries=int(os.environ.get("PRIVYPULSE_SHARED_CACHE_ENTRIES", 10_000)),
+                )
+    return _shared_cache
@@ -0,0 +1,84 @@
+from typing import Any, Dict, Optional, Sequence
+from collections import OrderedDict
+import copy
+import hashlib
+import threading
+
+
+class StageCache:
+    """
+    Content-addressed cache of workflow stage outputs.
+    Entries are keyed by a hash of the stage input text plus the task plan
+    fields the stage depends on, with a bounded LRU per stage and hit/miss
+    counters for each stage.
+    """
+
+    def __init__(self, max_entries_per_stage: int = 256):
+        self.max_entries_per_stage = max_entries_per_stage
+        self._entries: Dict[str, "OrderedDict[str, Any]"] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(stage: str, text: str, task_plan: Dict[str, Any], fields: Sequence[str],
+            version: Any = None) -> str:
+        """
+        Hash of the stage name, its input text and the relevant plan fields.
+        ``version`` identifies any model state the output depends on.
+        """
+        digest = hashlib.sha256(stage.encode())
+        digest.update(b"\x00" + text.encode())
+        for field in fields:
+            digest.update(b"\x00" + f"{field}={task_plan.get(field)!r}".encode())
+        if version is not None:
+            digest.update(b"\x00" + f"version={version!r}".encode())
+        return digest.hexdigest()
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entries = self._entries.get(stage)
+            if entries is None or key not in entries:
+                self._misses[stage] = self._misses.get(stage, 0) + 1
+                return None
+            entries.move_to_end(key)
+            self._hits[stage] = self._hits.get(stage, 0) + 1
+            value = entries[key]
+        return copy.deepcopy(value)
+
+    def put(self, stage: str, key: str, value: Any):
+        with self._lock:
+            entries = self._entries.setdefault(stage, OrderedDict())
+            entries[key] = copy.deepcopy(value)
+            entries.move_to_end(key)
+            if len(entries) > self.max_entries_per_stage:
+                entries.popitem(last=False)
+
+    def record(self, stage: str, hit: bool):
+        """Count a lookup for a stage that memoizes its results itself."""
+        with self._lock:
+            counter = self._hits if hit else self._misses
+            counter[stage] = counter.get(stage, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits.clear()
+            self._misses.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage hit/miss counts, hit ratios and entry counts."""
+        with self._lock:
+            stages = set(self._hits) | set(self._misses) | set(self._entries)
+            report = {}
+            for stage in sorted(stages):
+                hits = self._hits.get(stage, 0)
+                misses = self._misses.get(stage, 0)
+                lookups = hits + misses
+                report[stage] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries.get(stage, ()))
+                }
+            return report
@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+import threading
+
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO buffer. When full, the oldest entries are overwritten
+    so bursts never block or grow memory; overwritten entries are counted.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._slots: List[Optional[Any]] = [None] * capacity
+        self._head = 0  # index of the oldest entry
+        self._size = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, items: List[Any]) -> int:
+        """Append items, overwriting the oldest when full. Returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for item in items:
+                tail = (self._head + self._size) % self.capacity
+                self._slots[tail] = item
+                if self._size == self.capacity:
+                    self._head = (self._head + 1) % self.capacity
+                    dropped += 1
+                else:
+                    self._size += 1
+            self.dropped += dropped
+        return dropped
+
+    def drain(self, max_items: Optional[int] = None) -> List[Any]:
+        """Remove and return up to ``max_items`` of the oldest entries."""
+        with self._lock:
+            count = self._size if max_items is None else min(max_items, self._size)
+            end = self._head + count
+            if end <= self.capacity:
+                items = self._slots[self._head:end]
+                self._slots[self._head:end] = [None] * count
+            else:
+                wrapped = end - self.capacity
+                items = self._slots[self._head:] + self._slots[:wrapped]
+                self._slots[self._head:] = [None] * (self.capacity - self._head)
+                self._slots[:wrapped] = [None] * wrapped
+            self._head = end % self.capacity
+            self._size -= count
+        return items
+
+    def stats(self) -> Dict[str, int]:
+        return {"buffered": self._size, "capacity": self.capacity, "dropped": self.dropped}
@@ -0,0 +1,116 @@
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.interactions.buffer import RingBuffer
+from app.interactions.log import EventLog
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PATH = os.path.join("data", "interactions.log")
+
+# Called with each flushed batch of event records (e.g. online learners)
+EventSubscriber = Callable[[List[Dict[str, Any]]], None]
+
+
+class EventIngestor:
+    """
+    Accepts interaction events into an in-memory ring buffer and flushes them
+    to the append-only event log from a background task.
+    The request path only appends to the buffer; disk writes happen in
+    batches (group commit) off the event loop. A batch whose write fails is
+    kept and retried before any newer events, so events are written at
+    least once. Writes are serialized, so a final ``flush`` can run while a
+    cancelled background write is still finishing on its thread.
+    """
+
+    def __init__(self, log: EventLog, capacity: int = 100_000, batch_size: int = 5000,
+                 flush_interval: float = 1.0):
+        self.log = log
+        self.buffer = RingBuffer(capacity)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.subscribers: List[EventSubscriber] = []
+        self.flushed = 0
+        self._unwritten: List[Dict[str, Any]] = []
+        self._write_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def subscribe(self, subscriber: EventSubscriber):
+        if subscriber not in self.subscribers:
+            self.subscribers.append(subscriber)
+
+    def ingest(self, events: List[Dict[str, Any]]) -> int:
+        """Buffer a batch of validated events; returns how many older events were dropped."""
+        received = time.time()
+        dropped = self.buffer.extend([{**event, "rt": received} for event in events])
+        if self._wakeup is not None and len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+        return dropped
+
+    def pending(self) -> int:
+        """Events not yet written: the buffer plus any batch awaiting a retry."""
+        return len(self._unwritten) + len(self.buffer)
+
+    def flush(self) -> int:
+        """Drain the buffer to the log synchronously; returns the number of events written."""
+        written = 0
+        while self.pending():
+            written += self._write_next()
+        return written
+
+    def _write_next(self) -> int:
+        """Write the failed batch awaiting a retry, else the next batch from the buffer."""
+        with self._write_lock:
+            records, self._unwritten = self._unwritten or self.buffer.drain(self.batch_size), []
+            if not records:
+                return 0
+            try:
+                self.log.append_batch(records)
+            except OSError:
+                self._unwritten = records
+                raise
+            self.flushed += len(records)
+            for subscriber in self.subscribers:
+                try:
+                    subscriber(records)
+                except Exception:
+                    logger.exception("Interaction event subscriber failed")
+            return len(records)
+
+    async def run(self):
+        """Background flush loop: wakes every interval, or early when a batch is full."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                while self.pending():
+                    try:
+                        await asyncio.to_thread(self._write_next)
+                    except OSError:
+                        logger.exception("Failed to flush interaction events; retrying next interval")
+                        break
+        finally:
+            self._wakeup = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.buffer.stats(), "unwritten": len(self._unwritten), "flushed": self.flushed}
+
+
+_ingestor: Optional[EventIngestor] = None
+
+
+def get_ingestor() -> EventIngestor:
+    """Shared ingestor writing to PRIVYPULSE_EVENT_LOG (default data/interactions.log)."""
+    global _ingestor
+    if _ingestor is None:
+        _ingestor = EventIngestor(EventLog(os.environ.get("PRIVYPULSE_EVENT_LOG", DEFAULT_LOG_PATH)))
+    return _ingestor
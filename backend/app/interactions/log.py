@@ -0,0 +1,72 @@
+from typing import Any, Dict, List, Tuple
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; appends then rely on O_APPEND alone
+    fcntl = None
+
+
+class EventLog:
+    """
+    Append-only interaction log stored as compact JSON lines.
+    Each batch is written with a single write and (optionally) a single fsync,
+    i.e. a group commit. Byte offsets identify positions for incremental readers.
+    Workers share one log file, so appends hold an exclusive ``flock`` on it
+    as well as the in-process lock.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def append_batch(self, records: List[Dict[str, Any]]) -> int:
+        """Append records as one group commit; returns the number of bytes written."""
+        if not records:
+            return 0
+        payload = "".join(
+            json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+            for record in records
+        ).encode("utf-8")
+
+        with self._lock:
+            with open(self.path, "ab") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+                f.write(payload)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        return len(payload)
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def read_from(self, offset: int = 0, max_bytes: int = 16 * 1024 * 1024) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read complete records starting at a byte offset.
+        Returns (records, next_offset); a trailing partial line is left for the next read.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(max_bytes)
+        except FileNotFoundError:
+            return [], offset
+
+        end = chunk.rfind(b"\n") + 1
+        records = []
+        for line in chunk[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Skip a torn or corrupted line rather than stalling readers
+        return records, offset + end
@@ -0,0 +1,226 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import shutil
+import numpy as np
+
+from app.interactions.log import EventLog
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; compaction then runs unlocked
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+FOCUSES = ["general_research", "explanation", "comparison", "trend_analysis", "other"]
+SECTIONS = ["executive_summary", "key_findings", "implications", "recommendations", "other"]
+EVENT_TYPES = ["impression", "click", "dwell", "navigation"]
+
+DEFAULT_ROLLUP_DIR = os.path.join("data", "rollups")
+
+_FOCUS_INDEX = {name: i for i, name in enumerate(FOCUSES)}
+_SECTION_INDEX = {name: i for i, name in enumerate(SECTIONS)}
+_TYPE_INDEX = {name: i for i, name in enumerate(EVENT_TYPES)}
+
+
+class InteractionRollups:
+    """
+    Columnar aggregates of the interaction log.
+
+    ``counts[bucket, focus, section, event_type]`` holds event counts and
+    ``dwell_ms[bucket, focus, section]`` total dwell time per time bucket.
+    Compaction reads the log incrementally from the last processed offset.
+    Each snapshot is written to a new generation directory, then a CURRENT
+    file is swapped in atomically, so readers always see a consistent set of
+    arrays and offset.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ROLLUP_DIR, bucket_seconds: int = 3600,
+                 max_buckets: int = 24 * 90):
+        self.directory = directory
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.offset = 0
+        self.origin: Optional[int] = None  # absolute index of bucket 0
+        self.generation = 0
+        self.counts = np.zeros((0, len(FOCUSES), len(SECTIONS), len(EVENT_TYPES)), dtype=np.int64)
+        self.dwell_ms = np.zeros((0, len(FOCUSES), len(SECTIONS)), dtype=np.float64)
+
+    @property
+    def _current_path(self) -> str:
+        return os.path.join(self.directory, "CURRENT")
+
+    def load(self, mmap: bool = True) -> "InteractionRollups":
+        """Load the latest snapshot (memory-mapped by default) if one exists."""
+        try:
+            with open(self._current_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return self
+
+        generation_dir = os.path.join(self.directory, f"gen-{meta['generation']}")
+        mode = "r" if mmap else None
+        try:
+            counts = np.load(os.path.join(generation_dir, "counts.npy"), mmap_mode=mode)
+            dwell_ms = np.load(os.path.join(generation_dir, "dwell_ms.npy"), mmap_mode=mode)
+        except FileNotFoundError:
+            # A compaction replaced this generation after we read CURRENT; read the new one
+            return self.load(mmap)
+        self.counts, self.dwell_ms = counts, dwell_ms
+        self.offset = meta["offset"]
+        self.origin = meta["origin"]
+        self.generation = meta["generation"]
+        self.bucket_seconds = meta["bucket_seconds"]
+        return self
+
+    def _ensure_buckets(self, first: int, last: int):
+        """Grow the bucket axis to cover absolute buckets [first, last]."""
+        if self.origin is None:
+            self.origin = first
+        prepend = max(0, self.origin - first)
+        append = max(0, last - (self.origin + len(self.counts) - 1))
+        if prepend or append:
+            self.counts = np.pad(self.counts, ((prepend, append), (0, 0), (0, 0), (0, 0)))
+            self.dwell_ms = np.pad(self.dwell_ms, ((prepend, append), (0, 0), (0, 0)))
+            self.origin -= prepend
+
+        # Retention: keep only the most recent buckets
+        excess = len(self.counts) - self.max_buckets
+        if excess > 0:
+            self.counts = self.counts[excess:]
+            self.dwell_ms = self.dwell_ms[excess:]
+            self.origin += excess
+
+    def update(self, records: List[Dict[str, Any]]):
+        """Add a batch of event records to the aggregates."""
+        records = [r for r in records if r.get("type") in _TYPE_INDEX]
+        if not records:
+            return
+
+        other_focus, other_section = _FOCUS_INDEX["other"], _SECTION_INDEX["other"]
+        times = np.fromiter((r.get("rt", r.get("ts", 0.0)) for r in records), dtype=np.float64, count=len(records))
+        buckets = (times // self.bucket_seconds).astype(np.int64)
+        focus = np.fromiter((_FOCUS_INDEX.get(r.get("focus"), other_focus) for r in records), dtype=np.int64, count=len(records))
+        section = np.fromiter((_SECTION_INDEX.get(r.get("section"), other_section) for r in records), dtype=np.int64, count=len(records))
+        event_type = np.fromiter((_TYPE_INDEX[r["type"]] for r in records), dtype=np.int64, count=len(records))
+        dwell = np.fromiter((r.get("dwell_ms") or 0.0 for r in records), dtype=np.float64, count=len(records))
+
+        if not self.counts.flags.writeable:  # memory-mapped snapshot
+            self.counts = np.array(self.counts)
+            self.dwell_ms = np.array(self.dwell_ms)
+        self._ensure_buckets(int(buckets.min()), int(buckets.max()))
+
+        keep = buckets >= self.origin
+        index = buckets[keep] - self.origin
+        np.add.at(self.counts, (index, focus[keep], section[keep], event_type[keep]), 1)
+        np.add.at(self.dwell_ms, (index, focus[keep], section[keep]), dwell[keep])
+
+    def save(self):
+        """Write a new snapshot generation and atomically make it current."""
+        generation = self.generation + 1
+        generation_dir = os.path.join(self.directory, f"gen-{generation}")
+        os.makedirs(generation_dir, exist_ok=True)
+        np.save(os.path.join(generation_dir, "counts.npy"), self.counts)
+        np.save(os.path.join(generation_dir, "dwell_ms.npy"), self.dwell_ms)
+
+        meta = {
+            "generation": generation,
+            "offset": self.offset,
+            "origin": self.origin,
+            "bucket_seconds": self.bucket_seconds
+        }
+        tmp_path = self._current_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._current_path)
+
+        previous = os.path.join(self.directory, f"gen-{self.generation}")
+        self.generation = generation
+        shutil.rmtree(previous, ignore_errors=True)
+
+    def compact(self, log: EventLog) -> int:
+        """
+        Fold new log records since the last offset into the aggregates.
+        Returns the number of records processed. Concurrent compactions
+        (e.g. one per worker) are serialized with a lock file; losers skip.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "compact.lock"), "w") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0
+
+            # Another process may have advanced the snapshot since we last looked
+            self.load(mmap=False)
+            start_offset = self.offset
+            processed = 0
+            while True:
+                records, next_offset = log.read_from(self.offset)
+                if next_offset == self.offset:
+                    break
+                self.update(records)
+                self.offset = next_offset
+                processed += len(records)
+
+            if self.offset != start_offset:
+                self.save()
+            return processed
+
+    def section_stats(self, focus: Optional[str] = None, last_buckets: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+        """Impressions, clicks, click-through rate and mean dwell per result section."""
+        counts, dwell = self.counts, self.dwell_ms
+        if last_buckets:
+            counts, dwell = counts[-last_buckets:], dwell[-last_buckets:]
+        if focus is not None:
+            index = _FOCUS_INDEX.get(focus, _FOCUS_INDEX["other"])
+            counts, dwell = counts[:, index:index + 1], dwell[:, index:index + 1]
+
+        by_section = counts.sum(axis=(0, 1))  # (section, event_type)
+        dwell_by_section = dwell.sum(axis=(0, 1))
+        stats = {}
+        for i, section in enumerate(SECTIONS):
+            impressions = int(by_section[i, _TYPE_INDEX["impression"]])
+            clicks = int(by_section[i, _TYPE_INDEX["click"]])
+            dwells = int(by_section[i, _TYPE_INDEX["dwell"]])
+            stats[section] = {
+                "impressions": impressions,
+                "clicks": clicks,
+                "ctr": clicks / impressions if impressions else 0.0,
+                "mean_dwell_ms": float(dwell_by_section[i]) / dwells if dwells else 0.0
+            }
+        return stats
+
+
+_rollups: Optional[InteractionRollups] = None
+
+
+def get_rollups() -> InteractionRollups:
+    """Shared rollups in PRIVYPULSE_ROLLUP_DIR (default data/rollups), compacted by this worker."""
+    global _rollups
+    if _rollups is None:
+        _rollups = InteractionRollups(os.environ.get("PRIVYPULSE_ROLLUP_DIR", DEFAULT_ROLLUP_DIR)).load()
+    return _rollups
+
+
+def read_rollups() -> InteractionRollups:
+    """
+    Fresh memory-mapped view of the latest snapshot, whichever worker wrote
+    it (the shared instance only advances when this worker wins compaction).
+    """
+    return InteractionRollups(get_rollups().directory).load()
+
+
+async def run_compaction(rollups: InteractionRollups, log: EventLog, interval: float = 60.0):
+    """Periodically compact the interaction log into rollups, off the event loop."""
+    while True:
+        try:
+            await asyncio.to_thread(rollups.compact, log)
+        except Exception:
+            logger.exception("Interaction rollup compaction failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,123 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+import threading
+import numpy as np
+
+from app.nlp.hashing import hash_features, ngram_features
+from app.nlp.intent import FOCUS_LABELS
+
+
+RANKED_SECTIONS = ("key_findings", "implications", "recommendations")
+
+# Dwell time at which a dwell event counts as full engagement
+FULL_DWELL_MS = 30_000.0
+
+
+def event_reward(event: Dict[str, Any]) -> Optional[float]:
+    """Engagement target for an event: impressions are negatives, clicks and dwell positives."""
+    event_type = event.get("type")
+    if event_type == "click":
+        return 1.0
+    if event_type == "dwell":
+        return min(float(event.get("dwell_ms") or 0.0) / FULL_DWELL_MS, 1.0)
+    if event_type == "impression":
+        return 0.0
+    return None
+
+
+class AdaptiveRanker:
+    """
+    Online logistic model of engagement per query focus.
+
+    Items (findings, implications, recommendations) are represented by hashed
+    word unigram and bigram features scoped to their section, with one weight
+    vector per focus. Each interaction event applies one SGD
+    step touching only the item's active features, so updates cost time
+    proportional to the (bounded) item length and never retrain from scratch.
+    Items are reordered by predicted engagement; with no signal, the original
+    order is kept.
+    """
+
+    def __init__(self, n_features: int = 2048, learning_rate: float = 0.2, l2: float = 1e-4,
+                 focuses: Sequence[str] = FOCUS_LABELS):
+        self.n_features = n_features
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.weights: Dict[str, np.ndarray] = {
+            focus: np.zeros(n_features, dtype=np.float64) for focus in focuses
+        }
+        self.updates = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def features(self, section: str, item: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse hashed features of an item, scoped to the section it appears in."""
+        features = ngram_features(item, word_ngrams=(1, 2), char_ngrams=())
+        return hash_features([f"{section}|{f}" for f in features], self.n_features)
+
+    def _weights_for(self, focus: Optional[str]) -> Optional[np.ndarray]:
+        return self.weights.get(focus or "general_research")
+
+    def score(self, focus: str, section: str, items: Sequence[str]) -> np.ndarray:
+        """Predicted engagement logit of each item."""
+        weights = self._weights_for(focus)
+        if weights is None:
+            return np.zeros(len(items))
+        vectors = [self.features(section, item) for item in items]
+        with self._lock:
+            return np.array([weights[indices] @ values for indices, values in vectors])
+
+    def rerank(self, focus: str, section: str, items: List[str]) -> List[str]:
+        """Items ordered by predicted engagement; ties keep their original order."""
+        if len(items) < 2:
+            return list(items)
+        scores = self.score(focus, section, items)
+        order = sorted(range(len(items)), key=lambda i: (-scores[i], i))
+        return [items[i] for i in order]
+
+    def update(self, event: Dict[str, Any]) -> bool:
+        """Apply one SGD step for an event about a ranked item; returns whether it was used."""
+        reward = event_reward(event)
+        weights = self._weights_for(event.get("focus"))
+        item, section = event.get("item"), event.get("section")
+        if reward is None or weights is None or not item or section not in RANKED_SECTIONS:
+            return False
+
+        indices, values = self.features(section, item)
+        with self._lock:
+            logit = weights[indices] @ values
+            prediction = 1.0 / (1.0 + math.exp(-max(min(logit, 30.0), -30.0)))
+            gradient = (reward - prediction) * values - self.l2 * weights[indices]
+            weights[indices] += self.learning_rate * gradient
+            self.updates += 1
+        return True
+
+    def observe(self, records: List[Dict[str, Any]]):
+        """Event ingestor subscriber: apply a flushed batch of events incrementally."""
+        if sum(self.update(record) for record in records):
+            self.version += 1
+
+    def get_weights(self, focus: str) -> np.ndarray:
+        with self._lock:
+            return self.weights[focus].copy()
+
+    def set_weights(self, focus: str, weights: np.ndarray):
+        if weights.shape != (self.n_features,):
+            raise ValueError(f"Expected weights of shape ({self.n_features},), got {weights.shape}")
+        with self._lock:
+            self.weights[focus] = np.array(weights, dtype=np.float64)
+            self.version += 1
+
+
+_default_ranker: Optional[AdaptiveRanker] = None
+_default_lock = threading.Lock()
+
+
+def get_adaptive_ranker() -> AdaptiveRanker:
+    """Shared ranker fed by the interaction event stream."""
+    global _default_ranker
+    if _default_ranker is None:
+        with _default_lock:
+            if _default_ranker is None:
+                _default_ranker = AdaptiveRanker()
+    return _default_ranker
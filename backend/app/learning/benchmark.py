@@ -0,0 +1,179 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+import numpy as np
+
+from app.learning.compression import get_codec
+from app.learning.federated import FedAvgSimulator, client_data, peak_memory_kb
+from app.learning.privacy import PrivacyAccountant
+
+
+REPORT_VERSION = 2
+
+
+def _cpu_seconds() -> float:
+    """User + system CPU time of this process and its terminated children."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[Any, Dict[str, float]]:
+    """
+    Run ``fn`` and return its result with wall time, CPU time (including
+    worker processes that exit within ``fn``) and the peak memory traced in
+    this process only; allocations in worker processes are not seen.
+    """
+    tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+    try:
+        result = fn()
+        wall, cpu = time.perf_counter() - wall_start, _cpu_seconds() - cpu_start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "parent_peak_traced_kb": peak // 1024,
+    }
+
+
+def train_centralized(n_clients: int, n_features: int, max_samples: int, seed: int,
+                      epochs: int = 100, learning_rate: float = 50.0,
+                      l2: float = 1e-4) -> Tuple[np.ndarray, int]:
+    """
+    Train the ranking model on the pooled data of every client with
+    full-batch gradient descent. Returns the weights and the bytes that
+    uploading the raw interactions would take (int32 feature ids + labels).
+    """
+    data = [client_data(i, seed, n_features, max_samples) for i in range(n_clients)]
+    indices = np.concatenate([d[0] for d in data])
+    labels = np.concatenate([d[1] for d in data])
+    flat = indices.ravel()
+
+    weights = np.zeros(n_features)
+    for _ in range(epochs):
+        logits = weights[indices].sum(axis=1)
+        error = 1.0 / (1.0 + np.exp(-logits)) - labels
+        gradient = np.bincount(flat, weights=np.repeat(error, indices.shape[1]), minlength=n_features)
+        weights -= learning_rate * (gradient / len(labels) + l2 * weights)
+
+    upload_bytes = indices.size * 4 + labels.size
+    return weights, int(upload_bytes)
+
+
+def run_benchmark(n_clients: int = 1000, n_features: int = 2048, max_samples: int = 32,
+                  rounds: int = 20, client_fraction: float = 0.1, max_workers: Optional[int] = None,
+                  clip_norm: Optional[float] = None, noise_multiplier: float = 0.0,
+                  compression: str = "none", topk_fraction: float = 0.05,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Train the same ranking model centrally and with FedAvg on identical
+    synthetic interaction data and report accuracy and cost for both.
+    """
+    evaluator = FedAvgSimulator(n_clients=n_clients, n_features=n_features,
+                                max_samples=max_samples, seed=seed)
+
+    (central_weights, central_bytes), central_cost = measure(
+        lambda: train_centralized(n_clients, n_features, max_samples, seed)
+    )
+
+    accountant = PrivacyAccountant() if clip_norm and noise_multiplier > 0 else None
+    simulator = FedAvgSimulator(
+        n_clients=n_clients, n_features=n_features, max_samples=max_samples,
+        client_fraction=client_fraction, max_workers=max_workers, seed=seed,
+        clip_norm=clip_norm, noise_multiplier=noise_multiplier, accountant=accountant,
+        trace_memory=True, codec=None if compression == "none" else
+        get_codec(compression, **({"fraction": topk_fraction} if compression == "topk" else {}))
+    )
+
+    def train_federated() -> Dict[str, Any]:
+        try:
+            return simulator.run(rounds)
+        finally:
+            simulator.shutdown()  # so worker CPU time is accounted to this run
+
+    federated, federated_cost = measure(train_federated)
+    # Each participant downloads the float32 model and uploads its (possibly compressed) update
+    round_bytes = [r["clients"] * n_features * 4 + r["upload_bytes"] for r in federated["rounds"]]
+    # Pool workers trace their own chunks; bound the memory of the chunks running at once
+    worker_peak = max(r["worker_peak_traced_kb"] for r in federated["rounds"])
+    concurrent_peak = max(r["worker_peak_traced_kb"] * r["concurrent_workers"] for r in federated["rounds"])
+
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "clients": n_clients,
+            "features": n_features,
+            "max_samples": max_samples,
+            "rounds": rounds,
+            "client_fraction": client_fraction,
+            "workers": max_workers,
+            "clip_norm": clip_norm,
+            "noise_multiplier": noise_multiplier,
+            "compression": compression,
+            "seed": seed,
+        },
+        "centralized": {
+            "accuracy": evaluator.evaluate(central_weights),
+            **central_cost,
+            "peak_traced_kb": central_cost["parent_peak_traced_kb"],
+            "bytes_communicated": central_bytes,
+        },
+        "federated": {
+            "accuracy": evaluator.evaluate(federated["weights"]),
+            **federated_cost,
+            "worker_peak_traced_kb": worker_peak,
+            "peak_traced_kb": federated_cost["parent_peak_traced_kb"] + concurrent_peak,
+            "bytes_communicated": sum(round_bytes),
+            "bytes_per_round": round_bytes,
+            "round_ms": [r["duration_ms"] for r in federated["rounds"]],
+            "epsilon": accountant.budget()["epsilon"] if accountant else None,
+        },
+        "peak_rss_kb": peak_memory_kb(),
+    }
+
+
+def main():
+    """Run the centralized vs federated comparison and write a JSON report."""
+    parser = argparse.ArgumentParser(description="Compare centralized and federated training of the ranking model")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--features", type=int, default=2048)
+    parser.add_argument("--max-samples", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--client-fraction", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (0 trains in-process)")
+    parser.add_argument("--clip-norm", type=float, default=None)
+    parser.add_argument("--noise-multiplier", type=float, default=0.0)
+    parser.add_argument("--compression", choices=["none", "int8", "topk"], default="none")
+    parser.add_argument("--topk-fraction", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON report (printed to stdout when omitted)")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        n_clients=args.clients, n_features=args.features, max_samples=args.max_samples,
+        rounds=args.rounds, client_fraction=args.client_fraction, max_workers=args.workers,
+        clip_norm=args.clip_norm, noise_multiplier=args.noise_multiplier,
+        compression=args.compression, topk_fraction=args.topk_fraction, seed=args.seed
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from typing import Optional, Tuple
+import numpy as np
+
+
+class UpdateCodec:
+    """
+    Fixed-size binary encoding of a batch of client updates.
+
+    Every client's update becomes one record of a NumPy structured dtype, so
+    a batch is a single bytes buffer that the aggregator decodes with one
+    ``np.frombuffer`` call. Each record carries the client's aggregation
+    weight.
+    """
+
+    name = "none"
+
+    def record_dtype(self, n_features: int) -> np.dtype:
+        return np.dtype([("weight", "<f4"), ("values", "<f4", (n_features,))])
+
+    def _fill(self, records: np.ndarray, updates: np.ndarray, rng: np.random.Generator):
+        records["values"] = updates
+
+    def _values(self, records: np.ndarray, n_features: int) -> np.ndarray:
+        return records["values"].astype(np.float64)
+
+    def encode(self, updates: np.ndarray, weights: np.ndarray,
+               rng: Optional[np.random.Generator] = None) -> bytes:
+        """Encode updates of shape (clients, features) with their weights."""
+        records = np.zeros(len(updates), dtype=self.record_dtype(updates.shape[1]))
+        records["weight"] = weights
+        self._fill(records, updates, rng or np.random.default_rng())
+        return records.tobytes()
+
+    def decode(self, payload: bytes, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Decode a payload into (updates, weights)."""
+        records = np.frombuffer(payload, dtype=self.record_dtype(n_features))
+        return self._values(records, n_features), records["weight"].astype(np.float64)
+
+    def decode_sum(self, payload: bytes, n_features: int) -> Tuple[np.ndarray, float]:
+        """Weighted sum of the updates in a payload and the total weight."""
+        values, weights = self.decode(payload, n_features)
+        return weights @ values, float(weights.sum())
+
+    def payload_size(self, n_clients: int, n_features: int) -> int:
+        return n_clients * self.record_dtype(n_features).itemsize
+
+
+class QuantizedCodec(UpdateCodec):
+    """
+    8-bit stochastic quantization: each update is mapped onto 256 evenly
+    spaced levels between its min and max, rounding up with probability equal
+    to the fractional part so the decoded update is unbiased.
+    """
+
+    name = "int8"
+
+    def record_dtype(self, n_features: int) -> np.dtype:
+        return np.dtype([("weight", "<f4"), ("low", "<f4"), ("step", "<f4"),
+                         ("codes", "u1", (n_features,))])
+
+    def _fill(self, records: np.ndarray, updates: np.ndarray, rng: np.random.Generator):
+        low = updates.min(axis=1, keepdims=True)
+        step = (updates.max(axis=1, keepdims=True) - low) / 255.0
+        step[step == 0] = 1.0
+        scaled = (updates - low) / step
+        codes = np.floor(scaled + rng.random(scaled.shape))
+        records["low"] = low[:, 0]
+        records["step"] = step[:, 0]
+        records["codes"] = np.clip(codes, 0, 255).astype(np.uint8)
+
+    def _values(self, records: np.ndarray, n_features: int) -> np.ndarray:
+        return (records["low"][:, None].astype(np.float64)
+                + records["codes"] * records["step"][:, None].astype(np.float64))
+
+
+class TopKCodec(UpdateCodec):
+    """Top-k sparsification: only the ``fraction`` largest-magnitude coordinates are sent."""
+
+    name = "topk"
+
+    def __init__(self, fraction: float = 0.05):
+        self.fraction = fraction
+
+    def k(self, n_features: int) -> int:
+        return max(1, int(round(self.fraction * n_features)))
+
+    def record_dtype(self, n_features: int) -> np.dtype:
+        k = self.k(n_features)
+        return np.dtype([("weight", "<f4"), ("indices", "<i4", (k,)), ("values", "<f4", (k,))])
+
+    def _fill(self, records: np.ndarray, updates: np.ndarray, rng: np.random.Generator):
+        k = self.k(updates.shape[1])
+        top = np.argpartition(np.abs(updates), -k, axis=1)[:, -k:]
+        records["indices"] = top
+        records["values"] = np.take_along_axis(updates, top, axis=1)
+
+    def _values(self, records: np.ndarray, n_features: int) -> np.ndarray:
+        dense = np.zeros((len(records), n_features))
+        np.put_along_axis(dense, records["indices"].astype(np.intp), records["values"], axis=1)
+        return dense
+
+    def decode_sum(self, payload: bytes, n_features: int) -> Tuple[np.ndarray, float]:
+        # Scatter weighted values straight into the sum without densifying each update
+        records = np.frombuffer(payload, dtype=self.record_dtype(n_features))
+        weights = records["weight"].astype(np.float64)
+        total = np.bincount(records["indices"].ravel(),
+                            weights=(records["values"] * weights[:, None]).ravel(),
+                            minlength=n_features)
+        return total, float(weights.sum())
+
+
+CODECS = {
+    "none": UpdateCodec,
+    "int8": QuantizedCodec,
+    "topk": TopKCodec,
+}
+
+
+def get_codec(name: str, **kwargs) -> UpdateCodec:
+    try:
+        return CODECS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown update compression: {name}") from None
@@ -0,0 +1,410 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import time
+import tracemalloc
+import numpy as np
+
+from app.learning.adaptive_ranker import AdaptiveRanker
+from app.learning.compression import UpdateCodec
+from app.learning.privacy import PrivacyAccountant, add_gaussian_noise, clip_updates, get_accountant
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak memory is then not reported
+    resource = None
+
+
+def peak_memory_kb() -> Dict[str, int]:
+    """Peak resident set size of this process and of its finished children, in KiB."""
+    if resource is None:
+        return {"self": 0, "children": 0}
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def true_weights(seed: int, n_features: int, density: float = 0.1) -> np.ndarray:
+    """Sparse ground-truth engagement weights shared by every synthetic client."""
+    rng = np.random.default_rng([seed, 0])
+    return rng.normal(0.0, 2.0, n_features) * (rng.random(n_features) < density)
+
+
+def client_data(client_id: int, seed: int, n_features: int, max_samples: int,
+                active_features: int = 16) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deterministic synthetic interactions of one client: each sample is an item
+    with ``active_features`` hashed features and a click label drawn from the
+    shared ground truth. Clients hold between 1 and ``max_samples`` samples.
+    Returns (feature indices of shape (samples, active), labels).
+    """
+    rng = np.random.default_rng([seed, client_id + 1])
+    n_samples = int(rng.integers(1, max_samples + 1))
+    indices = rng.integers(0, n_features, (n_samples, active_features))
+    logits = true_weights(seed, n_features)[indices].sum(axis=1)
+    labels = (rng.random(n_samples) < 1.0 / (1.0 + np.exp(-logits))).astype(np.float32)
+    return indices, labels
+
+
+def _stack_clients(client_ids: Sequence[int], seed: int, n_features: int,
+                   max_samples: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Dense (clients, samples, features) design tensor, labels and padding mask."""
+    X = np.zeros((len(client_ids), max_samples, n_features), dtype=np.float32)
+    y = np.zeros((len(client_ids), max_samples), dtype=np.float32)
+    mask = np.zeros((len(client_ids), max_samples), dtype=np.float32)
+    for row, client_id in enumerate(client_ids):
+        indices, labels = client_data(client_id, seed, n_features, max_samples)
+        n = len(labels)
+        np.add.at(X[row], (np.repeat(np.arange(n), indices.shape[1]), indices.ravel()), 1.0)
+        y[row, :n] = labels
+        mask[row, :n] = 1.0
+    return X, y, mask
+
+
+def local_train(weights: np.ndarray, X: np.ndarray, y: np.ndarray, mask: np.ndarray,
+                epochs: int, learning_rate: float, l2: float = 1e-4) -> np.ndarray:
+    """
+    Full-batch logistic regression steps for a stack of clients at once.
+    Every client starts from the global ``weights``; returns the local weights
+    with shape (clients, features).
+    """
+    W = np.tile(weights.astype(np.float32), (X.shape[0], 1))
+    counts = np.maximum(mask.sum(axis=1, keepdims=True), 1.0)
+    for _ in range(epochs):
+        logits = np.einsum("csf,cf->cs", X, W)
+        error = (1.0 / (1.0 + np.exp(-logits)) - y) * mask
+        gradient = np.einsum("csf,cs->cf", X, error) / counts + l2 * W
+        W -= learning_rate * gradient
+    return W
+
+
+def decode_clipped(codec: UpdateCodec, payload: bytes, n_features: int,
+                   clip_norm: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a payload into (updates, weights), re-clipping each update to
+    ``clip_norm`` since quantization can push a clipped update past it.
+    """
+    decoded, client_weights = codec.decode(payload, n_features)
+    if clip_norm:
+        decoded = clip_updates(decoded, clip_norm)
+    return decoded, client_weights
+
+
+def _train_chunk(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train one chunk of clients and return its weighted update sum, total
+    weight, client count, sample count and the summed loss of the global
+    model on their data.
+
+    Updates are weighted by sample count, or, when ``clip_norm`` is set for
+    differential privacy, clipped per client and weighted uniformly so each
+    client's contribution to the sum is bounded.
+
+    With a ``codec``, the chunk instead returns the encoded updates as one
+    payload (what the clients would upload) plus each client's new
+    error-feedback residual: the part of its update the encoding dropped,
+    which is added back before encoding in its next round. With
+    ``clip_norm``, the corrected update is clipped again before encoding.
+
+    With ``trace_memory`` in a worker process, the chunk also reports its
+    peak traced allocations (in-process chunks are covered by the caller's
+    own tracing).
+    """
+    traced = task.get("trace_memory", False) and not tracemalloc.is_tracing()
+    if traced:
+        tracemalloc.start()
+    try:
+        result = _train_clients(task)
+        if traced:
+            result["peak_traced_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        if traced:
+            tracemalloc.stop()
+    return result
+
+
+def _train_clients(task: Dict[str, Any]) -> Dict[str, Any]:
+    weights, client_ids = task["weights"], task["client_ids"]
+    X, y, mask = _stack_clients(client_ids, task["seed"], len(weights), task["max_samples"])
+    logits = np.einsum("csf,f->cs", X, weights)
+    loss = float(((np.logaddexp(0.0, logits) - y * logits) * mask).sum())
+
+    local = local_train(weights, X, y, mask, task["epochs"], task["learning_rate"])
+    updates = local - weights  # (clients, features)
+    samples = mask.sum(axis=1)
+    if task["clip_norm"]:
+        updates = clip_updates(updates, task["clip_norm"])
+        client_weights = np.ones(len(client_ids))
+    else:
+        client_weights = samples
+    result = {
+        "update_sum": client_weights @ updates,
+        "weight": float(client_weights.sum()),
+        "clients": len(client_ids),
+        "samples": float(samples.sum()),
+        "loss": loss,
+    }
+
+    codec: Optional[UpdateCodec] = task.get("codec")
+    if codec is not None:
+        residuals = task.get("residuals")
+        corrected = updates if residuals is None else updates + residuals
+        if task["clip_norm"]:
+            # Residuals can push the corrected update past the bound; the server re-clips decoded ones too
+            corrected = clip_updates(corrected, task["clip_norm"])
+        rng = np.random.default_rng([task["seed"], task["round"], client_ids[0]])
+        payload = codec.encode(corrected, client_weights, rng)
+        decoded = decode_clipped(codec, payload, len(weights), task["clip_norm"])[0]
+        result["payload"] = payload
+        result["client_ids"] = client_ids
+        result["residuals"] = (corrected - decoded).astype(np.float32) if residuals is not None else None
+    return result
+
+
+class FedAvgSimulator:
+    """
+    Federated averaging over simulated clients.
+
+    Each round samples a fraction of clients, trains them locally in chunks
+    (in a process pool when ``max_workers`` is not 0) and averages their
+    updates weighted by sample count. Workers return one partial weighted sum
+    per chunk, so server memory stays proportional to the model size rather
+    than the number of clients. The model is the adaptive ranker's logistic
+    model, so trained weights can be loaded into it directly.
+
+    With ``clip_norm`` and ``noise_multiplier`` set, rounds follow DP-FedAvg:
+    per-client clipping, Gaussian noise on the aggregated sum, and a privacy
+    accountant charged once per round. Rounds without noise are charged too,
+    which marks the accountant's guarantee as unbounded.
+
+    With a ``codec``, clients upload compressed updates (see
+    app.learning.compression); the server decodes each chunk's payload in one
+    vectorized pass, and rounds report the compression ratio and the error of
+    the decoded aggregate. ``error_feedback`` keeps each client's compression
+    residual and folds it into its next update.
+
+    ``trace_memory`` makes pool workers trace their allocations, and rounds
+    report the largest chunk's peak and how many chunks ran at once.
+    """
+
+    def __init__(self, n_clients: int = 1000, n_features: int = 2048, max_samples: int = 32,
+                 client_fraction: float = 0.1, local_epochs: int = 5, learning_rate: float = 0.5,
+                 chunk_size: int = 64, max_workers: Optional[int] = None, seed: int = 0,
+                 clip_norm: Optional[float] = None, noise_multiplier: float = 0.0,
+                 accountant: Optional[PrivacyAccountant] = None,
+                 codec: Optional[UpdateCodec] = None, error_feedback: bool = True,
+                 trace_memory: bool = False):
+        if noise_multiplier > 0 and not clip_norm:
+            raise ValueError("noise_multiplier requires clip_norm: noise is calibrated to the clipping bound")
+        self.n_clients = n_clients
+        self.n_features = n_features
+        self.max_samples = max_samples
+        self.client_fraction = client_fraction
+        self.local_epochs = local_epochs
+        self.learning_rate = learning_rate
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.seed = seed
+        self.clip_norm = clip_norm
+        self.noise_multiplier = noise_multiplier
+        self.accountant = accountant
+        self.codec = codec
+        self.error_feedback = error_feedback
+        self.trace_memory = trace_memory
+        self.rounds_run = 0
+        self._residuals: Dict[int, np.ndarray] = {}
+        self._rng = np.random.default_rng(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use and reuse it across rounds."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def sample_clients(self, n: Optional[int] = None) -> np.ndarray:
+        """Sample ``n`` distinct clients (``client_fraction`` of the population by default)."""
+        if n is None:
+            n = max(1, int(round(self.client_fraction * self.n_clients)))
+        return np.sort(self._rng.choice(self.n_clients, size=min(n, self.n_clients), replace=False))
+
+    def _task(self, weights: np.ndarray, client_ids: List[int]) -> Dict[str, Any]:
+        task = {
+            "weights": weights,
+            "client_ids": client_ids,
+            "seed": self.seed,
+            "round": self.rounds_run,
+            "max_samples": self.max_samples,
+            "epochs": self.local_epochs,
+            "learning_rate": self.learning_rate,
+            "clip_norm": self.clip_norm,
+            "trace_memory": self.trace_memory,
+        }
+        if self.codec is not None:
+            task["codec"] = self.codec
+            if self.error_feedback:
+                zeros = np.zeros(self.n_features, dtype=np.float32)
+                task["residuals"] = np.stack([self._residuals.get(c, zeros) for c in client_ids])
+        return task
+
+    def _map_chunks(self, weights: np.ndarray, clients: np.ndarray) -> List[Dict[str, Any]]:
+        tasks = [
+            self._task(weights, clients[i:i + self.chunk_size].tolist())
+            for i in range(0, len(clients), self.chunk_size)
+        ]
+        if self.max_workers == 0:
+            return [_train_chunk(task) for task in tasks]
+        try:
+            return list(self._get_pool().map(_train_chunk, tasks))
+        except (BrokenProcessPool, OSError):
+            # Fall back to training in-process if the pool is unavailable
+            self._pool = None
+            return [_train_chunk(task) for task in tasks]
+
+    def _decode_sum(self, payload: bytes) -> np.ndarray:
+        """Weighted update sum of a chunk payload; with DP every decoded update is re-clipped."""
+        if not self.clip_norm:
+            return self.codec.decode_sum(payload, self.n_features)[0]
+        decoded, client_weights = decode_clipped(self.codec, payload, self.n_features, self.clip_norm)
+        return client_weights @ decoded
+
+    def _train(self, weights: np.ndarray, clients: np.ndarray) -> Tuple[np.ndarray, float, Dict[str, Any]]:
+        """
+        Train ``clients`` from ``weights`` and aggregate what they upload:
+        the (clipped, when DP is on) weighted update sum, decoded from the
+        compressed payloads when a codec is set, the total weight and stats.
+        """
+        partials = self._map_chunks(np.asarray(weights, dtype=np.float32), np.asarray(clients))
+        self.rounds_run += 1
+
+        update_sum = np.sum([p["update_sum"] for p in partials], axis=0)
+        total_weight = sum(p["weight"] for p in partials)
+        total_samples = sum(p["samples"] for p in partials)
+        upload_bytes = int(len(clients) * self.n_features * 4)
+
+        stats: Dict[str, Any] = {}
+        if self.codec is not None:
+            exact_sum = update_sum
+            update_sum = np.sum([self._decode_sum(p["payload"]) for p in partials], axis=0)
+            if self.error_feedback:
+                for p in partials:
+                    self._residuals.update(zip(p["client_ids"], p["residuals"]))
+            payload_bytes = sum(len(p["payload"]) for p in partials)
+            stats["compression"] = {
+                "codec": self.codec.name,
+                "ratio": upload_bytes / payload_bytes,
+                "aggregate_error": float(np.linalg.norm(update_sum - exact_sum)
+                                         / max(np.linalg.norm(exact_sum), 1e-12)),
+            }
+            upload_bytes = payload_bytes
+        if self.trace_memory:
+            pool_size = 0 if self.max_workers == 0 else (self.max_workers or os.cpu_count() or 1)
+            stats["worker_peak_traced_kb"] = max((p.get("peak_traced_kb", 0) for p in partials), default=0)
+            stats["concurrent_workers"] = min(pool_size, len(partials))
+
+        stats.update({
+            "clients": int(sum(p["clients"] for p in partials)),
+            "samples": int(total_samples),
+            "train_loss": sum(p["loss"] for p in partials) / max(total_samples, 1.0),
+            "upload_bytes": upload_bytes,
+        })
+        return update_sum, total_weight, stats
+
+    def privatize(self, update_sum: np.ndarray, n_clients: int) -> np.ndarray:
+        """
+        Add Gaussian noise to an aggregated update of ``n_clients`` clients
+        (when DP is configured) and charge the step to the accountant.
+        Called once per server update.
+        """
+        noised = bool(self.clip_norm) and self.noise_multiplier > 0
+        if noised:
+            update_sum = add_gaussian_noise(update_sum, self.clip_norm, self.noise_multiplier, self._rng)
+        if self.accountant is not None:
+            # An un-noised round releases raw updates and makes the budget unbounded
+            self.accountant.step(n_clients / self.n_clients, self.noise_multiplier if noised else 0.0)
+        return update_sum
+
+    def local_updates(self, weights: np.ndarray, clients: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Train ``clients`` from ``weights`` and return their weighted update sum
+        and total weight, clipped and compressed as in rounds but without
+        noise. Schedulers that combine several calls into one server update
+        pass the combined sum through ``privatize``.
+        """
+        update_sum, total_weight, _ = self._train(weights, clients)
+        return update_sum, total_weight
+
+    def run_round(self, weights: np.ndarray,
+                  clients: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Run one FedAvg round over ``clients`` (a fresh sample by default);
+        returns the new global weights and a round report.
+        """
+        start = time.perf_counter()
+        clients = self.sample_clients() if clients is None else np.asarray(clients)
+        update_sum, total_weight, stats = self._train(weights, clients)
+        update_sum = self.privatize(update_sum, len(clients))
+        new_weights = weights + update_sum / max(total_weight, 1.0)
+
+        report = {
+            **stats,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "peak_memory_kb": peak_memory_kb(),
+        }
+        if self.accountant is not None:
+            report["epsilon"] = self.accountant.budget()["epsilon"]
+        return new_weights, report
+
+    def run(self, rounds: int, weights: Optional[np.ndarray] = None,
+            eval_clients: int = 0) -> Dict[str, Any]:
+        """
+        Run several rounds from ``weights`` (zeros by default). With
+        ``eval_clients``, each round also reports held-out accuracy.
+        """
+        weights = np.zeros(self.n_features) if weights is None else np.array(weights, dtype=np.float64)
+        reports = []
+        for round_index in range(rounds):
+            weights, report = self.run_round(weights)
+            if eval_clients:
+                report["accuracy"] = self.evaluate(weights, eval_clients)
+            reports.append({"round": round_index + 1, **report})
+        return {"weights": weights, "rounds": reports}
+
+    def evaluate(self, weights: np.ndarray, n_clients: int = 200) -> float:
+        """Click prediction accuracy on clients outside the training population."""
+        holdout = range(self.n_clients, self.n_clients + n_clients)
+        correct = total = 0
+        for client_id in holdout:
+            indices, labels = client_data(client_id, self.seed, self.n_features, self.max_samples)
+            predictions = weights[indices].sum(axis=1) > 0
+            correct += int((predictions == (labels > 0.5)).sum())
+            total += len(labels)
+        return correct / total if total else 0.0
+
+
+def train_ranker(ranker: AdaptiveRanker, focus: str, rounds: int, **kwargs) -> Dict[str, Any]:
+    """
+    Train the ranker's model for a focus with FedAvg and install the result.
+    Rounds are charged to the shared privacy accountant unless another is
+    given; training without noise leaves its budget unbounded.
+    """
+    kwargs.setdefault("accountant", get_accountant())
+    simulator = FedAvgSimulator(n_features=ranker.n_features, **kwargs)
+    try:
+        result = simulator.run(rounds, ranker.get_weights(focus))
+    finally:
+        simulator.shutdown()
+    ranker.set_weights(focus, result["weights"])
+    return result
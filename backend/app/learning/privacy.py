@@ -0,0 +1,140 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+from functools import lru_cache
+import math
+import threading
+import numpy as np
+
+
+# Integer Renyi orders; the best one for a given budget is picked at conversion time
+DEFAULT_ORDERS: Tuple[int, ...] = tuple(range(2, 65)) + (80, 96, 128, 256)
+DEFAULT_DELTA = 1e-5
+
+
+def clip_updates(updates: np.ndarray, clip_norm: float) -> np.ndarray:
+    """Scale each row (one client update) down to at most ``clip_norm`` in L2 norm."""
+    norms = np.linalg.norm(updates, axis=1, keepdims=True)
+    return updates * np.minimum(1.0, clip_norm / np.maximum(norms, 1e-12))
+
+
+def add_gaussian_noise(aggregate: np.ndarray, clip_norm: float, noise_multiplier: float,
+                       rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Gaussian mechanism on a sum of clipped updates (noise std = multiplier x clip norm)."""
+    rng = rng or np.random.default_rng()
+    return aggregate + rng.normal(0.0, noise_multiplier * clip_norm, aggregate.shape)
+
+
+def _log_add(a: float, b: float) -> float:
+    if a == -math.inf:
+        return b
+    if b == -math.inf:
+        return a
+    return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+
+def _rdp_order(q: float, sigma: float, alpha: int) -> float:
+    """
+    RDP of the sampled Gaussian mechanism at an integer order (Mironov et al.,
+    2019): log(sum_k C(a,k) (1-q)^(a-k) q^k exp((k^2-k)/(2 sigma^2))) / (a-1),
+    evaluated in log space.
+    """
+    if q == 1.0:
+        return alpha / (2 * sigma ** 2)
+    log_a = -math.inf
+    for k in range(alpha + 1):
+        log_binomial = math.lgamma(alpha + 1) - math.lgamma(k + 1) - math.lgamma(alpha - k + 1)
+        log_term = (log_binomial + k * math.log(q) + (alpha - k) * math.log1p(-q)
+                    + (k * k - k) / (2 * sigma ** 2))
+        log_a = _log_add(log_a, log_term)
+    return log_a / (alpha - 1)
+
+
+@lru_cache(maxsize=256)
+def rdp_per_step(sampling_rate: float, noise_multiplier: float,
+                 orders: Tuple[int, ...] = DEFAULT_ORDERS) -> np.ndarray:
+    """RDP of one round at each order; cached since rounds reuse the same parameters."""
+    if noise_multiplier <= 0:
+        return np.full(len(orders), math.inf)
+    if sampling_rate <= 0:
+        return np.zeros(len(orders))
+    rdp = np.array([_rdp_order(sampling_rate, noise_multiplier, a) for a in orders])
+    rdp.setflags(write=False)
+    return rdp
+
+
+def rdp_to_epsilon(rdp: np.ndarray, orders: Sequence[int], delta: float) -> Tuple[float, int]:
+    """Convert cumulative RDP to (epsilon, best order) for a target delta."""
+    orders_array = np.asarray(orders, dtype=np.float64)
+    epsilons = rdp + math.log(1.0 / delta) / (orders_array - 1)
+    best = int(np.argmin(epsilons))
+    return float(epsilons[best]), int(orders[best])
+
+
+class PrivacyAccountant:
+    """
+    Renyi differential privacy accountant for DP federated rounds.
+
+    Each round adds the (cached) per-order RDP of the subsampled Gaussian
+    mechanism to a running total, an O(orders) vector addition; epsilon is
+    derived from the total only when requested. A round without noise has
+    infinite RDP, so once one is recorded the guarantee is unbounded.
+    """
+
+    def __init__(self, orders: Sequence[int] = DEFAULT_ORDERS, delta: float = DEFAULT_DELTA):
+        self.orders = tuple(orders)
+        self.delta = delta
+        self.rounds = 0
+        self._rdp = np.zeros(len(self.orders))
+        self._lock = threading.Lock()
+
+    def step(self, sampling_rate: float, noise_multiplier: float, rounds: int = 1):
+        """
+        Record ``rounds`` rounds with the given client sampling rate and noise;
+        a ``noise_multiplier`` of 0 records rounds that released raw updates.
+        """
+        if rounds <= 0:
+            return
+        rdp = rdp_per_step(float(sampling_rate), float(noise_multiplier), self.orders)
+        with self._lock:
+            self._rdp += rounds * rdp
+            self.rounds += rounds
+
+    def epsilon(self, delta: Optional[float] = None) -> Tuple[float, Optional[int]]:
+        """
+        Cumulative epsilon (and the order achieving it) at ``delta``: 0 before
+        any round and infinite once a round added no noise.
+        """
+        with self._lock:
+            if not self.rounds:
+                return 0.0, None
+            rdp = self._rdp.copy()
+        return rdp_to_epsilon(rdp, self.orders, delta or self.delta)
+
+    def reset(self):
+        with self._lock:
+            self._rdp[:] = 0.0
+            self.rounds = 0
+
+    def budget(self, delta: Optional[float] = None) -> Dict[str, Any]:
+        """Spent budget; epsilon is None (unbounded) when some round added no noise."""
+        delta = delta or self.delta
+        epsilon, order = self.epsilon(delta)
+        return {
+            "epsilon": epsilon if math.isfinite(epsilon) else None,
+            "delta": delta,
+            "rounds": self.rounds,
+            "order": order,
+        }
+
+
+_accountant: Optional[PrivacyAccountant] = None
+_accountant_lock = threading.Lock()
+
+
+def get_accountant() -> PrivacyAccountant:
+    """Shared accountant for the federated training run by this process."""
+    global _accountant
+    if _accountant is None:
+        with _accountant_lock:
+            if _accountant is None:
+                _accountant = PrivacyAccountant()
+    return _accountant
@@ -0,0 +1,239 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+import heapq
+import math
+import time
+import numpy as np
+
+from app.learning.federated import FedAvgSimulator
+
+
+LATENCY_KINDS = ("constant", "exponential", "lognormal", "pareto")
+
+
+class LatencyModel:
+    """
+    Client round-trip latency (model download, local training and upload) in
+    virtual seconds. ``spread`` is the log-space sigma for ``lognormal`` and
+    the inverse tail index for ``pareto`` (larger means heavier stragglers).
+    Dropped clients never respond and get an infinite latency.
+    """
+
+    def __init__(self, kind: str = "lognormal", median: float = 1.0, spread: float = 0.8,
+                 dropout: float = 0.0, seed: int = 0):
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.median = median
+        self.spread = spread
+        self.dropout = dropout
+        self._rng = np.random.default_rng(seed)
+
+    def sample(self, n: int) -> np.ndarray:
+        rng = self._rng
+        if self.kind == "constant":
+            latency = np.full(n, self.median)
+        elif self.kind == "exponential":
+            latency = rng.exponential(self.median / math.log(2), n)
+        elif self.kind == "lognormal":
+            latency = self.median * np.exp(self.spread * rng.standard_normal(n))
+        else:
+            alpha = 1.0 / self.spread
+            latency = self.median / 2 ** (1 / alpha) * (1.0 + rng.pareto(alpha, n))
+        if self.dropout:
+            latency[rng.random(n) < self.dropout] = np.inf
+        return latency
+
+
+def time_to_accuracy(report: Dict[str, Any], target: float) -> Optional[float]:
+    """First virtual time at which a schedule reached ``target`` accuracy."""
+    for t, accuracy in report["timeline"]:
+        if accuracy >= target:
+            return t
+    return None
+
+
+class RoundScheduler:
+    """
+    Runs a FedAvg simulator on a virtual clock driven by client latencies.
+
+    - ``run_sync``: classic rounds that wait for every sampled client (dropped
+      clients are given up on after ``timeout``).
+    - ``run_deadline``: over-select clients and aggregate whoever reports
+      before the round deadline.
+    - ``run_async``: keep a fixed number of clients training; every
+      ``buffer_size`` arrivals are averaged into the model with each update
+      down-weighted by its staleness (model versions since the client
+      started) as ``(1 + staleness) ** -staleness_exponent``.
+
+    Every schedule reports virtual time, client updates applied, throughput
+    and an accuracy timeline so they can be compared on equal terms.
+    """
+
+    def __init__(self, simulator: FedAvgSimulator, latency: LatencyModel, eval_clients: int = 100):
+        self.simulator = simulator
+        self.latency = latency
+        self.eval_clients = eval_clients
+        self._rng = np.random.default_rng(simulator.seed + 1)
+
+    def _clients_per_round(self) -> int:
+        return max(1, int(round(self.simulator.client_fraction * self.simulator.n_clients)))
+
+    def _initial(self, weights: Optional[np.ndarray]) -> np.ndarray:
+        n_features = self.simulator.n_features
+        return np.zeros(n_features) if weights is None else np.array(weights, dtype=np.float64)
+
+    def _report(self, mode: str, weights: np.ndarray, clock: float, updates: int, steps: int,
+                timeline: List[Tuple[float, float]], started: float) -> Dict[str, Any]:
+        return {
+            "mode": mode,
+            "weights": weights,
+            "virtual_time_s": round(clock, 4),
+            "client_updates": updates,
+            "server_steps": steps,
+            "updates_per_s": updates / clock if clock else 0.0,
+            "accuracy": timeline[-1][1] if timeline else self.simulator.evaluate(weights, self.eval_clients),
+            "timeline": timeline,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _run_rounds(self, mode: str, rounds: int, weights: Optional[np.ndarray],
+                    n_sampled: int, cutoff: float) -> Dict[str, Any]:
+        """Shared loop of the round-based schedules: aggregate clients finishing by ``cutoff``."""
+        started = time.perf_counter()
+        weights = self._initial(weights)
+        clock, updates, timeline = 0.0, 0, []
+        for _ in range(rounds):
+            clients = self.simulator.sample_clients(n_sampled)
+            latency = self.latency.sample(len(clients))
+            arrived = latency <= cutoff
+            # The round ends when the last client arrives, or at the cutoff if anyone is missing
+            clock += cutoff if not arrived.all() else float(latency.max())
+            if arrived.any():
+                weights, _ = self.simulator.run_round(weights, clients[arrived])
+                updates += int(arrived.sum())
+            timeline.append((round(clock, 4), self.simulator.evaluate(weights, self.eval_clients)))
+        return self._report(mode, weights, clock, updates, rounds, timeline, started)
+
+    def run_sync(self, rounds: int, weights: Optional[np.ndarray] = None,
+                 timeout: float = 30.0) -> Dict[str, Any]:
+        return self._run_rounds("sync", rounds, weights, self._clients_per_round(), timeout)
+
+    def run_deadline(self, rounds: int, deadline: float, weights: Optional[np.ndarray] = None,
+                     over_selection: float = 1.3) -> Dict[str, Any]:
+        n_sampled = int(math.ceil(over_selection * self._clients_per_round()))
+        return self._run_rounds("deadline", rounds, weights, n_sampled, deadline)
+
+    def run_async(self, client_updates: int, weights: Optional[np.ndarray] = None,
+                  concurrency: Optional[int] = None, buffer_size: int = 10,
+                  staleness_exponent: float = 0.5, server_lr: float = 1.0,
+                  timeout: float = 30.0, max_dispatches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Asynchronous buffered aggregation until at least ``client_updates``
+        updates are applied. At most ``max_dispatches`` clients are started
+        (10x ``client_updates`` by default), so heavy dropout ends the run
+        with fewer updates instead of looping forever; a partial buffer left
+        at that point is still applied. Each server step goes through the
+        simulator's clipping, compression and noise like a synchronous round.
+        """
+        started = time.perf_counter()
+        weights = self._initial(weights)
+        concurrency = min(concurrency or self._clients_per_round(), self.simulator.n_clients)
+        max_dispatches = max_dispatches or 10 * client_updates
+
+        version = 0
+        snapshots = {0: weights}
+        in_flight: Dict[int, int] = {}  # client -> model version it trains on
+        events: List[Tuple[float, int, int, bool]] = []  # (finish time, seq, client, responded)
+        seq = 0
+
+        def dispatch(now: float):
+            nonlocal seq
+            if seq >= max_dispatches:
+                return
+            client = int(self._rng.integers(self.simulator.n_clients))
+            while client in in_flight:
+                client = int(self._rng.integers(self.simulator.n_clients))
+            latency = float(self.latency.sample(1)[0])
+            responded = math.isfinite(latency)
+            in_flight[client] = version
+            heapq.heappush(events, (now + (latency if responded else timeout), seq, client, responded))
+            seq += 1
+
+        for _ in range(concurrency):
+            dispatch(0.0)
+
+        clock, applied, steps, timeline = 0.0, 0, 0, []
+        buffer: List[Tuple[int, int]] = []
+        while applied < client_updates and (events or buffer):
+            if events:
+                clock, _, client, responded = heapq.heappop(events)
+                base = in_flight.pop(client)
+                if responded:
+                    buffer.append((client, base))
+
+            if len(buffer) >= buffer_size or (buffer and not events):
+                by_version = defaultdict(list)
+                for buffered_client, buffered_version in buffer:
+                    by_version[buffered_version].append(buffered_client)
+
+                step = np.zeros_like(weights)
+                total_weight = 0.0
+                for base_version, clients in by_version.items():
+                    update_sum, weight = self.simulator.local_updates(snapshots[base_version], np.array(clients))
+                    step += (1.0 + version - base_version) ** -staleness_exponent * update_sum
+                    total_weight += weight
+                # Staleness factors are at most 1, so each client's clipped contribution stays bounded
+                step = self.simulator.privatize(step, len(buffer))
+                weights = weights + server_lr * step / max(total_weight, 1.0)
+
+                version += 1
+                snapshots[version] = weights
+                applied += len(buffer)
+                steps += 1
+                buffer = []
+                # Only versions some client is still training on need to be kept
+                live = set(in_flight.values()) | {version}
+                snapshots = {v: w for v, w in snapshots.items() if v in live}
+                timeline.append((round(clock, 4), self.simulator.evaluate(weights, self.eval_clients)))
+
+            dispatch(clock)
+
+        return self._report("async", weights, clock, applied, steps, timeline, started)
+
+
+def compare_schedules(rounds: int = 20, deadline: Optional[float] = None,
+                      latency: Optional[Dict[str, Any]] = None, target_accuracy: Optional[float] = None,
+                      buffer_size: int = 10, **simulator_kwargs) -> Dict[str, Any]:
+    """
+    Run synchronous, deadline and asynchronous schedules with the same
+    simulator configuration and latency distribution, giving async the same
+    number of client updates that synchronous FedAvg applied. Reports each
+    schedule plus throughput speed-ups and time to ``target_accuracy``
+    relative to synchronous rounds.
+    """
+    latency = latency or {}
+    simulator_kwargs.setdefault("max_workers", 0)
+
+    def scheduler() -> RoundScheduler:
+        return RoundScheduler(FedAvgSimulator(**simulator_kwargs), LatencyModel(**latency))
+
+    reports = {}
+    runner = scheduler()
+    reports["sync"] = runner.run_sync(rounds)
+    # Default deadline: the median-latency multiple that most clients meet
+    deadline = deadline or 2.0 * latency.get("median", 1.0)
+    reports["deadline"] = scheduler().run_deadline(rounds, deadline)
+    reports["async"] = scheduler().run_async(reports["sync"]["client_updates"], buffer_size=buffer_size)
+
+    sync_rate = reports["sync"]["updates_per_s"]
+    comparison = {
+        mode: {
+            "throughput_speedup": report["updates_per_s"] / sync_rate if sync_rate else None,
+            "time_to_accuracy": time_to_accuracy(report, target_accuracy) if target_accuracy else None,
+        }
+        for mode, report in reports.items()
+    }
+    for report in reports.values():
+        report.pop("weights")
+    return {"schedules": reports, "comparison": comparison}
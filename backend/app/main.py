@@ -1,19 +1,82 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.query import router as query_router
+from app.api.events import router as events_router
+from app.api.privacy import router as privacy_router
+from app.api.admin import router as admin_router
+from app.api.ws import router as ws_router
+from app.api.middleware import ALLOWED_ORIGINS, CompressionMiddleware, ETagMiddleware
+from app.analytics.sketches import get_analytics_store, run_snapshots
+from app.cache.prewarm import Prewarmer, get_live_traffic
+from app.cache.response_cache import get_response_cache
+from app.agents import coordinator
+from app.interactions.ingest import get_ingestor
+from app.interactions.rollups import get_rollups, run_compaction
+from app.learning.adaptive_ranker import get_adaptive_ranker
 
-app = FastAPI(title = "PrivyPulse", description = "Privacy-Preserving Market Research Assistant")
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load agents and prime their caches before serving traffic
+    coordinator.warmup()
+    ingestor = get_ingestor()
+    analytics = get_analytics_store()
+    # Learn result ordering from interaction events as they are flushed, off the request path
+    ingestor.subscribe(get_adaptive_ranker().observe)
+    # Keep hot queries cached in the background, yielding to live requests
+    prewarmer = Prewarmer(
+        get_response_cache(),
+        analytics.analytics.hot_examples,
+        coordinator.refresh_workflow,
+        traffic = get_live_traffic(),
+    )
+    prewarmer.start()
+    background = [
+        asyncio.create_task(ingestor.run()),
+        asyncio.create_task(run_compaction(get_rollups(), ingestor.log)),
+        asyncio.create_task(run_snapshots(analytics)),
+    ]
+    yield
+    await asyncio.to_thread(prewarmer.stop, 5.0)
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions = True)
+    # A cancelled flush may still be writing on its thread; flush() waits for it
+    try:
+        await asyncio.to_thread(ingestor.flush)
+    except OSError:
+        logger.exception("Failed to flush %d interaction events at shutdown", ingestor.pending())
+    await asyncio.to_thread(analytics.snapshot)
+    coordinator.shutdown()
+
+
+app = FastAPI(title = "PrivyPulse", description = "Privacy-Preserving Market Research Assistant", lifespan = lifespan)
 
 # Configure CORS to allow frontend requests
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# Added last so it runs first: ETags are computed on the uncompressed body and
+# compression then tags them with the negotiated coding
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(query_router)
+app.include_router(events_router)
+app.include_router(privacy_router)
+app.include_router(admin_router)
+app.include_router(ws_router)
 
 @app.get("/")
 def health_check():
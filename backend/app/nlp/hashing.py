@@ -0,0 +1,59 @@
+from typing import List, Sequence, Tuple
+import re
+import zlib
+import numpy as np
+
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Always-on feature so every text has at least one active feature (acts as a bias)
+BIAS_FEATURE = "__bias__"
+
+
+def ngram_features(text: str, word_ngrams: Tuple[int, ...] = (1, 2),
+                   char_ngrams: Tuple[int, ...] = (3,)) -> List[str]:
+    """
+    Word and character n-gram features of a text.
+    Character n-grams are taken inside word boundaries ("<word>") so they
+    stay robust to typos and inflections without matching across words.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    features = [BIAS_FEATURE]
+
+    for n in word_ngrams:
+        features.extend("w:" + " ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+
+    for n in char_ngrams:
+        for word in words:
+            padded = f"<{word}>"
+            features.extend("c:" + padded[i:i + n] for i in range(len(padded) - n + 1))
+
+    return features
+
+
+def hash_features(features: Sequence[str], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash string features into ``n_features`` buckets.
+    Returns (indices, values) of the L2-normalized sparse count vector.
+    """
+    buckets = np.fromiter(
+        (zlib.crc32(f.encode()) % n_features for f in features),
+        dtype=np.int64, count=len(features)
+    )
+    indices, counts = np.unique(buckets, return_counts=True)
+    values = counts.astype(np.float64)
+    values /= np.sqrt(np.dot(values, values))
+    return indices, values
+
+
+def hashed_vector(text: str, n_features: int, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse hashed n-gram vector of a text as (indices, values)."""
+    return hash_features(ngram_features(text, **kwargs), n_features)
+
+
+def to_dense(vectors: Sequence[Tuple[np.ndarray, np.ndarray]], n_features: int) -> np.ndarray:
+    """Stack sparse (indices, values) vectors into a dense matrix."""
+    matrix = np.zeros((len(vectors), n_features), dtype=np.float64)
+    for row, (indices, values) in enumerate(vectors):
+        matrix[row, indices] = values
+    return matrix
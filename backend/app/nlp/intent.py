@@ -0,0 +1,234 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from functools import lru_cache
+import argparse
+import json
+import os
+import threading
+import numpy as np
+
+from app.nlp.hashing import hashed_vector, to_dense
+
+
+FOCUS_LABELS = ["general_research", "explanation", "comparison", "trend_analysis"]
+
+# Labeled seed queries used when no trained model file is configured
+SEED_QUERIES: List[Tuple[str, str]] = [
+    # explanation
+    ("Explain the growth of electric vehicle market", "explanation"),
+    ("Explain how cloud computing pricing works", "explanation"),
+    ("Explain the rise of generative AI startups", "explanation"),
+    ("Describe the semiconductor supply chain", "explanation"),
+    ("Describe the growth drivers of the fintech sector", "explanation"),
+    ("Describe how subscription business models work", "explanation"),
+    ("What is the market size for cybersecurity solutions?", "explanation"),
+    ("What is edge computing?", "explanation"),
+    ("What is a SaaS business model", "explanation"),
+    ("What does the ride sharing industry look like", "explanation"),
+    ("How does the advertising market work", "explanation"),
+    ("Why is the battery market important", "explanation"),
+    ("Can you explain the streaming industry", "explanation"),
+    ("Give me an overview of the insurance technology market", "explanation"),
+    ("Explain the main players in renewable energy", "explanation"),
+    ("What is the role of data brokers", "explanation"),
+    # comparison
+    ("Compare AWS vs Azure cloud services", "comparison"),
+    ("Compare cloud computing services AWS vs Azure", "comparison"),
+    ("Compare SaaS vs PaaS market growth", "comparison"),
+    ("Tesla versus BYD electric vehicle sales", "comparison"),
+    ("Difference between iOS and Android market share", "comparison"),
+    ("What is the difference between public and private cloud", "comparison"),
+    ("Netflix vs. Disney streaming subscribers", "comparison"),
+    ("How does Shopify compare to Amazon for merchants", "comparison"),
+    ("Compare the growth of solar and wind energy", "comparison"),
+    ("Which is better for startups, Stripe or PayPal", "comparison"),
+    ("Intel vs AMD data center market share", "comparison"),
+    ("Contrast the European and US fintech markets", "comparison"),
+    ("Uber compared with Lyft in ride sharing", "comparison"),
+    ("Google Cloud versus Oracle Cloud pricing", "comparison"),
+    ("Compare trends in coffee chains Starbucks vs Dunkin", "comparison"),
+    # trend_analysis
+    ("What are the trends in cloud computing market?", "trend_analysis"),
+    ("What are the current trends in artificial intelligence market?", "trend_analysis"),
+    ("What are the trends in AI market?", "trend_analysis"),
+    ("What are the trends in renewable energy market?", "trend_analysis"),
+    ("What are the market trends for cloud computing?", "trend_analysis"),
+    ("Forecast for the electric vehicle market through 2030", "trend_analysis"),
+    ("Growth outlook for the cybersecurity industry", "trend_analysis"),
+    ("How fast is the smart home market growing", "trend_analysis"),
+    ("Emerging trends in digital payments", "trend_analysis"),
+    ("AI market trends 2026", "trend_analysis"),
+    ("Trends in the wearable technology market", "trend_analysis"),
+    ("Projected growth of the plant based food market", "trend_analysis"),
+    ("Is demand for remote work software rising or declining", "trend_analysis"),
+    ("Market growth forecast for quantum computing", "trend_analysis"),
+    ("Where is the gaming industry heading over the next five years", "trend_analysis"),
+    # general_research
+    ("Random query without specific keywords", "general_research"),
+    ("Test market research query", "general_research"),
+    ("Top companies in the cybersecurity market", "general_research"),
+    ("Market research on pet food brands", "general_research"),
+    ("Information about the European drone industry", "general_research"),
+    ("Key players in the logistics sector", "general_research"),
+    ("Customer segments for online education", "general_research"),
+    ("Research the Brazilian coffee export market", "general_research"),
+    ("List of major telecom operators in Asia", "general_research"),
+    ("Pricing strategies used by meal kit companies", "general_research"),
+    ("Regulations affecting crypto exchanges", "general_research"),
+    ("Funding rounds for biotech startups", "general_research"),
+    ("Consumer sentiment toward smart speakers", "general_research"),
+    ("Supply chain risks for apparel retailers", "general_research"),
+    ("Market data on sports betting", "general_research"),
+]
+
+
+class IntentClassifier:
+    """
+    Linear (softmax) classifier of query focus over hashed word and character
+    n-gram features.
+
+    Single queries are scored by gathering the weight columns of their active
+    features; batches are scored with one gather and a segmented sum, so no
+    dense feature matrix is built at prediction time. Predictions for repeated
+    queries are memoized.
+    """
+
+    def __init__(self, n_features: int = 4096, labels: Sequence[str] = FOCUS_LABELS,
+                 min_confidence: float = 0.4, fallback: str = "general_research",
+                 memo_size: int = 4096):
+        self.n_features = n_features
+        self.labels = list(labels)
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+        self.weights = np.zeros((len(self.labels), n_features), dtype=np.float64)
+        self.bias = np.zeros(len(self.labels), dtype=np.float64)
+        self.predict = lru_cache(maxsize=memo_size)(self._predict)
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _vector(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        return hashed_vector(self._normalize(query), self.n_features)
+
+    def fit(self, queries: Sequence[str], labels: Sequence[str], epochs: int = 300,
+            learning_rate: float = 2.0, l2: float = 1e-4) -> "IntentClassifier":
+        """Train with full-batch gradient descent on the softmax cross-entropy."""
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        X = to_dense([self._vector(q) for q in queries], self.n_features)
+        Y = np.zeros((len(queries), len(self.labels)))
+        Y[np.arange(len(queries)), [label_index[label] for label in labels]] = 1.0
+
+        W = np.zeros_like(self.weights)
+        b = np.zeros_like(self.bias)
+        for _ in range(epochs):
+            logits = X @ W.T + b
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            error = (probs - Y) / len(queries)
+            W -= learning_rate * (error.T @ X + l2 * W)
+            b -= learning_rate * error.sum(axis=0)
+
+        self.weights, self.bias = W, b
+        self.predict.cache_clear()
+        return self
+
+    def _scores(self, vectors: Sequence[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Class probabilities for a batch of sparse vectors (one row per vector)."""
+        indices = np.concatenate([v[0] for v in vectors])
+        values = np.concatenate([v[1] for v in vectors])
+        offsets = np.cumsum([0] + [len(v[0]) for v in vectors[:-1]])
+
+        # Gather active weight columns and sum them per query segment
+        logits = np.add.reduceat(self.weights[:, indices] * values, offsets, axis=1).T + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def _label(self, probs: np.ndarray) -> str:
+        best = int(np.argmax(probs))
+        return self.labels[best] if probs[best] >= self.min_confidence else self.fallback
+
+    def predict_proba(self, query: str) -> Dict[str, float]:
+        probs = self._scores([self._vector(query)])[0]
+        return dict(zip(self.labels, probs.tolist()))
+
+    def _predict(self, query: str) -> str:
+        indices, values = self._vector(query)
+        logits = self.weights[:, indices] @ values + self.bias
+        # Softmax is monotonic, so only the winning probability needs computing
+        best = int(np.argmax(logits))
+        confidence = 1.0 / np.exp(logits - logits[best]).sum()
+        return self.labels[best] if confidence >= self.min_confidence else self.fallback
+
+    def predict_batch(self, queries: Sequence[str]) -> List[str]:
+        """Classify many queries with one vectorized scoring pass."""
+        if not queries:
+            return []
+        probs = self._scores([self._vector(q) for q in queries])
+        return [self._label(row) for row in probs]
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path, weights=self.weights, bias=self.bias, labels=np.array(self.labels),
+            n_features=self.n_features, min_confidence=self.min_confidence
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with np.load(path) as model:
+            classifier = cls(
+                n_features=int(model["n_features"]),
+                labels=[str(label) for label in model["labels"]],
+                min_confidence=float(model["min_confidence"])
+            )
+            classifier.weights = model["weights"]
+            classifier.bias = model["bias"]
+        return classifier
+
+
+_default_classifier: Optional[IntentClassifier] = None
+_default_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Shared classifier: loaded from PRIVYPULSE_INTENT_MODEL when set,
+    otherwise trained on the seed queries on first use.
+    """
+    global _default_classifier
+    if _default_classifier is None:
+        with _default_lock:
+            if _default_classifier is None:
+                model_path = os.environ.get("PRIVYPULSE_INTENT_MODEL")
+                if model_path and os.path.exists(model_path):
+                    _default_classifier = IntentClassifier.load(model_path)
+                else:
+                    queries, labels = zip(*SEED_QUERIES)
+                    _default_classifier = IntentClassifier().fit(queries, labels)
+    return _default_classifier
+
+
+def main():
+    """Train a classifier offline from a JSON-lines file of {"query", "focus"} records."""
+    parser = argparse.ArgumentParser(description="Train the query focus classifier")
+    parser.add_argument("--data", help="JSON lines with 'query' and 'focus' fields (defaults to seed queries)")
+    parser.add_argument("--output", required=True, help="Path of the .npz model to write")
+    parser.add_argument("--epochs", type=int, default=300)
+    args = parser.parse_args()
+
+    examples = list(SEED_QUERIES)
+    if args.data:
+        with open(args.data) as f:
+            examples = [(r["query"], r["focus"]) for r in map(json.loads, f) if r]
+
+    queries, labels = zip(*examples)
+    classifier = IntentClassifier().fit(queries, labels, epochs=args.epochs)
+    classifier.save(args.output)
+
+    accuracy = np.mean([p == label for p, label in zip(classifier.predict_batch(queries), labels)])
+    print(f"Trained on {len(queries)} queries, training accuracy {accuracy:.3f} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
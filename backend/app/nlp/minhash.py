@@ -0,0 +1,96 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import zlib
+import numpy as np
+
+from app.nlp.tfidf import TOKEN_PATTERN
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHashDeduplicator:
+    """
+    Near-duplicate detection with MinHash signatures over word shingles and
+    banded LSH, so each passage is only compared with passages that share a
+    band bucket. Passages are processed in order and the first occurrence of
+    each near-duplicate cluster is kept. Passages too short to form a full
+    shingle are only collapsed when their words match exactly, and passages
+    without words are always kept.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3,
+                 threshold: float = 0.7, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=(num_perm, 1), dtype=np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        k = self.shingle_size
+        shingles = {" ".join(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1))}
+        return np.fromiter(
+            (zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature: the minimum of each permuted shingle hash."""
+        hashes = self._shingle_hashes(text)
+        permuted = ((self._a * hashes + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=1)
+
+    def unique_indices(self, texts: Sequence[str]) -> List[int]:
+        """Indices of the texts to keep, in order, after collapsing near duplicates."""
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        signatures: Dict[int, np.ndarray] = {}
+        kept = []
+
+        short_seen = set()
+
+        for index, text in enumerate(texts):
+            tokens = tuple(TOKEN_PATTERN.findall(text.lower()))
+            if len(tokens) < self.shingle_size:
+                # A single degenerate shingle says nothing about similarity
+                if not tokens or tokens not in short_seen:
+                    kept.append(index)
+                    short_seen.add(tokens)
+                continue
+
+            sig = self.signature(text)
+            keys = [
+                (band, sig[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)
+            ]
+
+            candidates = {c for key in keys for c in buckets.get(key, ())}
+            if any(np.mean(signatures[c] == sig) >= self.threshold for c in candidates):
+                continue
+
+            kept.append(index)
+            signatures[index] = sig
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+
+        return kept
+
+    def deduplicate(self, texts: Sequence[str]) -> List[str]:
+        return [texts[i] for i in self.unique_indices(texts)]
+
+
+_default_deduplicator: Optional[MinHashDeduplicator] = None
+
+
+def get_deduplicator() -> MinHashDeduplicator:
+    """Shared deduplicator so the permutation tables are built once."""
+    global _default_deduplicator
+    if _default_deduplicator is None:
+        _default_deduplicator = MinHashDeduplicator()
+    return _default_deduplicator
@@ -0,0 +1,66 @@
+from typing import Dict, List, Sequence, Tuple
+from collections import defaultdict
+import numpy as np
+
+from app.nlp.tfidf import SparseVector
+
+
+def similarity_edges(vectors: Sequence[SparseVector]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the sparse cosine-similarity graph of normalized vectors as COO arrays.
+    Only sentence pairs that share a term are visited, via an inverted index.
+    """
+    postings: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+    for i, vector in enumerate(vectors):
+        for term_id, weight in vector.items():
+            postings[term_id].append((i, weight))
+
+    pair_weights: Dict[Tuple[int, int], float] = defaultdict(float)
+    for entries in postings.values():
+        for a in range(len(entries)):
+            i, wi = entries[a]
+            for b in range(a + 1, len(entries)):
+                j, wj = entries[b]
+                pair_weights[(i, j)] += wi * wj
+
+    if not pair_weights:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float64)
+
+    pairs = np.fromiter(
+        (index for pair in pair_weights for index in pair),
+        dtype=np.int64, count=2 * len(pair_weights)
+    ).reshape(-1, 2)
+    weights = np.fromiter(pair_weights.values(), dtype=np.float64, count=len(pair_weights))
+
+    # Similarity is symmetric: emit both directions
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    return rows, cols, np.concatenate([weights, weights])
+
+
+def textrank(vectors: Sequence[SparseVector], damping: float = 0.85,
+             max_iter: int = 50, tol: float = 1e-6) -> np.ndarray:
+    """
+    Score sentences with weighted PageRank over their similarity graph.
+    Power iteration stops early once the L1 change falls below ``tol``.
+    """
+    n = len(vectors)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    rows, cols, weights = similarity_edges(vectors)
+    out_weight = np.bincount(rows, weights=weights, minlength=n)
+    transition = weights / out_weight[rows] if len(weights) else weights
+    dangling = out_weight == 0
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(cols, weights=transition * scores[rows], minlength=n)
+        updated = (1.0 - damping) / n + damping * (spread + scores[dangling].sum() / n)
+        converged = np.abs(updated - scores).sum() < tol
+        scores = updated
+        if converged:
+            break
+
+    return scores
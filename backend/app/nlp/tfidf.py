@@ -0,0 +1,154 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import Counter, OrderedDict
+import hashlib
+import heapq
+import math
+import re
+import threading
+import zlib
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "how", "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to",
+    "was", "were", "what", "which", "who", "why", "will", "with", "about", "into",
+    "current", "currently", "me", "tell", "there", "their", "these", "those"
+])
+
+SparseVector = Dict[int, float]
+
+
+def _normalize_term(term: str) -> str:
+    """Cheap plural folding so "trends" and "trend" share a term."""
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stop words removed and plurals folded."""
+    return [
+        _normalize_term(t) for t in TOKEN_PATTERN.findall(text.lower())
+        if t not in STOP_WORDS
+    ]
+
+
+class TfidfRanker:
+    """
+    Ranks candidate texts against a query with sparse TF-IDF vectors.
+
+    Terms are interned into a shared vocabulary, and the IDF table of each
+    distinct candidate set is kept in a small LRU so repeated documents
+    (common with repeated queries) skip the document-frequency pass.
+    """
+
+    def __init__(self, max_vocabulary: int = 100_000, hash_buckets: int = 4096,
+                 idf_cache_size: int = 128):
+        self.max_vocabulary = max_vocabulary
+        self.hash_buckets = hash_buckets
+        self.idf_cache_size = idf_cache_size
+        self._vocabulary: Dict[str, int] = {}
+        self._idf_cache: "OrderedDict[str, Tuple[List[Counter], Dict[int, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _term_id(self, term: str) -> int:
+        """Intern a term; once the vocabulary is full, new terms share hashed ids."""
+        term_id = self._vocabulary.get(term)
+        if term_id is None:
+            # Assign under the lock so concurrent new terms never share an id
+            with self._lock:
+                term_id = self._vocabulary.get(term)
+                if term_id is None and len(self._vocabulary) < self.max_vocabulary:
+                    term_id = self._vocabulary[term] = len(self._vocabulary)
+            if term_id is None:
+                term_id = self.max_vocabulary + zlib.crc32(term.encode()) % self.hash_buckets
+        return term_id
+
+    def _term_counts(self, text: str) -> Counter:
+        return Counter(self._term_id(t) for t in tokenize(text))
+
+    def _corpus_tables(self, texts: Sequence[str]) -> Tuple[List[Counter], Dict[int, float]]:
+        """Term counts per text plus the smoothed IDF table, cached per corpus."""
+        digest = hashlib.sha1("\x1e".join(texts).encode()).hexdigest()
+
+        with self._lock:
+            cached = self._idf_cache.get(digest)
+            if cached is not None:
+                self._idf_cache.move_to_end(digest)
+                return cached
+
+        counts = [self._term_counts(text) for text in texts]
+        document_frequency: Counter = Counter()
+        for text_counts in counts:
+            document_frequency.update(text_counts.keys())
+
+        n_docs = len(texts)
+        idf = {
+            term_id: math.log((1 + n_docs) / (1 + df)) + 1.0
+            for term_id, df in document_frequency.items()
+        }
+
+        with self._lock:
+            self._idf_cache[digest] = (counts, idf)
+            if len(self._idf_cache) > self.idf_cache_size:
+                self._idf_cache.popitem(last=False)
+
+        return counts, idf
+
+    @staticmethod
+    def _weigh(counts: Counter, idf: Dict[int, float]) -> SparseVector:
+        """L2-normalized TF-IDF weights for one set of term counts."""
+        vector = {
+            term_id: (1.0 + math.log(tf)) * idf[term_id]
+            for term_id, tf in counts.items() if term_id in idf
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if norm == 0:
+            return {}
+        return {term_id: w / norm for term_id, w in vector.items()}
+
+    def vectorize(self, texts: Sequence[str]) -> Tuple[List[SparseVector], Dict[int, float]]:
+        """Compute TF-IDF vectors for a batch of texts in one pass."""
+        counts, idf = self._corpus_tables(texts)
+        return [self._weigh(c, idf) for c in counts], idf
+
+    def query_vector(self, query: str, idf: Dict[int, float]) -> SparseVector:
+        return self._weigh(self._term_counts(query), idf)
+
+    @staticmethod
+    def similarity(a: SparseVector, b: SparseVector) -> float:
+        """Cosine similarity of two normalized sparse vectors."""
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(w * b.get(term_id, 0.0) for term_id, w in a.items())
+
+    def rank(self, query: str, texts: Sequence[str], k: int,
+             priors: Optional[Sequence[float]] = None) -> List[Tuple[int, float]]:
+        """
+        Return the indices and scores of the ``k`` texts most similar to the query.
+        ``priors`` are added to the similarity; ties keep document order.
+        """
+        if not texts or k <= 0:
+            return []
+
+        vectors, idf = self.vectorize(texts)
+        query_vec = self.query_vector(query, idf)
+
+        scored = (
+            (self.similarity(query_vec, vector) + (priors[i] if priors else 0.0), -i)
+            for i, vector in enumerate(vectors)
+        )
+        return [(-neg_i, score) for score, neg_i in heapq.nlargest(k, scored)]
+
+
+_default_ranker: Optional[TfidfRanker] = None
+
+
+def get_ranker() -> TfidfRanker:
+    """Shared ranker so vocabulary and IDF tables are reused across requests."""
+    global _default_ranker
+    if _default_ranker is None:
+        _default_ranker = TfidfRanker()
+    return _default_ranker
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+
+
+class InteractionEvent(BaseModel):
+    type: Literal["impression", "click", "dwell", "navigation"]
+    ts: float = Field(ge=0)
+    focus: Optional[str] = Field(None, max_length=32)
+    section: Optional[str] = Field(None, max_length=32)
+    item: Optional[str] = Field(None, max_length=500)
+    position: Optional[int] = Field(None, ge=0)
+    dwell_ms: Optional[float] = Field(None, ge=0)
+
+
+class EventBatch(BaseModel):
+    events: List[InteractionEvent] = Field(max_length=1000)
+
+
+class EventBatchResponse(BaseModel):
+    accepted: int
+    dropped: int
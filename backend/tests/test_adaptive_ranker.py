@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from app.learning.adaptive_ranker import AdaptiveRanker, event_reward
+from app.agents.synthesis_agent import SynthesisAgent
+
+
+class TestAdaptiveRanker:
+    """Test suite for AdaptiveRanker"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.ranker = AdaptiveRanker(n_features=512)
+        self.items = [
+            "Continue monitoring key metrics and trends",
+            "Consider further research in identified opportunity areas",
+            "Leverage identified trends for strategic planning",
+        ]
+    
+    def _event(self, event_type, item, focus="trend_analysis", section="recommendations", **extra):
+        return {"type": event_type, "item": item, "focus": focus, "section": section, **extra}
+    
+    def test_untrained_ranker_keeps_order(self):
+        """Test that items keep their original order without any signal"""
+        assert self.ranker.rerank("trend_analysis", "recommendations", self.items) == self.items
+    
+    def test_event_rewards(self):
+        """Test the engagement target of each event type"""
+        assert event_reward({"type": "click"}) == 1.0
+        assert event_reward({"type": "impression"}) == 0.0
+        assert event_reward({"type": "dwell", "dwell_ms": 15000}) == 0.5
+        assert event_reward({"type": "dwell", "dwell_ms": 10 ** 6}) == 1.0
+        assert event_reward({"type": "navigation"}) is None
+    
+    def test_clicks_promote_item(self):
+        """Test that clicked items move ahead of ignored ones for that focus"""
+        records = [self._event("impression", item) for item in self.items] * 5
+        records += [self._event("click", self.items[2])] * 5
+        self.ranker.observe(records)
+        
+        assert self.ranker.rerank("trend_analysis", "recommendations", self.items)[0] == self.items[2]
+        # Other focuses and sections are unaffected
+        assert self.ranker.rerank("comparison", "recommendations", self.items) == self.items
+        assert self.ranker.rerank("trend_analysis", "implications", self.items) == self.items
+    
+    def test_update_ignores_unrankable_events(self):
+        """Test that events without an item or ranked section are skipped"""
+        assert not self.ranker.update(self._event("click", ""))
+        assert not self.ranker.update(self._event("click", "x", section="executive_summary"))
+        assert not self.ranker.update(self._event("navigation", "x"))
+        assert not self.ranker.update(self._event("click", "x", focus="unknown"))
+        assert self.ranker.update(self._event("click", "x"))
+        assert self.ranker.updates == 1
+    
+    def test_version_changes_on_learning(self):
+        """Test that the version only advances when a batch changes the weights"""
+        self.ranker.observe([self._event("navigation", "x")])
+        assert self.ranker.version == 0
+        self.ranker.observe([self._event("click", "x")])
+        assert self.ranker.version == 1
+    
+    def test_get_and_set_weights(self):
+        """Test exporting and replacing the weights of a focus"""
+        self.ranker.update(self._event("click", "x"))
+        weights = self.ranker.get_weights("trend_analysis")
+        assert np.any(weights)
+        
+        self.ranker.set_weights("comparison", weights)
+        assert np.array_equal(self.ranker.get_weights("comparison"), weights)
+        with pytest.raises(ValueError):
+            self.ranker.set_weights("comparison", np.zeros(3))
+    
+    def test_synthesis_orders_recommendations(self):
+        """Test that the synthesis agent applies the learned ordering"""
+        agent = SynthesisAgent(ranker=self.ranker)
+        plan = {"query": "AI trends", "focus": "trend_analysis"}
+        default = agent._generate_recommendations("analysis", plan)
+        
+        self.ranker.observe([self._event("click", default[-1])] * 5)
+        
+        assert agent._generate_recommendations("analysis", plan)[0] == default[-1]
+        assert agent.ranking_version == 1
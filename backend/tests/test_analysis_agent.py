@@ -1,4 +1,7 @@
 import pytest
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from app.agents import analysis_agent
 from app.agents.analysis_agent import AnalysisAgent
 
 
@@ -86,3 +89,88 @@ class TestAnalysisAgent:
             task_plan = {**self.test_task_plan, "focus": focus}
             result = self.agent.analyze_data(self.test_data, task_plan)
             assert result["success"] is True
+    
+    def test_split_shards_on_sentence_boundaries(self):
+        """Test that shards reassemble to the original data"""
+        agent = AnalysisAgent(shard_threshold=100, shard_size=50)
+        data = "Market growth reached 12% this year. " * 20
+        shards = agent._split_shards(data)
+        
+        assert len(shards) > 1
+        assert "".join(shards) == data
+        assert all(shard.rstrip().endswith(".") for shard in shards[:-1])
+    
+    def test_sharded_analysis_matches_in_process(self):
+        """Test that sharded analysis merges to the same result as a single pass"""
+        data = self.test_data + "".join(
+            f"Research data point {i} shows market growth of {i}% in the region. "
+            for i in range(200)
+        ) + "Demand is declining in one segment. "
+        
+        sharded_agent = AnalysisAgent(shard_threshold=1000, shard_size=500, max_workers=2)
+        try:
+            sharded = sharded_agent.analyze_data(data, self.test_task_plan)
+        finally:
+            sharded_agent.shutdown()
+        in_process = self.agent.analyze_data(data, self.test_task_plan)
+        
+        assert sharded["metadata"]["shards"] > 1
+        assert in_process["metadata"]["shards"] == 1
+        assert sharded["analysis"] == in_process["analysis"]
+        assert "Declining pattern identified" in sharded["analysis"]
+    
+    def test_pool_created_once_under_concurrency(self, monkeypatch):
+        """Test that concurrent first requests share one worker pool"""
+        created = []
+        barrier = threading.Barrier(8)
+        
+        class FakePool:
+            def __init__(self, **kwargs):
+                created.append(self)
+        
+        monkeypatch.setattr(analysis_agent, "ProcessPoolExecutor", FakePool)
+        pools = []
+        
+        def get():
+            barrier.wait()
+            pools.append(self.agent._get_pool())
+        
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(created) == 1
+        assert all(pool is created[0] for pool in pools)
+    
+    def test_broken_pool_shut_down(self):
+        """Test that a broken pool is shut down before the scan falls back in-process"""
+        calls = []
+        
+        class BrokenPool:
+            def map(self, fn, shards):
+                raise BrokenProcessPool("worker died")
+            
+            def shutdown(self, **kwargs):
+                calls.append(kwargs)
+        
+        agent = AnalysisAgent(shard_threshold=100, shard_size=50)
+        agent._pool = BrokenPool()
+        data = "Market growth reached 12% last year. " * 10
+        
+        assert agent._scan(data)["shards"] > 1
+        assert calls == [{"wait": False, "cancel_futures": True}]
+        assert agent._pool is None
+    
+    def test_extract_insights_ranked_by_query(self):
+        """Test that insights relevant to the query are ranked first"""
+        data = (
+            "Data ready for the analysis phase of this research.\n"
+            "Battery costs for electric vehicles fell sharply last year.\n"
+            "Cloud computing spending keeps rising across enterprises.\n"
+        )
+        task_plan = {**self.test_task_plan, "query": "cloud computing spending"}
+        insights = self.agent._extract_insights(data, task_plan)
+        
+        assert insights[0] == "Cloud computing spending keeps rising across enterprises"
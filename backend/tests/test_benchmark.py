@@ -0,0 +1,59 @@
+import pytest
+import json
+import sys
+from app.learning import benchmark
+from app.learning.benchmark import measure, run_benchmark, train_centralized
+
+
+class TestBenchmark:
+    """Test suite for the centralized vs federated benchmark harness"""
+    
+    def test_measure_reports_costs(self):
+        """Test that measure returns the result with wall, CPU and memory costs"""
+        result, cost = measure(lambda: bytearray(1 << 20))
+        
+        assert len(result) == 1 << 20
+        assert cost["wall_s"] >= 0 and cost["cpu_s"] >= 0
+        assert cost["parent_peak_traced_kb"] >= 1024
+    
+    def test_centralized_training_learns(self):
+        """Test that pooled training beats the untrained model"""
+        from app.learning.federated import FedAvgSimulator
+        weights, upload_bytes = train_centralized(200, 256, 16, seed=0)
+        evaluator = FedAvgSimulator(n_clients=200, n_features=256, max_samples=16)
+        
+        assert evaluator.evaluate(weights) > evaluator.evaluate(weights * 0)
+        assert upload_bytes > 0
+    
+    def test_report_structure(self):
+        """Test that both trainings are reported with comparable metrics"""
+        report = run_benchmark(n_clients=200, n_features=256, max_samples=16, rounds=3,
+                               client_fraction=0.2, max_workers=0, clip_norm=1.0, noise_multiplier=1.0)
+        
+        for name in ("centralized", "federated"):
+            assert set(report[name]) >= {"accuracy", "wall_s", "cpu_s", "peak_traced_kb", "bytes_communicated"}
+        assert report["federated"]["bytes_per_round"] == [2 * 40 * 256 * 4] * 3
+        assert report["federated"]["epsilon"] > 0
+        assert json.loads(json.dumps(report)) == report
+    
+    def test_federated_memory_includes_workers(self):
+        """Test that allocations made in pool workers count towards federated peak memory"""
+        report = run_benchmark(n_clients=200, n_features=256, max_samples=16, rounds=2,
+                               client_fraction=0.2, max_workers=2)
+        federated = report["federated"]
+        
+        assert federated["worker_peak_traced_kb"] > 0
+        assert federated["peak_traced_kb"] >= federated["parent_peak_traced_kb"] + federated["worker_peak_traced_kb"]
+    
+    def test_cli_writes_report(self, tmp_path, monkeypatch):
+        """Test that the CLI writes a machine-readable JSON report"""
+        output = tmp_path / "report.json"
+        monkeypatch.setattr(sys, "argv", [
+            "benchmark", "--clients", "100", "--features", "128", "--rounds", "2",
+            "--workers", "0", "--output", str(output)
+        ])
+        benchmark.main()
+        
+        report = json.loads(output.read_text())
+        assert report["version"] == benchmark.REPORT_VERSION
+        assert report["config"]["rounds"] == 2
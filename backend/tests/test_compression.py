@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+from app.learning.compression import QuantizedCodec, TopKCodec, UpdateCodec, get_codec
+
+
+class TestUpdateCodecs:
+    """Test suite for federated update codecs"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(0)
+        self.updates = rng.normal(0, 0.1, (6, 200))
+        self.weights = np.arange(1, 7, dtype=np.float64)
+    
+    def test_uncompressed_roundtrip(self):
+        """Test that the plain codec decodes float32 updates and weights"""
+        codec = UpdateCodec()
+        values, weights = codec.decode(codec.encode(self.updates, self.weights), 200)
+        
+        assert np.allclose(values, self.updates, atol=1e-6)
+        assert np.array_equal(weights, self.weights)
+    
+    def test_quantized_error_and_size(self):
+        """Test that 8-bit codes stay within one quantization step and shrink the payload ~4x"""
+        codec = QuantizedCodec()
+        payload = codec.encode(self.updates, self.weights, np.random.default_rng(1))
+        values, _ = codec.decode(payload, 200)
+        
+        step = (self.updates.max(axis=1) - self.updates.min(axis=1)) / 255
+        assert np.all(np.abs(values - self.updates) <= step[:, None] + 1e-6)
+        assert len(payload) == codec.payload_size(6, 200)
+        assert UpdateCodec().payload_size(6, 200) / len(payload) > 3.7
+    
+    def test_quantization_is_unbiased(self):
+        """Test that stochastic rounding averages out to the original values"""
+        codec = QuantizedCodec()
+        rng = np.random.default_rng(2)
+        update = self.updates[:1]
+        decoded = np.mean([codec.decode(codec.encode(update, [1.0], rng), 200)[0][0] for _ in range(400)], axis=0)
+        
+        step = (update.max() - update.min()) / 255
+        assert np.abs(decoded - update[0]).max() < step / 4
+    
+    def test_topk_keeps_largest_coordinates(self):
+        """Test that top-k sends only the largest-magnitude coordinates"""
+        codec = TopKCodec(fraction=0.05)
+        values, _ = codec.decode(codec.encode(self.updates, self.weights), 200)
+        
+        assert np.all(np.count_nonzero(values, axis=1) == 10)
+        for row, decoded in zip(self.updates, values):
+            kept = np.flatnonzero(decoded)
+            assert np.abs(row[kept]).min() >= np.sort(np.abs(row))[-10] - 1e-7
+    
+    @pytest.mark.parametrize("name", ["none", "int8", "topk"])
+    def test_decode_sum_matches_decode(self, name):
+        """Test that the vectorized weighted sum equals summing decoded updates"""
+        codec = get_codec(name)
+        payload = codec.encode(self.updates, self.weights, np.random.default_rng(3))
+        values, weights = codec.decode(payload, 200)
+        total, weight = codec.decode_sum(payload, 200)
+        
+        assert np.allclose(total, weights @ values)
+        assert weight == self.weights.sum()
+    
+    def test_unknown_codec(self):
+        """Test that an unknown compression name is rejected"""
+        with pytest.raises(ValueError):
+            get_codec("zip")
@@ -1,4 +1,6 @@
 import pytest
+import threading
+import time
 from app.agents.coordinator import CoordinatorAgent
 
 
@@ -89,3 +91,85 @@ class TestCoordinatorAgent:
         assert error_result["error"] is True
         assert error_result["error_agent"] == "TestAgent"
         assert "Test error message" in error_result["response"]
+    
+    def test_build_stage_graph_full_plan(self):
+        """Test that the default plan chains all four stages"""
+        graph = self.coordinator.build_stage_graph(self.coordinator.decompose_task("AI market trends"))
+        
+        assert graph == {
+            "data": [],
+            "analysis": ["data"],
+            "synthesis": ["analysis"],
+            "validation": ["synthesis"],
+        }
+    
+    def test_build_stage_graph_skips_unneeded_stages(self):
+        """Test that skipped stages are bypassed by their dependents"""
+        task_plan = self.coordinator.decompose_task("Explain the growth of electric vehicle market")
+        graph = self.coordinator.build_stage_graph(task_plan)
+        
+        assert task_plan["requires_analysis"] is False
+        assert "analysis" not in graph
+        assert graph["synthesis"] == ["data"]
+    
+    def test_run_workflow_reports_stages(self):
+        """Test that per-stage results are collected into the response"""
+        result = self.coordinator.run_workflow("What are the trends in AI market?")
+        stages = result["metadata"]["stages"]
+        
+        assert all(stages[s]["status"] == "completed" for s in ["data", "analysis", "synthesis", "validation"])
+        assert all(stages[s]["duration_ms"] >= 0 for s in stages)
+    
+    def test_run_workflow_slow_stage(self):
+        """Test that a stage overrunning its budget keeps its result and is flagged slow"""
+        coordinator = CoordinatorAgent(stage_timeouts={"synthesis": 0.01})
+        original = coordinator.synthesis_agent.synthesize
+        threads = []
+        
+        def slow_synthesize(analysis, task_plan):
+            threads.append(threading.current_thread())
+            time.sleep(0.05)
+            return original(analysis, task_plan)
+        
+        coordinator.synthesis_agent.synthesize = slow_synthesize
+        result = coordinator.run_workflow("What are the trends in AI market?")
+        stages = result["metadata"]["stages"]
+        
+        assert "error" not in result
+        assert stages["synthesis"]["status"] == "completed"
+        assert stages["synthesis"]["slow"] is True
+        assert "slow" not in stages["data"]
+        assert result["agents_used"][-1] == "ValidatorAgent"
+        # Stages run on the caller's thread, so nothing is left running afterwards
+        assert threads == [threading.current_thread()]
+    
+    def test_run_workflow_progress(self):
+        """Test that the progress callback sees every stage start and finish in order"""
+        events = []
+        self.coordinator.run_workflow("What are the trends in AI market?",
+                                      progress=lambda stage, status: events.append((stage, status["status"])))
+        
+        assert events[:2] == [("data", "running"), ("data", "completed")]
+        assert events[-1] == ("validation", "completed")
+        assert len(events) == 8
+    
+    def test_run_workflow_cancelled(self):
+        """Test that setting the cancel event stops the workflow before the next stage"""
+        cancel_event = threading.Event()
+        
+        def progress(stage, status):
+            if stage == "data" and status["status"] == "completed":
+                cancel_event.set()
+        
+        result = self.coordinator.run_workflow("What are the trends in AI market?",
+                                               progress=progress, cancel_event=cancel_event)
+        
+        assert result["cancelled"] is True
+        assert result["error"] is True
+        assert result["agents_used"] == ["DataAgent"]
+    
+    def test_decompose_task_no_substring_matches(self):
+        """Test that "vs" inside unrelated words does not signal a comparison"""
+        task_plan = self.coordinator.decompose_task("Describe the canvas and textiles industry")
+        
+        assert task_plan["focus"] != "comparison"
@@ -76,3 +76,31 @@ class TestDataAgent:
         assert "Data Collection Summary" in aggregated
         assert self.test_query in aggregated
         assert "Test snippet" in aggregated
+    
+    def test_aggregate_data_collapses_duplicates(self):
+        """Test that near-duplicate snippets are collapsed before analysis"""
+        snippet = "Acme Corp announced record revenue driven by strong demand for its cloud platform"
+        results = [
+            {"source": "wire", "snippet": snippet},
+            {"source": "syndicated", "snippet": snippet + "."},
+            {"source": "blog", "snippet": "Battery costs for electric vehicles fell sharply last year"},
+        ]
+        data = self.agent._aggregate_data(results, self.test_query, self.test_task_plan)
+        
+        assert data.count("Acme Corp") == 1
+        assert "Battery costs" in data
+        assert "1 near-duplicate passage(s) collapsed" in data
+    
+    def test_aggregate_data_keeps_short_snippets(self):
+        """Test that different short or empty snippets are not collapsed into one"""
+        results = [
+            {"source": "a", "snippet": "Growth slowed"},
+            {"source": "b", "snippet": "Prices rose"},
+            {"source": "c", "snippet": ""},
+            {"source": "d", "snippet": ""},
+        ]
+        data = self.agent._aggregate_data(results, self.test_query, self.test_task_plan)
+        
+        assert "Growth slowed" in data and "Prices rose" in data
+        assert "Source: d" in data
+        assert "collapsed" not in data
@@ -0,0 +1,189 @@
+import pytest
+import asyncio
+import json
+import threading
+import time
+from fastapi.testclient import TestClient
+from app.interactions.buffer import RingBuffer
+from app.interactions.log import EventLog
+from app.interactions import ingest
+from app.interactions.ingest import EventIngestor
+
+
+def _append_batches(path, worker):
+    log = EventLog(path, fsync=False)
+    for batch in range(20):
+        log.append_batch([{"type": "click", "ts": float(i), "worker": worker, "pad": "x" * 200}
+                          for i in range(200)])
+
+
+class TestRingBuffer:
+    """Test suite for RingBuffer"""
+    
+    def test_drain_in_order(self):
+        """Test that entries drain oldest first, across the wrap-around"""
+        buffer = RingBuffer(capacity=4)
+        buffer.extend([1, 2, 3])
+        assert buffer.drain(2) == [1, 2]
+        
+        buffer.extend([4, 5, 6])
+        assert buffer.drain() == [3, 4, 5, 6]
+        assert len(buffer) == 0
+    
+    def test_overflow_drops_oldest(self):
+        """Test that a burst beyond capacity overwrites the oldest entries"""
+        buffer = RingBuffer(capacity=3)
+        dropped = buffer.extend([1, 2, 3, 4, 5])
+        
+        assert dropped == 2
+        assert buffer.drain() == [3, 4, 5]
+        assert buffer.stats()["dropped"] == 2
+
+
+class TestEventLog:
+    """Test suite for EventLog"""
+    
+    def test_append_and_read_from_offset(self, tmp_path):
+        """Test that readers resume from the returned offset"""
+        log = EventLog(str(tmp_path / "events.log"), fsync=False)
+        log.append_batch([{"type": "click", "ts": 1.0}, {"type": "dwell", "ts": 2.0}])
+        
+        records, offset = log.read_from(0)
+        assert [r["type"] for r in records] == ["click", "dwell"]
+        
+        log.append_batch([{"type": "navigation", "ts": 3.0}])
+        records, next_offset = log.read_from(offset)
+        assert [r["type"] for r in records] == ["navigation"]
+        assert next_offset == log.size()
+    
+    def test_appends_from_processes_do_not_interleave(self, tmp_path):
+        """Test that batches appended by several processes stay whole lines"""
+        import multiprocessing
+        path = str(tmp_path / "events.log")
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_append_batches, args=(path, worker)) for worker in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        records, offset = EventLog(path).read_from(0)
+        assert offset == EventLog(path).size()
+        assert len(records) == 3 * 20 * 200
+    
+    def test_partial_line_left_for_next_read(self, tmp_path):
+        """Test that a torn trailing write is not consumed"""
+        path = tmp_path / "events.log"
+        path.write_bytes(b'{"type":"click","ts":1}\n{"type":"dw')
+        
+        records, offset = EventLog(str(path)).read_from(0)
+        assert len(records) == 1
+        assert offset == len(b'{"type":"click","ts":1}\n')
+
+
+class TestEventIngestor:
+    """Test suite for EventIngestor and the /events endpoint"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.events = [
+            {"type": "impression", "ts": 1.0, "focus": "trend_analysis", "section": "key_findings", "position": 0},
+            {"type": "click", "ts": 2.0, "focus": "trend_analysis", "section": "key_findings", "position": 0},
+        ]
+    
+    def test_flush_writes_and_notifies(self, tmp_path):
+        """Test that flushing writes buffered events and calls subscribers"""
+        ingestor = EventIngestor(EventLog(str(tmp_path / "events.log"), fsync=False), batch_size=1)
+        seen = []
+        ingestor.subscribe(seen.extend)
+        ingestor.ingest(self.events)
+        
+        assert ingestor.flush() == 2
+        assert len(seen) == 2
+        records, _ = ingestor.log.read_from(0)
+        assert [r["type"] for r in records] == ["impression", "click"]
+        assert all("rt" in r for r in records)
+    
+    def test_failed_write_is_retried(self, tmp_path, monkeypatch):
+        """Test that a batch whose write fails is kept and written first on the next flush"""
+        ingestor = EventIngestor(EventLog(str(tmp_path / "events.log"), fsync=False))
+        ingestor.ingest(self.events)
+        original = ingestor.log.append_batch
+        
+        def failing(records):
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(ingestor.log, "append_batch", failing)
+        with pytest.raises(OSError):
+            ingestor.flush()
+        assert ingestor.pending() == 2
+        assert ingestor.stats()["unwritten"] == 2
+        
+        monkeypatch.setattr(ingestor.log, "append_batch", original)
+        ingestor.ingest([{"type": "dwell", "ts": 3.0}])
+        assert ingestor.flush() == 3
+        records, _ = ingestor.log.read_from(0)
+        assert [r["type"] for r in records] == ["impression", "click", "dwell"]
+    
+    def test_concurrent_failed_writes_keep_every_batch(self, tmp_path, monkeypatch):
+        """Test that a flush racing an in-flight write neither drops nor duplicates a batch"""
+        ingestor = EventIngestor(EventLog(str(tmp_path / "events.log"), fsync=False), batch_size=1)
+        ingestor.ingest(self.events)
+        original = ingestor.log.append_batch
+        failures = []
+        
+        def slow_failing(records):
+            failures.append(records)
+            time.sleep(0.05)
+            raise OSError("disk full")
+        
+        def write():
+            with pytest.raises(OSError):
+                ingestor._write_next()
+        
+        monkeypatch.setattr(ingestor.log, "append_batch", slow_failing)
+        threads = [threading.Thread(target=write) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        monkeypatch.setattr(ingestor.log, "append_batch", original)
+        assert ingestor.flush() == 2
+        records, _ = ingestor.log.read_from(0)
+        assert [r["type"] for r in records] == ["impression", "click"]
+    
+    def test_background_flush(self, tmp_path):
+        """Test that the background task flushes without an explicit call"""
+        ingestor = EventIngestor(EventLog(str(tmp_path / "events.log"), fsync=False), flush_interval=0.01)
+        
+        async def scenario():
+            task = asyncio.create_task(ingestor.run())
+            ingestor.ingest(self.events)
+            for _ in range(100):
+                if ingestor.flushed == 2:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+        
+        asyncio.run(scenario())
+        assert ingestor.flushed == 2
+    
+    def test_events_endpoint(self, tmp_path, monkeypatch):
+        """Test that the endpoint validates and accepts batched events"""
+        ingestor = EventIngestor(EventLog(str(tmp_path / "events.log"), fsync=False))
+        monkeypatch.setattr(ingest, "_ingestor", ingestor)
+        from app.main import app
+        
+        # No lifespan: its background tasks would write snapshots into the real data directory
+        client = TestClient(app)
+        response = client.post("/events", json={"events": self.events})
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 2, "dropped": 0}
+        
+        invalid = client.post("/events", json={"events": [{"type": "hover", "ts": 1.0}]})
+        assert invalid.status_code == 422
+        
+        ingestor.flush()
+        records, _ = EventLog(str(tmp_path / "events.log")).read_from(0)
+        assert len(records) == 2
@@ -0,0 +1,157 @@
+import pytest
+import numpy as np
+from app.learning.adaptive_ranker import AdaptiveRanker
+from app.learning.compression import get_codec
+from app.learning.privacy import PrivacyAccountant
+from app.learning.federated import (
+    FedAvgSimulator, client_data, decode_clipped, local_train, _stack_clients, _train_chunk, train_ranker
+)
+
+
+class TestFedAvgSimulator:
+    """Test suite for FedAvgSimulator"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.simulator = FedAvgSimulator(n_clients=400, n_features=256, max_samples=16,
+                                         client_fraction=0.25, chunk_size=32, max_workers=0)
+    
+    def _task(self, weights, client_ids, epochs=2, learning_rate=0.5, clip_norm=None, **extra):
+        return {"weights": weights, "client_ids": client_ids, "seed": 0, "round": 0, "max_samples": 16,
+                "epochs": epochs, "learning_rate": learning_rate, "clip_norm": clip_norm, **extra}
+    
+    def test_client_data_is_deterministic(self):
+        """Test that a client's synthetic data depends only on its id and seed"""
+        a_indices, a_labels = client_data(7, 0, 256, 16)
+        b_indices, b_labels = client_data(7, 0, 256, 16)
+        
+        assert np.array_equal(a_indices, b_indices)
+        assert np.array_equal(a_labels, b_labels)
+        assert 1 <= len(a_labels) <= 16
+    
+    def test_chunk_update_is_weighted_sum(self):
+        """Test that a chunk returns the sample-weighted sum of per-client updates"""
+        weights = np.zeros(256, dtype=np.float32)
+        result = _train_chunk(self._task(weights, [1, 2, 3], epochs=2))
+        
+        expected = np.zeros(256)
+        expected_total = 0.0
+        for client_id in [1, 2, 3]:
+            X, y, mask = _stack_clients([client_id], 0, 256, 16)
+            local = local_train(weights, X, y, mask, 2, 0.5)[0]
+            expected += mask.sum() * (local - weights)
+            expected_total += mask.sum()
+        
+        assert result["clients"] == 3
+        assert result["weight"] == result["samples"] == expected_total
+        assert np.allclose(result["update_sum"], expected, atol=1e-5)
+    
+    def test_rounds_improve_accuracy(self):
+        """Test that federated rounds learn the shared engagement model"""
+        baseline = self.simulator.evaluate(np.zeros(256))
+        result = self.simulator.run(rounds=8)
+        
+        assert len(result["rounds"]) == 8
+        assert self.simulator.evaluate(result["weights"]) > baseline
+        assert result["rounds"][-1]["train_loss"] < result["rounds"][0]["train_loss"]
+    
+    def test_round_report(self):
+        """Test that rounds report participation, bytes, timing and memory"""
+        _, report = self.simulator.run_round(np.zeros(256))
+        
+        assert report["clients"] == 100
+        assert report["upload_bytes"] == 100 * 256 * 4
+        assert report["duration_ms"] >= 0
+        assert set(report["peak_memory_kb"]) == {"self", "children"}
+    
+    def test_process_pool_matches_in_process(self):
+        """Test that pooled training produces the same round as in-process training"""
+        pooled = FedAvgSimulator(n_clients=400, n_features=256, max_samples=16,
+                                 client_fraction=0.25, chunk_size=32, max_workers=2)
+        try:
+            pooled_weights, _ = pooled.run_round(np.zeros(256))
+        finally:
+            pooled.shutdown()
+        local_weights, _ = self.simulator.run_round(np.zeros(256))
+        
+        assert np.allclose(pooled_weights, local_weights)
+    
+    def test_clipped_chunk_bounds_each_client(self):
+        """Test that with a clip norm each client contributes at most that norm"""
+        weights = np.zeros(256, dtype=np.float32)
+        result = _train_chunk(self._task(weights, [1, 2, 3], epochs=5, learning_rate=5.0, clip_norm=0.01))
+        
+        assert result["weight"] == result["clients"] == 3
+        assert np.linalg.norm(result["update_sum"]) <= 3 * 0.01 + 1e-6
+    
+    def test_dp_rounds_charge_accountant(self):
+        """Test that noisy rounds are recorded by the privacy accountant"""
+        accountant = PrivacyAccountant()
+        simulator = FedAvgSimulator(n_clients=400, n_features=256, max_samples=16, client_fraction=0.25,
+                                    max_workers=0, clip_norm=1.0, noise_multiplier=1.0, accountant=accountant)
+        result = simulator.run(rounds=3)
+        
+        assert accountant.rounds == 3
+        assert 0 < result["rounds"][0]["epsilon"] < result["rounds"][-1]["epsilon"]
+    
+    def test_rounds_without_noise_make_budget_unbounded(self):
+        """Test that rounds releasing raw updates are charged and leave epsilon unbounded"""
+        accountant = PrivacyAccountant()
+        simulator = FedAvgSimulator(n_clients=400, n_features=256, max_samples=16, client_fraction=0.25,
+                                    max_workers=0, accountant=accountant)
+        result = simulator.run(rounds=2)
+        
+        assert accountant.rounds == 2
+        assert accountant.budget()["epsilon"] is None
+        assert result["rounds"][-1]["epsilon"] is None
+    
+    def test_noise_requires_clip_norm(self):
+        """Test that noise without a clipping bound is rejected rather than silently skipped"""
+        with pytest.raises(ValueError):
+            FedAvgSimulator(n_clients=10, n_features=16, noise_multiplier=1.0)
+    
+    def test_compressed_rounds(self):
+        """Test that compressed uploads shrink traffic and keep error-feedback residuals"""
+        simulator = FedAvgSimulator(n_clients=400, n_features=256, max_samples=16, client_fraction=0.25,
+                                    max_workers=0, codec=get_codec("topk", fraction=0.05))
+        result = simulator.run(rounds=2, eval_clients=50)
+        report = result["rounds"][0]
+        
+        assert report["compression"]["codec"] == "topk"
+        assert report["compression"]["ratio"] > 5
+        assert report["upload_bytes"] == simulator.codec.payload_size(100, 256)
+        assert 0 <= report["accuracy"] <= 1
+        assert len(simulator._residuals) >= 100
+    
+    def test_compressed_chunk_residuals(self):
+        """Test that residuals hold exactly what the encoding dropped"""
+        codec = get_codec("topk", fraction=0.1)
+        weights = np.zeros(256, dtype=np.float32)
+        result = _train_chunk(self._task(weights, [1, 2], codec=codec, residuals=np.zeros((2, 256), np.float32)))
+        
+        decoded, client_weights = codec.decode(result["payload"], 256)
+        assert np.allclose(client_weights @ (decoded + result["residuals"]), result["update_sum"], atol=1e-4)
+    
+    def test_compressed_dp_updates_stay_within_clip_norm(self):
+        """Test that error-feedback residuals and quantization cannot exceed the clip norm"""
+        codec = get_codec("int8")
+        weights = np.zeros(256, dtype=np.float32)
+        residuals = np.full((3, 256), 0.5, dtype=np.float32)
+        result = _train_chunk(self._task(weights, [1, 2, 3], epochs=5, learning_rate=5.0, clip_norm=0.01,
+                                         codec=codec, residuals=residuals))
+        
+        decoded, _ = decode_clipped(codec, result["payload"], 256, 0.01)
+        assert np.all(np.linalg.norm(decoded, axis=1) <= 0.01 + 1e-6)
+        
+        simulator = FedAvgSimulator(n_clients=400, n_features=256, max_samples=16, client_fraction=0.25,
+                                    max_workers=0, clip_norm=0.01, codec=codec)
+        assert np.linalg.norm(simulator._decode_sum(result["payload"])) <= 3 * 0.01 + 1e-6
+    
+    def test_train_ranker_installs_weights(self):
+        """Test that federated training updates the adaptive ranker for a focus"""
+        ranker = AdaptiveRanker(n_features=256)
+        result = train_ranker(ranker, "trend_analysis", rounds=2, n_clients=100,
+                              max_samples=8, max_workers=0)
+        
+        assert np.allclose(ranker.get_weights("trend_analysis"), result["weights"])
+        assert ranker.version == 1
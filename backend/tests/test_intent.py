@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+from app.nlp.hashing import ngram_features, hashed_vector
+from app.nlp.intent import IntentClassifier, FOCUS_LABELS, SEED_QUERIES, get_intent_classifier
+
+
+class TestIntentClassifier:
+    """Test suite for IntentClassifier"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.classifier = get_intent_classifier()
+    
+    def test_ngram_features_word_boundaries(self):
+        """Test that word features do not match inside other words"""
+        features = ngram_features("canvas makers")
+        
+        assert "w:vs" not in features
+        assert "w:canvas makers" in features
+        assert "c:<ca" in features
+    
+    def test_hashed_vector_normalized(self):
+        """Test that hashed vectors are L2-normalized and in range"""
+        indices, values = hashed_vector("cloud market trends", 256)
+        
+        assert np.all((indices >= 0) & (indices < 256))
+        assert np.dot(values, values) == pytest.approx(1.0)
+    
+    def test_predict_seed_queries(self):
+        """Test that the default model fits its seed queries"""
+        queries, labels = zip(*SEED_QUERIES)
+        predictions = self.classifier.predict_batch(queries)
+        accuracy = np.mean([p == label for p, label in zip(predictions, labels)])
+        
+        assert accuracy >= 0.95
+    
+    def test_predict_batch_matches_single(self):
+        """Test that batch scoring agrees with single-query scoring"""
+        queries = [
+            "Compare Snowflake vs Databricks",
+            "Explain how carbon credits work",
+            "Growth forecast for cloud gaming",
+            "",
+        ]
+        assert self.classifier.predict_batch(queries) == [self.classifier.predict(q) for q in queries]
+        assert self.classifier.predict_batch([]) == []
+    
+    def test_low_confidence_falls_back(self):
+        """Test that an untrained model falls back to general research"""
+        untrained = IntentClassifier(min_confidence=0.5)
+        assert untrained.predict("Compare AWS vs Azure") == "general_research"
+    
+    def test_predict_memoized(self):
+        """Test that repeated queries hit the memo"""
+        classifier = IntentClassifier().fit(*zip(*SEED_QUERIES))
+        classifier.predict("AI market trends 2026")
+        classifier.predict("AI market trends 2026")
+        
+        assert classifier.predict.cache_info().hits == 1
+    
+    def test_save_and_load(self, tmp_path):
+        """Test that a trained model round-trips through disk"""
+        path = str(tmp_path / "intent.npz")
+        self.classifier.save(path)
+        loaded = IntentClassifier.load(path)
+        
+        assert loaded.labels == FOCUS_LABELS
+        assert loaded.predict("Compare AWS vs Azure cloud services") == "comparison"
@@ -0,0 +1,120 @@
+import gzip
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from app.api import middleware
+from app.api.middleware import (
+    CompressionMiddleware, ETagMiddleware, _etag_matches, negotiate_encoding, parse_accept_encoding
+)
+
+REPORT = {"response": "📊 Market trends\n" + "• growth in adoption across segments\n" * 40}
+
+
+def _app():
+    app = FastAPI()
+    
+    @app.get("/report")
+    def report():
+        return REPORT
+    
+    @app.post("/report")
+    def post_report(body: dict):
+        return {**REPORT, "query": body.get("query")}
+    
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+    
+    @app.get("/missing")
+    def missing():
+        return PlainTextResponse("nope" * 200, status_code=404)
+    
+    app.add_middleware(ETagMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+class TestNegotiation:
+    """Test suite for Accept-Encoding negotiation"""
+    
+    def test_parse_q_values(self):
+        """Test that codings and q-values are parsed"""
+        assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+    
+    def test_prefers_available_coding(self):
+        """Test that the first available coding with the highest q wins"""
+        assert negotiate_encoding("gzip, br", ["br", "zstd", "gzip"]) == "br"
+        assert negotiate_encoding("gzip;q=1, br;q=0.5", ["br", "gzip"]) == "gzip"
+        assert negotiate_encoding("*", ["zstd", "gzip"]) == "zstd"
+        assert negotiate_encoding("br", ["gzip"]) is None
+        assert negotiate_encoding("gzip;q=0", ["gzip"]) is None
+    
+    def test_etag_matching_ignores_coding_suffix(self):
+        """Test that a compressed representation's tag matches the content tag"""
+        assert _etag_matches('"abc-gzip"', '"abc"')
+        assert _etag_matches('"x", W/"abc"', '"abc"')
+        assert _etag_matches("*", '"abc"')
+        assert not _etag_matches('"abd"', '"abc"')
+
+
+class TestHTTPMiddleware:
+    """Test suite for response compression and ETags"""
+    
+    def setup_method(self):
+        self.client = TestClient(_app())
+    
+    def test_gzip_response(self):
+        """Test that large JSON responses are gzip-compressed with a suffixed ETag"""
+        response = self.client.get("/report", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"].endswith('-gzip"')
+        assert response.json() == REPORT
+    
+    def test_identity_when_not_accepted(self):
+        """Test that clients without Accept-Encoding get the plain body and base ETag"""
+        response = self.client.get("/report", headers={"Accept-Encoding": "identity"})
+        
+        assert "content-encoding" not in response.headers
+        assert not response.headers["etag"].endswith('-gzip"')
+        assert response.json() == REPORT
+    
+    def test_small_responses_not_compressed(self):
+        """Test that bodies under the minimum size pass through"""
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+    
+    def test_not_modified(self):
+        """Test that a matching If-None-Match returns 304 without a body"""
+        first = self.client.get("/report", headers={"Accept-Encoding": "gzip"})
+        second = self.client.get("/report", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+        
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == first.headers["etag"]
+    
+    def test_post_never_304(self):
+        """Test that a POST is tagged but a matching If-None-Match still gets the full response"""
+        first = self.client.post("/report", json={"query": "ai"})
+        etag = first.headers["etag"]
+        repeated = self.client.post("/report", json={"query": "ai"}, headers={"If-None-Match": etag})
+        
+        assert repeated.status_code == 200
+        assert repeated.headers["etag"] == etag
+        assert repeated.json()["query"] == "ai"
+    
+    def test_errors_untagged(self):
+        """Test that error responses get no ETag"""
+        response = self.client.get("/missing")
+        assert response.status_code == 404
+        assert "etag" not in response.headers
+    
+    def test_optional_encoder_selected(self, monkeypatch):
+        """Test that an installed optional coding is negotiated and applied"""
+        encoders = {"br": lambda body: b"BR" + gzip.compress(body), "gzip": middleware.ENCODERS["gzip"]}
+        monkeypatch.setattr(middleware, "ENCODERS", encoders)
+        response = self.client.get("/report", headers={"Accept-Encoding": "br, gzip"})
+        
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["etag"].endswith('-br"')
@@ -0,0 +1,49 @@
+import pytest
+from app.nlp.minhash import MinHashDeduplicator
+
+
+class TestMinHashDeduplicator:
+    """Test suite for MinHashDeduplicator"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.dedup = MinHashDeduplicator()
+        self.press_release = (
+            "Acme Corp today announced record quarterly revenue of 4.2 billion dollars, "
+            "driven by strong demand for its cloud platform across North America and Europe"
+        )
+    
+    def test_invalid_band_configuration(self):
+        """Test that bands must divide the number of permutations"""
+        with pytest.raises(ValueError):
+            MinHashDeduplicator(num_perm=64, bands=10)
+    
+    def test_signature_deterministic(self):
+        """Test that signatures are stable across instances"""
+        other = MinHashDeduplicator()
+        assert (self.dedup.signature(self.press_release) == other.signature(self.press_release)).all()
+        assert len(self.dedup.signature(self.press_release)) == self.dedup.num_perm
+    
+    def test_near_duplicates_collapsed(self):
+        """Test that syndicated copies collapse onto the first occurrence"""
+        texts = [
+            self.press_release,
+            "Electric vehicle registrations in Norway rose again this quarter",
+            self.press_release.replace("today", "on Tuesday"),
+            self.press_release,
+        ]
+        assert self.dedup.unique_indices(texts) == [0, 1]
+    
+    def test_distinct_passages_kept(self):
+        """Test that unrelated passages are all kept in order"""
+        texts = [
+            "Cloud computing spending keeps rising across enterprises",
+            "Battery costs for electric vehicles fell sharply last year",
+            "Semiconductor supply constraints eased in the second half",
+        ]
+        assert self.dedup.deduplicate(texts) == texts
+    
+    def test_short_and_empty_passages_compared_exactly(self):
+        """Test that passages shorter than a shingle only collapse on an exact word match"""
+        texts = ["", "AI growth", "", "Cloud growth", "ai growth!", "n/a"]
+        assert self.dedup.unique_indices(texts) == [0, 1, 2, 3, 5]
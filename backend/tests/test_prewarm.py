@@ -0,0 +1,150 @@
+import time
+from app.agents import coordinator
+from app.cache.prewarm import LiveTraffic, Prewarmer, TokenBucket
+from app.cache.response_cache import ResponseCache, get_response_cache
+
+
+class TestResponseCache:
+    """Test suite for the whole-response cache"""
+    
+    def test_normalized_hits(self):
+        """Test that trivial query variants share one cached response"""
+        cache = ResponseCache(ttl=60)
+        cache.put("What are AI trends?", {"summary": "x"})
+        
+        assert cache.get("what are ai   trends") == {"summary": "x"}
+        assert cache.stats()["hits"] == 1
+    
+    def test_expiry_and_eviction(self):
+        """Test that expired entries miss and the LRU stays bounded"""
+        cache = ResponseCache(ttl=0.05, max_entries=2)
+        cache.put("a", {"n": 1})
+        assert 0 < cache.expires_in("a") <= 0.05
+        time.sleep(0.06)
+        assert cache.get("a") is None
+        assert cache.expires_in("a") is None
+        
+        for key in ("a", "b", "c"):
+            cache.put(key, {"n": key})
+        assert cache.stats()["entries"] == 2
+        assert cache.get("a") is None
+    
+    def test_returns_copies(self):
+        """Test that callers cannot mutate cached responses"""
+        cache = ResponseCache()
+        cache.put("q", {"items": [1]})
+        cache.get("q")["items"].append(2)
+        assert cache.get("q") == {"items": [1]}
+    
+    def test_module_workflow_uses_cache(self):
+        """Test that the workflow entry point serves repeats from the response cache"""
+        query = "What are the trends in wearable fitness trackers?"
+        cache = get_response_cache()
+        cache.clear()
+        first = coordinator.run_workflow(query)
+        hits = cache.stats()["hits"]
+        second = coordinator.run_workflow(query)
+        
+        assert second == first
+        assert cache.stats()["hits"] == hits + 1
+
+
+class TestPrewarmer:
+    """Test suite for the background prewarmer"""
+    
+    def setup_method(self):
+        self.cache = ResponseCache(ttl=60)
+        self.hot = ["alpha", "beta", "gamma"]
+        self.runs = []
+        self.traffic = LiveTraffic()
+    
+    def _run(self, query):
+        self.runs.append(query)
+        self.cache.put(query, {"query": query})
+        return {"query": query}
+    
+    def _prewarmer(self, **kwargs):
+        kwargs.setdefault("rate", 100.0)
+        kwargs.setdefault("burst", 10.0)
+        return Prewarmer(self.cache, lambda n: self.hot[:n], self._run, traffic=self.traffic, **kwargs)
+    
+    def test_warms_missing_and_expiring(self):
+        """Test that only uncached or soon-to-expire hot queries are refreshed"""
+        self.cache.put("alpha", {"query": "alpha"})
+        self.cache.put("beta", {"query": "beta"})
+        self.cache.ttl = 5
+        self.cache.put("beta", {"query": "beta"})
+        self.cache.ttl = 60
+        prewarmer = self._prewarmer(refresh_window=10)
+        
+        assert prewarmer.run_once() == 2
+        assert self.runs == ["beta", "gamma"]
+        assert self.cache.get("gamma") == {"query": "gamma"}
+        assert prewarmer.run_once() == 0
+    
+    def test_result_stored_once(self):
+        """Test that the prewarmer relies on ``run`` to cache rather than storing again"""
+        puts = []
+        original = self.cache.put
+        self.cache.put = lambda query, value: (puts.append(query), original(query, value))
+        self._prewarmer().run_once()
+        
+        assert puts == ["alpha", "beta", "gamma"]
+    
+    def test_top_n(self):
+        """Test that only the top-N hot queries are considered"""
+        prewarmer = self._prewarmer(top_n=2)
+        prewarmer.run_once()
+        assert self.runs == ["alpha", "beta"]
+    
+    def test_backs_off_under_live_traffic(self):
+        """Test that no work is done while live requests are in flight"""
+        prewarmer = self._prewarmer()
+        with self.traffic.track():
+            assert prewarmer.run_once() == 0
+        assert self.traffic.in_flight == 0
+        assert prewarmer.stats["deferred_busy"] == 1
+        assert prewarmer.run_once() == 3
+    
+    def test_rate_limited(self):
+        """Test that the token bucket caps refreshes per cycle"""
+        prewarmer = self._prewarmer(rate=0.001, burst=1.0)
+        assert prewarmer.run_once() == 1
+        assert prewarmer.run_once() == 0
+        assert prewarmer.stats["deferred_rate"] == 2
+    
+    def test_failures_not_cached(self):
+        """Test that error responses and exceptions are not cached"""
+        def run(query):
+            if query == "alpha":
+                raise RuntimeError("boom")
+            return {"error": "failed"}
+        prewarmer = Prewarmer(self.cache, lambda n: self.hot[:n], run, rate=100.0, burst=10.0)
+        
+        assert prewarmer.run_once() == 0
+        assert prewarmer.stats["failed"] == 3
+        assert self.cache.stats()["entries"] == 0
+    
+    def test_background_thread(self):
+        """Test that the background thread warms the cache and stops cleanly"""
+        prewarmer = self._prewarmer(interval=0.01)
+        prewarmer.start()
+        deadline = time.monotonic() + 2
+        while self.cache.get("gamma") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        prewarmer.stop(1.0)
+        
+        assert self.cache.get("gamma") == {"query": "gamma"}
+        assert prewarmer._thread is None
+
+
+class TestTokenBucket:
+    """Test suite for the prewarm rate limiter"""
+    
+    def test_refills_over_time(self):
+        """Test that tokens refill at the configured rate up to the burst"""
+        bucket = TokenBucket(rate=50.0, burst=1.0)
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        time.sleep(0.05)
+        assert bucket.try_acquire()
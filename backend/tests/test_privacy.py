@@ -0,0 +1,105 @@
+import pytest
+import math
+import numpy as np
+from fastapi.testclient import TestClient
+from app.learning import privacy
+from app.learning.privacy import (
+    PrivacyAccountant, add_gaussian_noise, clip_updates, rdp_per_step
+)
+
+
+class TestPrivacyMechanisms:
+    """Test suite for clipping and noise"""
+    
+    def test_clip_updates(self):
+        """Test that only rows above the clip norm are scaled down"""
+        updates = np.array([[3.0, 4.0], [0.3, 0.4], [0.0, 0.0]])
+        clipped = clip_updates(updates, 1.0)
+        
+        assert np.allclose(clipped[0], [0.6, 0.8])
+        assert np.allclose(clipped[1:], updates[1:])
+    
+    def test_gaussian_noise_scale(self):
+        """Test that noise std is the multiplier times the clip norm"""
+        noisy = add_gaussian_noise(np.zeros(200_000), 0.5, 2.0, np.random.default_rng(0))
+        assert abs(noisy.std() - 1.0) < 0.01
+
+
+class TestPrivacyAccountant:
+    """Test suite for PrivacyAccountant"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.accountant = PrivacyAccountant()
+    
+    def test_full_batch_gaussian(self):
+        """Test the closed form for an unsampled Gaussian mechanism"""
+        self.accountant.step(1.0, 1.0)
+        epsilon, order = self.accountant.epsilon()
+        
+        expected = min(a / 2 + math.log(1e5) / (a - 1) for a in self.accountant.orders)
+        assert epsilon == pytest.approx(expected)
+    
+    def test_epsilon_grows_with_rounds_and_shrinks_with_sampling(self):
+        """Test monotonicity of the accountant"""
+        self.accountant.step(0.01, 1.1, rounds=100)
+        few = self.accountant.epsilon()[0]
+        self.accountant.step(0.01, 1.1, rounds=900)
+        many = self.accountant.epsilon()[0]
+        
+        subsampled = PrivacyAccountant()
+        subsampled.step(0.001, 1.1, rounds=1000)
+        
+        assert few < many
+        assert subsampled.epsilon()[0] < many
+    
+    def test_per_step_rdp_is_cached(self):
+        """Test that repeated rounds reuse the precomputed RDP curve"""
+        rdp_per_step.cache_clear()
+        self.accountant.step(0.05, 1.5)
+        self.accountant.step(0.05, 1.5)
+        
+        assert rdp_per_step.cache_info().hits == 1
+    
+    def test_budget_without_noise(self):
+        """Test that a noiseless round makes the budget unbounded"""
+        self.accountant.step(0.1, 0.0)
+        assert self.accountant.budget()["epsilon"] is None
+    
+    def test_noiseless_round_stays_unbounded(self):
+        """Test that later noisy rounds cannot restore a bound lost to a noiseless round"""
+        self.accountant.step(0.1, 1.0, rounds=5)
+        self.accountant.step(0.1, 0.0)
+        self.accountant.step(0.1, 1.0, rounds=5)
+        
+        assert self.accountant.rounds == 11
+        assert self.accountant.budget()["epsilon"] is None
+    
+    def test_budget_before_any_round(self):
+        """Test that no privacy is spent before the first round"""
+        budget = self.accountant.budget()
+        
+        assert budget["epsilon"] == 0.0
+        assert budget["rounds"] == 0
+        assert budget["order"] is None
+
+
+class TestPrivacyEndpoint:
+    """Test suite for the privacy budget endpoint"""
+    
+    def test_budget_endpoint(self, monkeypatch):
+        """Test that the endpoint reports the shared accountant's budget"""
+        from app.main import app
+        accountant = PrivacyAccountant()
+        accountant.step(0.01, 1.1, rounds=50)
+        monkeypatch.setattr(privacy, "_accountant", accountant)
+        
+        client = TestClient(app)
+        body = client.get("/privacy/budget").json()
+        assert body["rounds"] == 50
+        assert body["epsilon"] == pytest.approx(accountant.epsilon()[0])
+        
+        relaxed = client.get("/privacy/budget", params={"delta": 1e-3}).json()
+        assert relaxed["delta"] == 1e-3
+        assert relaxed["epsilon"] < body["epsilon"]
+        assert client.get("/privacy/budget", params={"delta": 2}).status_code == 422
@@ -0,0 +1,79 @@
+import json
+from fastapi.testclient import TestClient
+from app.api import query
+from app.api.query import compact_json, parse_fields, select_fields
+from app.main import app
+
+OUTPUT = {
+    "response": "📊 Trends\n• AI adoption keeps growing",
+    "agents_used": ["DataAgent", "AnalysisAgent"],
+    "task_plan": {"focus": "trend_analysis", "priority": "normal"},
+    "metadata": {"stages": {"data": {"status": "completed"}}},
+}
+
+
+class TestQueryAPI:
+    """Test suite for the query endpoint's response modes"""
+    
+    def setup_method(self):
+        self.calls = []
+        self.client = TestClient(app)
+    
+    def _run(self, user_query):
+        self.calls.append(user_query)
+        return dict(OUTPUT)
+    
+    def test_fast_matches_validated(self, monkeypatch):
+        """Test that the fast path returns the same document as the validated path"""
+        monkeypatch.setattr(query, "run_workflow", self._run)
+        validated = self.client.post("/query/", json={"query": "ai trends"})
+        fast = self.client.post("/query/?fast=true", json={"query": "ai trends"})
+        
+        assert fast.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.json() == validated.json()
+        assert fast.json()["error"] is False
+    
+    def test_get_revalidates_with_304(self, monkeypatch):
+        """Test that a repeated GET query with a matching If-None-Match gets 304 and POST never does"""
+        monkeypatch.setattr(query, "run_workflow", self._run)
+        first = self.client.get("/query/", params={"query": "ai trends"})
+        etag = first.headers["etag"]
+        
+        assert first.json() == self.client.post("/query/", json={"query": "ai trends"}).json()
+        repeated = self.client.get("/query/", params={"query": "ai trends"}, headers={"If-None-Match": etag})
+        assert repeated.status_code == 304
+        assert repeated.content == b""
+        posted = self.client.post("/query/", json={"query": "ai trends"}, headers={"If-None-Match": etag})
+        assert posted.status_code == 200
+    
+    def test_fields_selection(self, monkeypatch):
+        """Test that fields= returns only the requested fields"""
+        monkeypatch.setattr(query, "run_workflow", self._run)
+        response = self.client.post("/query/?fields=response,metadata", json={"query": "ai trends"})
+        
+        assert response.json() == {"response": OUTPUT["response"], "metadata": OUTPUT["metadata"]}
+    
+    def test_unknown_field_rejected_before_work(self, monkeypatch):
+        """Test that unknown fields are a 400 and the workflow does not run"""
+        monkeypatch.setattr(query, "run_workflow", self._run)
+        response = self.client.post("/query/?fields=response,secrets", json={"query": "ai trends"})
+        
+        assert response.status_code == 400
+        assert "secrets" in response.json()["detail"]
+        assert self.calls == []
+    
+    def test_helpers(self):
+        """Test field parsing, default filling and compact encoding"""
+        assert parse_fields(None) == query.RESPONSE_FIELDS
+        assert parse_fields(" response , error ") == ("response", "error")
+        assert select_fields({"response": "x"}, ("response", "error_agent")) == {"response": "x", "error_agent": None}
+        
+        encoded = compact_json({"response": "• x", "n": 1})
+        assert b" " not in encoded.replace("• x".encode(), b"")
+        assert json.loads(encoded) == {"response": "• x", "n": 1}
+    
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test that compact encoding works without orjson"""
+        monkeypatch.setattr(query, "orjson", None)
+        assert compact_json({"a": [1, 2], "b": "é"}) == '{"a":[1,2],"b":"é"}'.encode()
@@ -0,0 +1,55 @@
+import pytest
+import sys
+from app.agents.registry import AgentRegistry, registry
+from app.agents.coordinator import CoordinatorAgent
+
+
+class TestAgentRegistry:
+    """Test suite for AgentRegistry"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.registry = AgentRegistry()
+    
+    def test_register_requires_module_and_class(self):
+        """Test that targets must name a module and a class"""
+        with pytest.raises(ValueError):
+            self.registry.register("Broken", "json.decoder.JSONDecoder")
+    
+    def test_lazy_load(self, monkeypatch):
+        """Test that an agent's module is imported only when the agent is first requested"""
+        monkeypatch.delitem(sys.modules, "sched", raising=False)
+        self.registry.register("Scheduler", "sched:scheduler")
+        assert not self.registry.is_loaded("Scheduler")
+        assert "sched" not in sys.modules
+        
+        agent = self.registry.create("Scheduler")
+        
+        assert self.registry.is_loaded("Scheduler")
+        assert "sched" in sys.modules
+        assert type(agent).__name__ == "scheduler"
+    
+    def test_unknown_agent(self):
+        """Test that unknown agent names raise KeyError"""
+        with pytest.raises(KeyError):
+            self.registry.load("MissingAgent")
+    
+    def test_default_agents_registered(self):
+        """Test that the four workflow agents are registered"""
+        assert set(registry.names()) == {"DataAgent", "AnalysisAgent", "SynthesisAgent", "ValidatorAgent"}
+    
+    def test_coordinator_constructs_agents_on_first_use(self):
+        """Test that a coordinator creates agents lazily and reuses them"""
+        coordinator = CoordinatorAgent()
+        
+        assert coordinator._agents == {}
+        assert coordinator.validator_agent is coordinator.validator_agent
+        assert list(coordinator._agents) == ["ValidatorAgent"]
+    
+    def test_coordinator_warmup(self):
+        """Test that warmup constructs every registered agent"""
+        coordinator = CoordinatorAgent()
+        coordinator.warmup()
+        
+        assert set(coordinator._agents) == set(registry.names())
+        coordinator.shutdown()
@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+from app.interactions.log import EventLog
+from fastapi.testclient import TestClient
+from app.interactions import rollups as rollups_module
+from app.interactions.rollups import InteractionRollups, FOCUSES, SECTIONS, EVENT_TYPES
+
+
+class TestInteractionRollups:
+    """Test suite for InteractionRollups"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.events = [
+            {"type": "impression", "rt": 7200.0, "focus": "trend_analysis", "section": "key_findings"},
+            {"type": "impression", "rt": 7300.0, "focus": "trend_analysis", "section": "key_findings"},
+            {"type": "click", "rt": 7400.0, "focus": "trend_analysis", "section": "key_findings"},
+            {"type": "dwell", "rt": 10900.0, "focus": "comparison", "section": "recommendations", "dwell_ms": 1500.0},
+            {"type": "click", "rt": 11000.0, "focus": "unknown", "section": "sidebar"},
+        ]
+    
+    def test_update_columnar_counts(self):
+        """Test that events land in the right bucket, focus, section and type"""
+        rollups = InteractionRollups("unused", bucket_seconds=3600)
+        rollups.update(self.events)
+        
+        assert rollups.counts.shape == (2, len(FOCUSES), len(SECTIONS), len(EVENT_TYPES))
+        assert rollups.origin == 2
+        assert rollups.counts.sum() == 5
+        assert rollups.counts[0, FOCUSES.index("trend_analysis"), SECTIONS.index("key_findings")].tolist() == [2, 1, 0, 0]
+        assert rollups.counts[1, FOCUSES.index("other"), SECTIONS.index("other"), EVENT_TYPES.index("click")] == 1
+        assert rollups.dwell_ms.sum() == 1500.0
+    
+    def test_update_grows_backwards(self):
+        """Test that late events older than the first bucket extend the axis"""
+        rollups = InteractionRollups("unused", bucket_seconds=3600)
+        rollups.update(self.events[3:])
+        rollups.update(self.events[:1])
+        
+        assert rollups.origin == 2
+        assert rollups.counts.shape[0] == 2
+        assert rollups.counts.sum() == 3
+    
+    def test_compact_incremental(self, tmp_path):
+        """Test that compaction resumes from the last processed offset"""
+        log = EventLog(str(tmp_path / "events.log"), fsync=False)
+        directory = str(tmp_path / "rollups")
+        log.append_batch(self.events[:3])
+        
+        rollups = InteractionRollups(directory)
+        assert rollups.compact(log) == 3
+        assert rollups.compact(log) == 0
+        
+        log.append_batch(self.events[3:])
+        assert InteractionRollups(directory).compact(log) == 2
+        
+        reader = InteractionRollups(directory).load()
+        assert reader.offset == log.size()
+        assert int(reader.counts.sum()) == 5
+        assert len(list((tmp_path / "rollups").glob("gen-*"))) == 1
+    
+    def test_section_stats(self):
+        """Test click-through and dwell statistics per section"""
+        rollups = InteractionRollups("unused")
+        rollups.update(self.events)
+        stats = rollups.section_stats("trend_analysis")
+        
+        assert stats["key_findings"]["impressions"] == 2
+        assert stats["key_findings"]["ctr"] == 0.5
+        assert rollups.section_stats()["recommendations"]["mean_dwell_ms"] == 1500.0
+    
+    def test_retention(self):
+        """Test that only the most recent buckets are kept"""
+        rollups = InteractionRollups("unused", bucket_seconds=1, max_buckets=3)
+        rollups.update([{"type": "click", "rt": float(t)} for t in range(10)])
+        
+        assert rollups.counts.shape[0] == 3
+        assert rollups.origin == 7
+    
+    def test_interaction_stats_endpoint(self, tmp_path, monkeypatch):
+        """Test that the admin endpoint serves section stats from the latest compacted snapshot"""
+        from app.main import app
+        directory = str(tmp_path / "rollups")
+        log = EventLog(str(tmp_path / "events.log"), fsync=False)
+        log.append_batch(self.events)
+        monkeypatch.setattr(rollups_module, "_rollups", InteractionRollups(directory))
+        # Compacted by another worker: the shared instance itself never saw the events
+        InteractionRollups(directory).compact(log)
+        monkeypatch.setenv("PRIVYPULSE_ADMIN_TOKEN", "secret")
+        client = TestClient(app)
+        headers = {"X-Admin-Token": "secret"}
+        
+        response = client.get("/admin/interaction-stats?focus=trend_analysis", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["sections"]["key_findings"]["ctr"] == 0.5
+        assert response.json()["generation"] == 1
+        assert client.get("/admin/interaction-stats?focus=bogus", headers=headers).status_code == 400
+        assert client.get("/admin/interaction-stats").status_code == 401
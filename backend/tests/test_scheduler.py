@@ -0,0 +1,119 @@
+import pytest
+import numpy as np
+from app.learning.compression import get_codec
+from app.learning.federated import FedAvgSimulator
+from app.learning.privacy import PrivacyAccountant
+from app.learning.scheduler import (
+    LatencyModel, RoundScheduler, compare_schedules, time_to_accuracy
+)
+
+
+class TestLatencyModel:
+    """Test suite for LatencyModel"""
+    
+    @pytest.mark.parametrize("kind", ["constant", "exponential", "lognormal", "pareto"])
+    def test_median(self, kind):
+        """Test that every distribution is centred on the configured median"""
+        latency = LatencyModel(kind, median=2.0, spread=0.5).sample(20_000)
+        assert np.median(latency) == pytest.approx(2.0, rel=0.05)
+    
+    def test_dropout(self):
+        """Test that dropped clients never respond"""
+        latency = LatencyModel(dropout=0.2).sample(10_000)
+        assert np.isinf(latency).mean() == pytest.approx(0.2, abs=0.02)
+    
+    def test_unknown_kind(self):
+        """Test that unknown distributions are rejected"""
+        with pytest.raises(ValueError):
+            LatencyModel("uniform")
+
+
+class TestRoundScheduler:
+    """Test suite for RoundScheduler"""
+    
+    def _scheduler(self, **latency):
+        simulator = FedAvgSimulator(n_clients=200, n_features=128, max_samples=8,
+                                    client_fraction=0.1, max_workers=0)
+        return RoundScheduler(simulator, LatencyModel(**latency), eval_clients=20)
+    
+    def test_sync_waits_for_slowest(self):
+        """Test that synchronous rounds take as long as their slowest client"""
+        report = self._scheduler(kind="constant", median=1.5).run_sync(rounds=4)
+        
+        assert report["virtual_time_s"] == pytest.approx(6.0)
+        assert report["client_updates"] == 80
+        assert len(report["timeline"]) == 4
+    
+    def test_sync_times_out_on_dropouts(self):
+        """Test that a round with a dropped client lasts until the timeout"""
+        report = self._scheduler(kind="constant", dropout=0.5).run_sync(rounds=2, timeout=10.0)
+        
+        assert report["virtual_time_s"] == pytest.approx(20.0)
+        assert report["client_updates"] < 40
+    
+    def test_deadline_bounds_round_time(self):
+        """Test that deadline rounds never exceed the deadline and drop stragglers"""
+        report = self._scheduler(kind="pareto", spread=0.8).run_deadline(rounds=5, deadline=2.0)
+        
+        assert report["virtual_time_s"] <= 10.0
+        assert 0 < report["client_updates"] <= 5 * 26
+    
+    def test_async_applies_requested_updates(self):
+        """Test that async aggregation applies buffered updates until the budget is met"""
+        report = self._scheduler(kind="lognormal", spread=1.0).run_async(
+            client_updates=60, concurrency=20, buffer_size=5
+        )
+        
+        assert report["client_updates"] == 60
+        assert report["server_steps"] == 12
+        times = [t for t, _ in report["timeline"]]
+        assert times == sorted(times)
+    
+    def test_async_terminates_when_every_client_drops(self):
+        """Test that the dispatch cap ends an async run in which no client ever responds"""
+        report = self._scheduler(kind="constant", dropout=1.0).run_async(
+            client_updates=20, concurrency=5, buffer_size=5, max_dispatches=50
+        )
+        
+        assert report["client_updates"] == 0
+        assert report["server_steps"] == 0
+    
+    def test_async_applies_partial_buffer_at_cap(self):
+        """Test that responses buffered when the dispatch cap is reached are still applied"""
+        report = self._scheduler(kind="constant").run_async(
+            client_updates=100, concurrency=4, buffer_size=5, max_dispatches=12
+        )
+        
+        assert report["client_updates"] == 12
+        assert report["server_steps"] == 3
+    
+    def test_async_uses_dp_and_compression_pipeline(self):
+        """Test that async server steps are clipped, compressed, noised and charged like rounds"""
+        accountant = PrivacyAccountant()
+        simulator = FedAvgSimulator(n_clients=200, n_features=128, max_samples=8, client_fraction=0.1,
+                                    max_workers=0, clip_norm=1.0, noise_multiplier=1.0,
+                                    accountant=accountant, codec=get_codec("int8"))
+        report = RoundScheduler(simulator, LatencyModel(), eval_clients=20).run_async(
+            client_updates=20, concurrency=10, buffer_size=5
+        )
+        
+        assert accountant.rounds == report["server_steps"] == 4
+        assert accountant.budget()["epsilon"] > 0
+        assert len(simulator._residuals) > 0
+    
+    def test_time_to_accuracy(self):
+        """Test reading the first time a target accuracy was reached"""
+        report = {"timeline": [(1.0, 0.5), (2.0, 0.7), (3.0, 0.8)]}
+        assert time_to_accuracy(report, 0.7) == 2.0
+        assert time_to_accuracy(report, 0.9) is None
+    
+    def test_compare_schedules(self):
+        """Test that stragglers make partial and async schedules faster than sync"""
+        result = compare_schedules(rounds=3, n_clients=200, n_features=128, max_samples=8,
+                                   latency={"kind": "pareto", "spread": 0.9}, buffer_size=5)
+        
+        assert set(result["schedules"]) == {"sync", "deadline", "async"}
+        # Async applies whole buffers, so it may overshoot the sync update count slightly
+        assert 0 <= result["schedules"]["async"]["client_updates"] - result["schedules"]["sync"]["client_updates"] < 5
+        assert result["comparison"]["sync"]["throughput_speedup"] == 1.0
+        assert result["comparison"]["deadline"]["throughput_speedup"] > 1.0
@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+from app.learning.secure_aggregation import (
+    SecureAggregator, benchmark, decode, encode, secure_sum
+)
+
+
+class TestSecureAggregator:
+    """Test suite for SecureAggregator"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(3)
+        self.n_clients = 40
+        self.updates = {i: rng.normal(0, 1, 64) for i in range(self.n_clients)}
+        self.aggregator = SecureAggregator(self.n_clients, 64, neighbors=6, round_secret=7)
+    
+    def test_encode_decode_roundtrip(self):
+        """Test fixed-point encoding of negative and positive values"""
+        values = np.array([-1.5, 0.0, 2.25, -0.000001])
+        assert np.allclose(decode(encode(values)), values, atol=1e-6)
+    
+    def test_neighbors_are_symmetric(self):
+        """Test that each client shares masks with a fixed number of mutual neighbors"""
+        for i in range(self.n_clients):
+            neighbors = self.aggregator.neighbors_of(i)
+            assert len(neighbors) == 6
+            assert i not in neighbors
+            assert all(i in self.aggregator.neighbors_of(j) for j in neighbors)
+    
+    def test_masked_update_hides_values(self):
+        """Test that an individual upload does not decode to the client's update"""
+        masked = self.aggregator.mask(0, self.updates[0])
+        assert not np.allclose(decode(masked), self.updates[0], atol=1.0)
+    
+    def test_sum_without_dropouts(self):
+        """Test that the server recovers exactly the sum of all updates"""
+        masked = {i: self.aggregator.mask(i, u) for i, u in self.updates.items()}
+        expected = np.sum(list(self.updates.values()), axis=0)
+        
+        assert np.allclose(self.aggregator.aggregate(masked), expected, atol=1e-4)
+    
+    def test_sum_with_dropouts(self):
+        """Test that dropped clients' dangling masks are removed from the sum"""
+        survivors = [i for i in range(self.n_clients) if i % 3]
+        masked = {i: self.aggregator.mask(i, self.updates[i]) for i in survivors}
+        expected = np.sum([self.updates[i] for i in survivors], axis=0)
+        
+        assert np.allclose(self.aggregator.aggregate(masked), expected, atol=1e-4)
+    
+    def test_all_pairs_protocol(self):
+        """Test the classic all-pairs configuration gives the same sum"""
+        result = secure_sum(self.updates, self.n_clients, neighbors=None)
+        expected = np.sum(list(self.updates.values()), axis=0)
+        
+        assert np.allclose(result, expected, atol=1e-4)
+    
+    def test_benchmark_rows(self):
+        """Test that the benchmark reports timings per configuration"""
+        rows = benchmark(client_counts=[20], vector_sizes=[32], neighbors=[4, None], sample_clients=3)
+        
+        assert [row["neighbors"] for row in rows] == [4, 19]
+        assert all(row["mask_ms_per_client"] >= 0 and row["upload_bytes_per_client"] == 256 for row in rows)
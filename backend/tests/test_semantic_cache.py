@@ -0,0 +1,160 @@
+import time
+import numpy as np
+import pytest
+from app.agents import coordinator
+from app.cache.response_cache import get_response_cache
+from app.cache.semantic_cache import (
+    SemanticCache, conflicting, get_semantic_cache, query_terms, simhash, similarity_from_distance
+)
+
+
+# Labeled pairs the default threshold was tuned on: rewordings and added detail are reused,
+# swapped subjects are not (by the similarity score, or by the swap check for numbers and entities)
+POSITIVE_PAIRS = [
+    ("What are the trends in AI market?", "AI market trends"),
+    ("AI market trends 2026", "trends in the AI market"),
+    ("latest cloud market report", "cloud market"),
+    ("key trends in the EV market", "EV market trends"),
+    ("recent developments in the fintech market", "fintech market developments"),
+    ("cloud computing market trends", "latest cloud computing market trends"),
+    ("electric vehicle market trends", "electric vehicles market trend analysis"),
+    ("cloud gaming market growth", "cloud gaming market growth in 2025"),
+    ("global semiconductor market trends", "semiconductor market trends"),
+]
+SWAP_PAIRS = [
+    ("cloud market trends in Europe", "cloud market trends in Asia"),
+    ("cloud market trends in europe", "cloud market trends in asia"),
+    ("AI market trends 2020", "AI market trends 2026"),
+    ("AWS vs Azure pricing", "AWS vs GCP pricing"),
+]
+NEGATIVE_PAIRS = SWAP_PAIRS + [
+    ("smartphone market share", "smartwatch market share"),
+    ("EV market growth", "EV market decline"),
+    ("cloud gaming market", "cloud storage market"),
+    ("AI market trends", "AI chip market trends"),
+]
+
+
+def _flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+class TestSimHash:
+    """Test suite for query fingerprints"""
+    
+    def test_paraphrases_are_close(self):
+        """Test that reordered and reworded queries differ in few bits, unrelated ones in many"""
+        near = bin(simhash("What are the trends in AI market?") ^ simhash("AI market trends")).count("1")
+        reordered = bin(simhash("AI market trends 2026") ^ simhash("trends in the AI market")).count("1")
+        far = bin(simhash("AI market trends") ^ simhash("explain how solar panels work")).count("1")
+        
+        assert near == 0
+        assert reordered < far
+    
+    def test_deterministic(self):
+        """Test that fingerprints are stable and empty queries map to zero"""
+        assert simhash("cloud gaming growth") == simhash("Cloud gaming growth!")
+        assert simhash("the of and") == 0
+
+
+class TestSemanticCache:
+    """Test suite for the LSH near-duplicate response cache"""
+    
+    def setup_method(self):
+        self.cache = SemanticCache(max_entries=64, rebuild_every=4)
+    
+    def test_reuses_similar_query(self):
+        """Test that a paraphrase with the same focus reuses the cached response"""
+        self.cache.put("AI market trends 2026", "trend_analysis", {"response": "ai"})
+        hit = self.cache.lookup("trends in the AI market", "trend_analysis")
+        
+        assert hit is not None
+        response, match = hit
+        assert response == {"response": "ai"}
+        assert match["query"] == "AI market trends 2026"
+        assert self.cache.threshold <= match["similarity"] < 1.0
+    
+    @pytest.mark.parametrize("cached, query", POSITIVE_PAIRS)
+    def test_labeled_positives_hit(self, cached, query):
+        """Test that rewordings and added detail clear the default threshold"""
+        self.cache.put(cached, "general_research", {"response": cached})
+        hit = self.cache.lookup(query, "general_research")
+        
+        assert hit is not None and hit[0] == {"response": cached}
+    
+    @pytest.mark.parametrize("cached, query", NEGATIVE_PAIRS)
+    def test_labeled_negatives_miss(self, cached, query):
+        """Test that queries about a different subject are not reused"""
+        self.cache.put(cached, "general_research", {"response": cached})
+        assert self.cache.lookup(query, "general_research") is None
+    
+    @pytest.mark.parametrize("cached, query", SWAP_PAIRS)
+    def test_region_and_year_swaps_rejected_at_any_threshold(self, cached, query):
+        """Test that swapped numbers and entities miss even when the similarity score would accept them"""
+        cache = SemanticCache(threshold=0.0, max_entries=8)
+        cache.put(cached, "general_research", {"response": cached})
+        
+        assert cache.lookup(query, "general_research") is None
+        assert cache.stats()["rejected_conflicts"] == 1
+    
+    def test_conflicts_need_a_swap(self):
+        """Test that a number or entity on one side only is left to the similarity score"""
+        assert conflicting(query_terms("AI market trends 2020"), query_terms("AI market trends 2026"))
+        assert conflicting(query_terms("Cloud market in Asia"), query_terms("cloud market in europe"))
+        assert not conflicting(query_terms("AI market trends 2026"), query_terms("trends in the AI market"))
+        assert not conflicting(query_terms("Cloud Market Trends"), query_terms("cloud market trends in Asia"))
+        assert not conflicting(query_terms("smartphone market share"), query_terms("smartwatch market share"))
+    
+    def test_focus_must_match(self):
+        """Test that a similar query with a different focus is a miss"""
+        self.cache.put("AI market trends", "trend_analysis", {"response": "ai"})
+        assert self.cache.lookup("AI market trends", "comparison") is None
+    
+    def test_dissimilar_miss(self):
+        """Test that queries below the similarity threshold are not reused"""
+        self.cache.put("AI market trends", "trend_analysis", {"response": "ai"})
+        assert self.cache.lookup("renewable energy market trends", "trend_analysis") is None
+        assert self.cache.stats()["misses"] == 1
+    
+    def test_guaranteed_radius_across_rebuilds(self):
+        """Test that entries within the multi-probe radius are found before and after indexing"""
+        rng = np.random.default_rng(0)
+        fingerprints = [int(f) for f in rng.integers(0, 2 ** 63, 40)]
+        for i, fingerprint in enumerate(fingerprints):
+            self.cache.put("", "general_research", {"i": i}, fingerprint=fingerprint)
+        
+        # 4 bands probed at radius 2: any 11 flipped bits leave one band within 2 bits
+        for i, fingerprint in enumerate(fingerprints):
+            bits = rng.choice(64, 11, replace=False)
+            response, match = self.cache.lookup("", "general_research", fingerprint=_flip(fingerprint, bits))
+            assert response == {"i": i}
+    
+    def test_bounded_and_expiring(self):
+        """Test that the oldest entries are replaced and expired entries miss"""
+        cache = SemanticCache(max_entries=4, ttl=0.05, rebuild_every=2)
+        fingerprints = [int(f) for f in np.random.default_rng(1).integers(0, 2 ** 63, 6)]
+        for i, fingerprint in enumerate(fingerprints):
+            cache.put("", "general_research", {"i": i}, fingerprint=fingerprint)
+        
+        assert cache.stats()["entries"] == 4
+        assert cache.lookup("", "general_research", fingerprint=fingerprints[0]) is None
+        assert cache.lookup("", "general_research", fingerprint=fingerprints[5])[0] == {"i": 5}
+        time.sleep(0.06)
+        assert cache.lookup("", "general_research", fingerprint=fingerprints[5]) is None
+    
+    def test_invalid_bands(self):
+        """Test that bands wider than 16 bits are rejected"""
+        with pytest.raises(ValueError):
+            SemanticCache(bands=2)
+    
+    def test_workflow_reuses_paraphrase(self):
+        """Test that the workflow entry point serves paraphrases from the semantic cache"""
+        get_response_cache().clear()
+        get_semantic_cache().clear()
+        first = coordinator.run_workflow("What are the latest trends in the smart home market?")
+        second = coordinator.run_workflow("smart home market latest trends")
+        
+        assert second["response"] == first["response"]
+        assert second["metadata"]["semantic_match"]["query"] == "What are the latest trends in the smart home market?"
@@ -0,0 +1,148 @@
+import threading
+import time
+from app.agents import coordinator
+from app.cache import shared_cache
+from app.cache.response_cache import get_response_cache
+from app.cache.semantic_cache import get_semantic_cache
+from app.cache.shared_cache import SharedCache, get_shared_cache
+
+
+class TestSharedCache:
+    """Test suite for the cross-worker SQLite cache"""
+    
+    def _cache(self, tmp_path, **kwargs):
+        return SharedCache(str(tmp_path / "shared.sqlite"), **kwargs)
+    
+    def test_visible_across_instances(self, tmp_path):
+        """Test that a value stored by one worker is served to another"""
+        writer, reader = self._cache(tmp_path), self._cache(tmp_path)
+        writer.put("What are AI trends?", {"response": "ai"})
+        
+        assert reader.get("what are ai trends") == {"response": "ai"}
+        assert reader.stats()["hits"] == 1
+        assert reader.stats()["entries"] == 1
+    
+    def test_wal_mode(self, tmp_path):
+        """Test that the database uses write-ahead logging"""
+        cache = self._cache(tmp_path)
+        (mode,) = cache._connection().execute("PRAGMA journal_mode").fetchone()
+        assert mode == "wal"
+    
+    def test_expiry(self, tmp_path):
+        """Test that expired entries are misses"""
+        cache = self._cache(tmp_path, ttl=0.05)
+        cache.put("q", {"n": 1})
+        time.sleep(0.06)
+        assert cache.get("q") is None
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the table stays bounded and recently read entries survive"""
+        cache = self._cache(tmp_path, max_entries=3)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"key": key})
+            time.sleep(0.01)
+        connection = cache._connection()
+        connection.execute("UPDATE entries SET accessed = accessed - 10 WHERE key != 'a'")
+        cache.put("d", {"key": "d"})
+        
+        assert cache.stats()["entries"] == 3
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+    
+    def test_single_flight(self, tmp_path):
+        """Test that concurrent fills of one key run once and every caller gets the result"""
+        calls = []
+        
+        def fill(cache):
+            calls.append(1)
+            time.sleep(0.1)
+            cache.put("hot query", {"response": "filled"})
+            return {"response": "filled"}
+        
+        results = []
+        def worker():
+            cache = self._cache(tmp_path, poll_interval=0.01)
+            results.append(cache.single_flight("hot query", lambda: fill(cache)))
+        
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert results == [{"response": "filled"}] * 6
+    
+    def test_failed_fill_hands_over(self, tmp_path):
+        """Test that a waiter fills the key itself when the lease holder stores nothing"""
+        holder, waiter = self._cache(tmp_path), self._cache(tmp_path, poll_interval=0.01)
+        owner = holder._acquire("q")
+        threading.Timer(0.05, holder._release, ("q", owner)).start()
+        
+        assert waiter.single_flight("q", lambda: {"response": "mine"}) == {"response": "mine"}
+    
+    def test_fill_after_release_not_repeated(self, tmp_path):
+        """Test that a worker taking the lease right after another filled and released it reuses the value"""
+        first, second = self._cache(tmp_path), self._cache(tmp_path)
+        calls = []
+        
+        def fill(cache, response):
+            calls.append(response)
+            cache.put("q", {"response": response})
+            return {"response": response}
+        
+        assert first.single_flight("q", lambda: fill(first, "first")) == {"response": "first"}
+        assert second.single_flight("q", lambda: fill(second, "second")) == {"response": "first"}
+        assert calls == ["first"]
+    
+    def test_waiting_does_not_count_misses(self, tmp_path):
+        """Test that polling for another worker's fill leaves the hit/miss stats alone"""
+        holder, waiter = self._cache(tmp_path), self._cache(tmp_path, poll_interval=0.005)
+        owner = holder._acquire("q")
+        
+        def finish():
+            holder.put("q", {"response": "theirs"})
+            holder._release("q", owner)
+        threading.Timer(0.1, finish).start()
+        
+        assert waiter.single_flight("q", lambda: {"response": "mine"}) == {"response": "theirs"}
+        assert waiter.stats()["misses"] == 0
+        assert waiter.stats()["hits"] == 0
+    
+    def test_cancel_ends_wait(self, tmp_path):
+        """Test that setting the cancel event stops waiting on a held lease and hands over to fill"""
+        holder, waiter = self._cache(tmp_path), self._cache(tmp_path, lease_timeout=30.0)
+        holder._acquire("q")
+        cancel_event = threading.Event()
+        threading.Timer(0.05, cancel_event.set).start()
+        
+        started = time.monotonic()
+        result = waiter.single_flight("q", lambda: {"cancelled": cancel_event.is_set()}, cancel_event)
+        
+        assert result == {"cancelled": True}
+        assert time.monotonic() - started < 1.0
+    
+    def test_expired_lease_taken_over(self, tmp_path):
+        """Test that a lease left by a dead worker expires"""
+        cache = self._cache(tmp_path, lease_timeout=0.05)
+        assert cache._acquire("q") is not None
+        assert cache._acquire("q") is None
+        time.sleep(0.06)
+        assert cache._acquire("q") is not None
+    
+    def test_workflow_uses_shared_cache(self, tmp_path, monkeypatch):
+        """Test that run_workflow serves another worker's stored response"""
+        monkeypatch.setenv("PRIVYPULSE_SHARED_CACHE_PATH", str(tmp_path / "workers.sqlite"))
+        monkeypatch.setattr(shared_cache, "_shared_cache", None)
+        query = "What are the trends in electric scooter sharing?"
+        SharedCache(str(tmp_path / "workers.sqlite")).put(query, {"response": "from another worker"})
+        get_response_cache().clear()
+        get_semantic_cache().clear()
+        
+        assert coordinator.run_workflow(query) == {"response": "from another worker"}
+        assert get_shared_cache().stats()["hits"] == 1
+    
+    def test_disabled_without_path(self, monkeypatch):
+        """Test that no shared cache is used unless configured"""
+        monkeypatch.delenv("PRIVYPULSE_SHARED_CACHE_PATH", raising=False)
+        assert get_shared_cache() is None
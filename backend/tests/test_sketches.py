@@ -0,0 +1,179 @@
+import pytest
+import random
+from fastapi.testclient import TestClient
+from app.analytics import sketches
+from app.analytics.sketches import (
+    AnalyticsStore, CountMinSketch, HyperLogLog, QueryAnalytics, SpaceSaving,
+    _hash_pair, normalize_query, record_query
+)
+
+
+def _stream(n=20_000, seed=0):
+    rng = random.Random(seed)
+    return [f"query {int(rng.paretovariate(1.1))}" for _ in range(n)]
+
+
+class TestSketches:
+    """Test suite for the probabilistic sketches"""
+    
+    def test_normalize_query(self):
+        """Test that case, punctuation and spacing variants normalize together"""
+        assert normalize_query("  What are AI   trends? ") == normalize_query("what are ai trends")
+    
+    def test_count_min_never_underestimates(self):
+        """Test Count-Min estimates are upper bounds and merge by addition"""
+        a, b = CountMinSketch(256, 4), CountMinSketch(256, 4)
+        stream = _stream(5000)
+        for i, key in enumerate(stream):
+            (a if i % 2 else b).add(_hash_pair(key))
+        a.merge(b)
+        
+        for key in set(stream[:200]):
+            assert a.estimate(_hash_pair(key)) >= stream.count(key)
+    
+    def test_hyperloglog_accuracy(self):
+        """Test that distinct counts are within a few percent, including after merges"""
+        a, b = HyperLogLog(12), HyperLogLog(12)
+        for i in range(30_000):
+            (a if i % 2 else b).add(_hash_pair(f"q{i % 20_000}"))
+        a.merge(b)
+        
+        assert a.count() == pytest.approx(20_000, rel=0.05)
+        small = HyperLogLog(12)
+        for i in range(50):
+            small.add(_hash_pair(f"q{i}"))
+        assert small.count() == pytest.approx(50, rel=0.05)
+    
+    def test_space_saving_keeps_heavy_hitters(self):
+        """Test that keys above total/capacity are always tracked with overestimates"""
+        heavy = SpaceSaving(capacity=16)
+        stream = _stream()
+        for key in stream:
+            heavy.add(key)
+        
+        tracked = {key: count for key, count, _ in heavy.top(16)}
+        for key in set(stream):
+            if stream.count(key) > len(stream) / 16:
+                assert tracked[key] >= stream.count(key)
+        assert len(heavy.counts) == 16
+
+
+class TestQueryAnalytics:
+    """Test suite for QueryAnalytics"""
+    
+    def test_report_hides_rare_queries(self):
+        """Test that queries below the reporting threshold are not exposed"""
+        analytics = QueryAnalytics(min_count=3)
+        for query in ["AI trends"] * 5 + ["my private question"]:
+            analytics.record(query)
+        
+        report = analytics.report()
+        assert report["top"] == [{"query": "ai trends", "count": 5}]
+        assert report["total"] == 6
+        assert report["distinct"] == 2
+    
+    def test_hot_examples_keep_raw_text(self):
+        """Test that hot queries are returned as sent, not as their normalized keys"""
+        analytics = QueryAnalytics(min_count=2)
+        for query in ["C++ vs C#", "C++ vs C#", "AI trends?", "AI trends?", "AI trends?"]:
+            analytics.record(query)
+        
+        assert analytics.hot_examples(5) == ["AI trends?", "C++ vs C#"]
+    
+    def test_noised_report(self):
+        """Test that epsilon adds noise to reported counts"""
+        analytics = QueryAnalytics(epsilon=0.1, min_count=1, seed=1)
+        for _ in range(100):
+            analytics.record("cloud market")
+        
+        report = analytics.report()
+        assert report["noised"]
+        assert report["top"][0]["count"] != 100
+    
+    def test_snapshots_merge_across_workers(self, tmp_path):
+        """Test that reports merge other workers' snapshots with live sketches"""
+        worker_a = AnalyticsStore(QueryAnalytics(), str(tmp_path))
+        worker_b = AnalyticsStore(QueryAnalytics(), str(tmp_path))
+        worker_b.path = str(tmp_path / "worker-other.npz")
+        for _ in range(4):
+            worker_a.analytics.record("AI trends")
+            worker_b.analytics.record("ai trends!")
+        worker_b.analytics.record("EV market")
+        worker_b.snapshot()
+        
+        merged, workers = worker_a.merged()
+        assert workers == 2
+        assert merged.total == 9
+        assert merged.hot_queries() == [("ai trends", 8)]
+    
+    def test_snapshot_hides_rare_queries(self, tmp_path):
+        """Test that query text below the reporting threshold is never written to disk"""
+        analytics = QueryAnalytics(min_count=3)
+        for query in ["AI trends"] * 3 + ["my private question"]:
+            analytics.record(query)
+        path = str(tmp_path / "worker-1.npz")
+        analytics.save(path)
+        
+        raw = open(path, "rb").read()
+        assert b"private" not in raw and "private".encode("utf-32-le") not in raw
+        assert analytics.load_snapshot(path).heavy.counts["ai trends"] == 3
+    
+    def test_hidden_keys_merge_with_plain_text(self, tmp_path):
+        """Test that a query rare on each worker still merges and is reported once it is hot overall"""
+        worker_a = AnalyticsStore(QueryAnalytics(), str(tmp_path))
+        worker_b = AnalyticsStore(QueryAnalytics(), str(tmp_path))
+        worker_b.path = str(tmp_path / "worker-other.npz")
+        for _ in range(2):
+            worker_b.analytics.record("EV market")
+        worker_b.snapshot()
+        for _ in range(2):
+            worker_a.analytics.record("EV market")
+        
+        merged, _ = worker_a.merged()
+        assert merged.hot_queries() == [("ev market", 4)]
+    
+    def test_stale_snapshots_expire(self, tmp_path):
+        """Test that snapshots of workers that stopped refreshing are removed instead of merged"""
+        import os
+        worker_a = AnalyticsStore(QueryAnalytics(), str(tmp_path), stale_after=60)
+        dead = AnalyticsStore(QueryAnalytics(), str(tmp_path))
+        dead.path = str(tmp_path / "worker-dead.npz")
+        for _ in range(5):
+            dead.analytics.record("AI trends")
+        dead.snapshot()
+        os.utime(dead.path, (0, 0))
+        
+        merged, workers = worker_a.merged()
+        assert workers == 1
+        assert merged.total == 0
+        assert not os.path.exists(dead.path)
+    
+    def test_noise_applies_before_threshold(self):
+        """Test that the reporting threshold is applied to noised counts"""
+        analytics = QueryAnalytics(epsilon=0.05, min_count=3, seed=0)
+        for i in range(40):
+            analytics.record(f"query {i}")
+            analytics.record(f"query {i}")
+        
+        # Every query was seen twice; only noise can lift some over the threshold
+        assert analytics.hot_queries() == []
+        assert analytics.report(top=40)["top"]
+    
+    def test_admin_endpoint(self, tmp_path, monkeypatch):
+        """Test the admin analytics endpoint and that it is closed without a token"""
+        from app.main import app
+        store = AnalyticsStore(QueryAnalytics(), str(tmp_path))
+        monkeypatch.setattr(sketches, "_store", store)
+        for _ in range(3):
+            record_query("Compare AWS vs Azure")
+        
+        client = TestClient(app)
+        monkeypatch.delenv("PRIVYPULSE_ADMIN_TOKEN", raising=False)
+        assert client.get("/admin/query-analytics").status_code == 403
+        
+        monkeypatch.setenv("PRIVYPULSE_ADMIN_TOKEN", "secret")
+        assert client.get("/admin/query-analytics").status_code == 401
+        response = client.get("/admin/query-analytics", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["top"] == [{"query": "compare aws vs azure", "count": 3}]
+        assert response.json()["workers"] == 1
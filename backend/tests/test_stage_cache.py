@@ -0,0 +1,65 @@
+import pytest
+from app.cache.stage_cache import StageCache
+from app.agents.coordinator import CoordinatorAgent
+
+
+class TestStageCache:
+    """Test suite for StageCache"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.cache = StageCache(max_entries_per_stage=2)
+        self.task_plan = {"query": "AI market trends", "focus": "trend_analysis"}
+    
+    def test_key_depends_on_text_and_fields(self):
+        """Test that keys change with the input text and relevant plan fields only"""
+        key = self.cache.key("analysis", "data", self.task_plan, ["focus"])
+        
+        assert key == self.cache.key("analysis", "data", {**self.task_plan, "query": "other"}, ["focus"])
+        assert key != self.cache.key("analysis", "other data", self.task_plan, ["focus"])
+        assert key != self.cache.key("analysis", "data", {**self.task_plan, "focus": "comparison"}, ["focus"])
+        assert key != self.cache.key("synthesis", "data", self.task_plan, ["focus"])
+    
+    def test_key_depends_on_version(self):
+        """Test that a model version in the key invalidates older entries"""
+        key = self.cache.key("synthesis", "data", self.task_plan, ["focus"], version=1)
+        
+        assert key == self.cache.key("synthesis", "data", self.task_plan, ["focus"], version=1)
+        assert key != self.cache.key("synthesis", "data", self.task_plan, ["focus"], version=2)
+    
+    def test_get_put_and_stats(self):
+        """Test hits, misses and hit ratios per stage"""
+        assert self.cache.get("analysis", "k1") is None
+        self.cache.put("analysis", "k1", {"analysis": "report"})
+        
+        assert self.cache.get("analysis", "k1") == {"analysis": "report"}
+        assert self.cache.stats()["analysis"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1}
+    
+    def test_returns_copies(self):
+        """Test that callers cannot mutate cached values"""
+        self.cache.put("analysis", "k1", {"notes": []})
+        self.cache.get("analysis", "k1")["notes"].append("mutated")
+        
+        assert self.cache.get("analysis", "k1") == {"notes": []}
+    
+    def test_bounded_per_stage(self):
+        """Test that each stage keeps at most the configured number of entries"""
+        for i in range(3):
+            self.cache.put("analysis", f"k{i}", i)
+        
+        assert self.cache.get("analysis", "k0") is None
+        assert self.cache.stats()["analysis"]["entries"] == 2
+    
+    def test_unchanged_data_short_circuits_downstream(self):
+        """Test that a repeated workflow serves downstream stages from cache"""
+        coordinator = CoordinatorAgent()
+        first = coordinator.run_workflow("What are the trends in AI market?")
+        second = coordinator.run_workflow("What are the trends in AI market?")
+        stages = second["metadata"]["stages"]
+        
+        assert second["response"] == first["response"]
+        assert stages["data"]["cached"] is False
+        assert stages["analysis"]["cached"] is True
+        assert stages["synthesis"]["cached"] is True
+        assert stages["validation"]["cached"] is True
+        assert coordinator.stage_cache.stats()["synthesis"]["hit_ratio"] == 0.5
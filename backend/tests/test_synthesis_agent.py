@@ -98,3 +98,24 @@ class TestSynthesisAgent:
             task_plan = {**self.test_task_plan, "focus": focus}
             result = self.agent.synthesize(self.test_analysis, task_plan)
             assert result["success"] is True
+    
+    def test_executive_summary_bounded_candidates(self):
+        """Test that long analyses are summarized from a capped candidate set"""
+        agent = SynthesisAgent(max_summary_candidates=10)
+        analysis = "".join(
+            f"Filler sentence number {i} about office logistics and schedules.\n" for i in range(100)
+        ) + "AI market growth is accelerating across enterprise segments.\n"
+        summary = agent._extract_executive_summary(analysis, self.test_task_plan)
+        
+        assert len(summary) > 0
+        assert summary.count(". ") <= agent.summary_sentences - 1
+    
+    def test_extract_key_findings_collapses_duplicates(self):
+        """Test that duplicate findings do not fill the top 5"""
+        analysis = "\n".join(
+            ["- Acme Corp announced record revenue driven by cloud demand"] * 4
+            + ["- Battery costs for electric vehicles fell sharply"]
+        )
+        findings = self.agent._extract_key_findings(analysis)
+        
+        assert len(findings) == 2
@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+from app.nlp.textrank import similarity_edges, textrank
+from app.nlp.tfidf import TfidfRanker
+
+
+class TestTextRank:
+    """Test suite for the TextRank summarizer helpers"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.sentences = [
+            "Cloud computing market growth is accelerating",
+            "Cloud market growth is driven by enterprise computing demand",
+            "Enterprise demand for cloud computing keeps the market growing",
+            "The office cafeteria serves lunch at noon",
+        ]
+        self.vectors, _ = TfidfRanker().vectorize(self.sentences)
+    
+    def test_similarity_edges_symmetric(self):
+        """Test that the similarity graph is symmetric and sparse"""
+        rows, cols, weights = similarity_edges(self.vectors)
+        edges = {(int(r), int(c)): w for r, c, w in zip(rows, cols, weights)}
+        
+        assert all(edges[(c, r)] == pytest.approx(w) for (r, c), w in edges.items())
+        assert not any(3 in edge for edge in edges)
+    
+    def test_textrank_scores_central_sentences_higher(self):
+        """Test that connected sentences outrank the isolated one"""
+        scores = textrank(self.vectors)
+        
+        assert scores.shape == (4,)
+        assert scores.sum() == pytest.approx(1.0)
+        assert scores[3] == scores.min()
+    
+    def test_textrank_early_exit(self):
+        """Test that a single iteration budget still returns a distribution"""
+        scores = textrank(self.vectors, max_iter=1)
+        assert np.all(scores > 0)
+    
+    def test_textrank_empty(self):
+        """Test that no sentences yield no scores"""
+        assert len(textrank([])) == 0
@@ -0,0 +1,66 @@
+import pytest
+from app.nlp.tfidf import TfidfRanker, tokenize
+
+
+class TestTfidfRanker:
+    """Test suite for TfidfRanker"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.ranker = TfidfRanker()
+        self.sentences = [
+            "Data ready for analysis phase",
+            "Cloud computing spending keeps rising across enterprises",
+            "Electric vehicle sales doubled in Europe",
+            "Cloud providers compete on pricing for computing capacity",
+        ]
+    
+    def test_tokenize(self):
+        """Test tokenization drops stop words and folds plurals"""
+        assert tokenize("What are the Trends in the market?") == ["trend", "market"]
+    
+    def test_rank_prefers_relevant_sentences(self):
+        """Test that sentences sharing query terms rank first"""
+        ranked = self.ranker.rank("cloud computing trends", self.sentences, 2)
+        
+        assert [i for i, _ in ranked] == [1, 3] or [i for i, _ in ranked] == [3, 1]
+        assert all(score > 0 for _, score in ranked)
+    
+    def test_rank_bounded_top_k(self):
+        """Test that at most k results are returned"""
+        assert len(self.ranker.rank("cloud", self.sentences, 1)) == 1
+        assert self.ranker.rank("cloud", [], 3) == []
+    
+    def test_rank_ties_keep_document_order(self):
+        """Test that unrelated queries fall back to priors and document order"""
+        priors = [0.0, 0.0, 0.01, 0.0]
+        ranked = self.ranker.rank("semiconductors", self.sentences, 3, priors)
+        
+        assert [i for i, _ in ranked] == [2, 0, 1]
+    
+    def test_idf_tables_cached(self):
+        """Test that IDF tables are reused for identical candidate sets"""
+        self.ranker.rank("cloud", self.sentences, 2)
+        self.ranker.rank("vehicle", self.sentences, 2)
+        
+        assert len(self.ranker._idf_cache) == 1
+    
+    def test_vocabulary_overflow_uses_hashed_ids(self):
+        """Test that terms beyond the vocabulary cap still get stable ids"""
+        ranker = TfidfRanker(max_vocabulary=2, hash_buckets=16)
+        ranker.vectorize(["alpha beta gamma delta"])
+        
+        assert len(ranker._vocabulary) == 2
+        assert ranker._term_id("gamma") == ranker._term_id("gamma") >= 2
+    
+    def test_concurrent_terms_get_distinct_ids(self):
+        """Test that terms interned from many threads never share an id"""
+        from concurrent.futures import ThreadPoolExecutor
+        ranker = TfidfRanker()
+        terms = [f"term{i}" for i in range(2000)]
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(ranker._term_id, terms * 4))
+        
+        assert len(ranker._vocabulary) == len(terms)
+        assert sorted(ranker._vocabulary.values()) == list(range(len(terms)))
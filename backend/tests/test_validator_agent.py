@@ -109,3 +109,34 @@ class TestValidatorAgent:
         notes = self.agent._generate_validation_notes(completeness, quality)
         assert len(notes) > 0
         assert isinstance(notes, list)
+    
+    def test_full_scores_reported(self):
+        """Test that every check is evaluated so passing content scores 1.0"""
+        completeness = self.agent._check_completeness(self.test_content, self.test_task_plan)
+        quality = self.agent._check_quality(self.test_content)
+        
+        assert set(completeness["checks"]) == {name for name, _ in self.agent.completeness_checks}
+        assert completeness["score"] == 1.0
+        assert quality["score"] == 1.0
+    
+    def test_failing_content_gets_query_header(self):
+        """Test that content failing early checks is still checked for relevance and enhanced"""
+        result = self.agent.validate("Short note.", self.test_query, self.test_task_plan)
+        
+        assert result["passed"] is False
+        assert result["validated_content"].startswith(f"Analysis for: {self.test_query}")
+        assert "[Note: Additional details may be available upon request]" in result["validated_content"]
+    
+    def test_validate_memoized(self):
+        """Test that identical content for the same query skips validation"""
+        first = self.agent.validate(self.test_content, self.test_query, self.test_task_plan)
+        second = self.agent.validate(self.test_content, self.test_query, self.test_task_plan)
+        
+        assert "cached" not in first
+        assert second["cached"] is True
+        assert second["passed"] == first["passed"]
+        assert second["scores"] == first["scores"]
+        
+        other_plan = {**self.test_task_plan, "query": "Compare electric vehicle makers"}
+        third = self.agent.validate(self.test_content, other_plan["query"], other_plan)
+        assert "cached" not in third
@@ -0,0 +1,146 @@
+import threading
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from app.api import ws
+from app.main import app
+
+
+class TestQueryWebSocket:
+    """Test suite for the /ws/query session endpoint"""
+    
+    def setup_method(self):
+        self.client = TestClient(app)
+        self.release = threading.Event()
+        self.cancelled = []
+    
+    def _fake_workflow(self, user_query, progress=None, cancel_event=None):
+        progress("data", {"status": "running"})
+        if user_query.startswith("slow"):
+            self.release.wait(5)
+            if cancel_event.is_set():
+                self.cancelled.append(user_query)
+                return {"response": "Query cancelled.", "agents_used": [], "error": True, "cancelled": True}
+        progress("data", {"status": "completed", "duration_ms": 1.0})
+        return {"response": f"report for {user_query}", "agents_used": ["DataAgent"]}
+    
+    def _until(self, socket, kind, query_id):
+        while True:
+            message = socket.receive_json()
+            if message["type"] == kind and message["id"] == query_id:
+                return message
+    
+    def test_progress_and_result(self, monkeypatch):
+        """Test that a query streams acceptance, stage progress and the result"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_json({"type": "query", "id": "q1", "query": "ai trends", "fields": "response"})
+            messages = [socket.receive_json() for _ in range(4)]
+        
+        assert [m["type"] for m in messages] == ["accepted", "progress", "progress", "result"]
+        assert messages[2] == {"type": "progress", "id": "q1", "stage": "data", "status": "completed", "duration_ms": 1.0}
+        assert messages[3]["result"] == {"response": "report for ai trends"}
+    
+    def test_multiple_queries_one_connection(self, monkeypatch):
+        """Test that a session can submit several queries over one connection"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            for i in range(3):
+                socket.send_json({"type": "query", "id": f"q{i}", "query": f"query {i}"})
+                result = self._until(socket, "result", f"q{i}")
+                assert result["result"]["response"] == f"report for query {i}"
+    
+    def test_superseded_query_cancelled(self, monkeypatch):
+        """Test that a new query cancels the session's in-flight one server-side"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_json({"type": "query", "id": "old", "query": "slow old"})
+            self._until(socket, "progress", "old")
+            socket.send_json({"type": "query", "id": "new", "query": "fresh"})
+            
+            assert self._until(socket, "cancelled", "old")["id"] == "old"
+            assert self._until(socket, "result", "new")["result"]["response"] == "report for fresh"
+            self.release.set()
+        
+        assert self.cancelled == ["slow old"]
+    
+    def test_explicit_cancel(self, monkeypatch):
+        """Test that a client can cancel a query by id"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_json({"type": "query", "id": "q1", "query": "slow one"})
+            self._until(socket, "accepted", "q1")
+            socket.send_json({"type": "cancel", "id": "q1"})
+            assert self._until(socket, "cancelled", "q1")
+            self.release.set()
+            
+            socket.send_json({"type": "cancel", "id": "q1"})
+            assert "No such" in self._until(socket, "error", "q1")["detail"]
+    
+    def test_concurrency_limit(self, monkeypatch):
+        """Test that queries beyond the session's limit are rejected"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        monkeypatch.setenv("PRIVYPULSE_WS_MAX_CONCURRENT", "2")
+        with self.client.websocket_connect("/ws/query") as socket:
+            for i in range(3):
+                socket.send_json({"type": "query", "id": f"q{i}", "query": f"slow {i}", "supersede": False})
+            error = self._until(socket, "error", "q2")
+            self.release.set()
+            self._until(socket, "result", "q0")
+        
+        assert "At most 2" in error["detail"]
+    
+    def test_cancelled_queries_free_their_slot(self, monkeypatch):
+        """Test that a superseded query stops counting against the limit while its stage finishes"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        monkeypatch.setenv("PRIVYPULSE_WS_MAX_CONCURRENT", "1")
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_json({"type": "query", "id": "a", "query": "slow a"})
+            self._until(socket, "progress", "a")
+            socket.send_json({"type": "query", "id": "b", "query": "fresh"})
+            
+            assert self._until(socket, "cancelled", "a")
+            assert socket.receive_json() == {"type": "accepted", "id": "b"}
+            assert self._until(socket, "result", "b")["result"]["response"] == "report for fresh"
+            self.release.set()
+        
+        assert self.cancelled == ["slow a"]
+    
+    def test_foreign_origin_rejected(self):
+        """Test that browsers outside the CORS allowlist cannot open a session"""
+        with pytest.raises(WebSocketDisconnect):
+            with self.client.websocket_connect("/ws/query", headers={"Origin": "http://evil.example"}) as socket:
+                socket.receive_json()
+        
+        with self.client.websocket_connect("/ws/query", headers={"Origin": "http://localhost:3000"}) as socket:
+            socket.send_text("not json")
+            assert socket.receive_json()["detail"] == "Messages must be JSON"
+    
+    def test_non_string_fields_rejected(self, monkeypatch):
+        """Test that a JSON list for fields gets an error instead of ending the session"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_json({"type": "query", "id": "q1", "query": "ai", "fields": ["response"]})
+            assert "comma-separated string" in socket.receive_json()["detail"]
+            socket.send_json({"type": "query", "id": "q2", "query": "ai"})
+            assert self._until(socket, "result", "q2")
+    
+    def test_binary_frame_rejected(self, monkeypatch):
+        """Test that a binary frame gets an error instead of ending the session"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_bytes(b'{"type": "query"}')
+            assert socket.receive_json()["detail"] == "Messages must be JSON text frames"
+            socket.send_json({"type": "query", "id": "q1", "query": "ai"})
+            assert self._until(socket, "result", "q1")
+    
+    def test_invalid_messages(self, monkeypatch):
+        """Test that malformed messages get errors without closing the session"""
+        monkeypatch.setattr(ws, "run_workflow", self._fake_workflow)
+        with self.client.websocket_connect("/ws/query") as socket:
+            socket.send_text("not json")
+            assert socket.receive_json()["detail"] == "Messages must be JSON"
+            socket.send_json({"type": "query", "id": "q1", "query": "ai", "fields": "bogus"})
+            assert "bogus" in socket.receive_json()["detail"]
+            socket.send_json({"type": "query", "id": "q2", "query": "ai"})
+            assert self._until(socket, "result", "q2")